@@ -0,0 +1,133 @@
+"""
+Check: contact sheets render from argument lists, in parallel, and skip unchanged shots.
+
+Generates tiny synthetic A/B/C clips with ffmpeg's testsrc inside folders
+whose names contain spaces (one shot has five versions, one version is
+9:16), then:
+
+- runs the old shell-string `ffmpeg ... hstack -crf 18` per shot for
+  reference (it cannot handle the spaces),
+- renders every shot with ContactSheetRenderer and checks the grid size,
+- re-renders: everything is skipped,
+- re-encodes one input: only that shot is rebuilt,
+- builds still-frame sheets (one row per version).
+
+    python scripts/bench_contact_sheet.py
+    python scripts/bench_contact_sheet.py --shots 8 --workers 4
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+
+from contact_sheet import ContactSheetRenderer, grid_shape
+
+TILE = 320
+
+
+def make_clip(path, size, seconds=2, pattern="testsrc"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    subprocess.run(["ffmpeg", "-y", "-loglevel", "error", "-f", "lavfi",
+                    "-i", f"{pattern}=size={size}:rate=24:duration={seconds}",
+                    "-c:v", "libx264", "-preset", "ultrafast", "-pix_fmt", "yuv420p", str(path)],
+                   check=True)
+
+
+def legacy(shot_dir, output):
+    """The shell-string version UltraCinePipeline used to run."""
+    videos = sorted(shot_dir.glob("*.mp4"))
+    inputs = ' '.join([f'-i {v}' for v in videos])
+    cmd = (f"ffmpeg -y -loglevel quiet {inputs} -filter_complex \"hstack=inputs={len(videos)}\" "
+           f"-c:v libx264 -crf 18 {output}")
+    return subprocess.run(cmd, shell=True).returncode == 0
+
+
+def video_size(path):
+    cap = cv2.VideoCapture(str(path))
+    size = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shots", type=int, default=4)
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+    checks = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "naroa gallery" / "shots"
+        groups = {}
+        patterns = ["testsrc", "testsrc2", "smptebars", "rgbtestsrc", "pal100bars"]
+        for s in range(args.shots):
+            versions = 5 if s == 0 else 3
+            videos = []
+            for v in range(versions):
+                size = "360x640" if v == 1 else "1280x720"
+                video = root / f"shot {s}" / f"shot {s}_v{'ABCDE'[v]}.mp4"
+                make_clip(video, size, pattern=patterns[v])
+                videos.append(video)
+            groups[f"shot {s}"] = videos
+
+        # 1. Old shell string
+        start = time.monotonic()
+        ok_legacy = [legacy(root / name, Path(tmp) / f"legacy_{i}.mp4") for i, name in enumerate(groups)]
+        legacy_s = time.monotonic() - start
+        print(f"   shell-string ffmpeg: {sum(ok_legacy)}/{len(groups)} shots rendered "
+              f"(paths with spaces), {legacy_s:.2f}s")
+
+        # 2. New renderer
+        renderer = ContactSheetRenderer(Path(tmp) / "contact sheets", tile_width=TILE,
+                                        max_workers=args.workers)
+        start = time.monotonic()
+        results = renderer.render(groups)
+        elapsed = time.monotonic() - start
+        ok = all(r.path and not r.error for r in results.values())
+        for name, result in results.items():
+            cols, rows = grid_shape(len(groups[name]), renderer.columns)
+            ok &= video_size(result.path) == (cols * TILE, rows * TILE * 9 // 16)
+        checks.append(ok)
+        errors = [r.error for r in results.values() if r.error]
+        print(f"{'✅' if ok else '❌'} {len(groups)} comparison sheets with {args.workers} workers "
+              f"in {elapsed:.2f}s; grid for 5 versions {video_size(results['shot 0'].path)}"
+              + (f"; errors: {errors}" if errors else ""))
+
+        # 3. Nothing changed
+        start = time.monotonic()
+        again = renderer.render(groups)
+        elapsed = time.monotonic() - start
+        ok = all(r.skipped for r in again.values())
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Re-render with unchanged inputs: "
+              f"{sum(r.skipped for r in again.values())}/{len(groups)} skipped in {elapsed * 1000:.0f} ms")
+
+        # 4. One input changed
+        make_clip(groups["shot 1"][0], "1280x720", pattern="testsrc2")
+        again = renderer.render(groups)
+        rebuilt = sorted(name for name, r in again.items() if not r.skipped)
+        ok = rebuilt == ["shot 1"]
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} After re-rendering one clip, rebuilt: {rebuilt}")
+
+        # 5. Still-frame sheets
+        start = time.monotonic()
+        stills = renderer.render(groups, kind="stills")
+        elapsed = time.monotonic() - start
+        image = cv2.imread(str(stills["shot 0"].path))
+        tile_w = TILE // 2
+        ok = (all(r.path and not r.error for r in stills.values())
+              and image.shape[:2] == (5 * (tile_w * 9 // 16), renderer.frames_per_clip * tile_w))
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Still-frame sheets in {elapsed:.2f}s; "
+              f"5 versions x {renderer.frames_per_clip} frames -> {image.shape[1]}x{image.shape[0]} PNG")
+
+    return 0 if all(checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
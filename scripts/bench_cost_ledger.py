@@ -0,0 +1,118 @@
+"""
+Check: the monthly budget holds across runs and concurrent pipelines.
+
+- Several worker processes race to reserve and charge shots against one
+  ledger: total spend never exceeds the budget and exactly the shots that
+  fit get through.
+- A second UltraCinePipeline run (fresh session_cost) sees the first
+  run's spend and refuses shots that no longer fit.
+- Reservations left behind by a killed process stop counting.
+- The report groups spend per project, model and day.
+
+    python scripts/bench_cost_ledger.py
+    python scripts/bench_cost_ledger.py --workers 8 --shots 40
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_generation_cache import FakeVeo
+from cost_ledger import BudgetExceeded, CostLedger, print_report
+from poll_policy import PollPolicy
+
+SHOT_COST = 3.20
+
+
+def worker(db, name, shots, budget):
+    ledger = CostLedger(db)
+    for i in range(shots):
+        try:
+            rid = ledger.reserve(name, "veo-3.1-generate-preview", f"{name}_{i}", SHOT_COST, budget)
+        except BudgetExceeded:
+            continue
+        time.sleep(0.002)   # "generation"
+        ledger.charge(rid, seconds=8)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        db, name, shots, budget = sys.argv[2:6]
+        worker(db, name, int(shots), float(budget))
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--shots", type=int, default=25, help="shots attempted per worker")
+    args = parser.parse_args()
+    checks = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "cost_ledger.sqlite")
+        ledger = CostLedger(db)
+
+        # 1. Concurrent pipelines racing for the same budget
+        fits = args.workers * args.shots // 2
+        budget = fits * SHOT_COST + SHOT_COST / 2
+        start = time.monotonic()
+        procs = [subprocess.Popen([sys.executable, __file__, "--worker", db, f"proj_{w}",
+                                   str(args.shots), str(budget)]) for w in range(args.workers)]
+        for proc in procs:
+            proc.wait()
+        elapsed = time.monotonic() - start
+        spent = ledger.month_spend()
+        charged = sum(r["videos"] for r in ledger.report(["project"]))
+        ok = charged == fits and spent <= budget and ledger.reserved() == 0
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} {args.workers} processes x {args.shots} shots, budget ${budget:.2f}: "
+              f"{charged} charged (${spent:.2f}), expected {fits}, {elapsed:.2f}s")
+
+        # 2. A new pipeline run sees earlier spend
+        os.chdir(tmp)
+        import ultra_cine
+        ultra_cine.logging.getLogger().setLevel("CRITICAL")
+        config = ultra_cine.ProjectConfig(
+            project_name="ledger_bench",
+            output_dir=tmp,
+            cost_ledger_db=db,
+            use_cache=False,
+            monthly_budget_usd=spent + 2 * 8 * 0.40 + 1,
+            poll_policy=PollPolicy(initial_delay=0.05, min_interval=0.05, max_interval=0.1, jitter=0),
+        )
+        results = []
+        for run in range(2):
+            pipeline = ultra_cine.UltraCinePipeline(api_key="fake", config=config)
+            pipeline.client = FakeVeo(latency=0.05)
+            shots = [ultra_cine.ShotConfig(shot_id=f"run{run}_shot{i}", prompt=f"Gold take {run}.{i}")
+                     for i in range(2)]
+            results.append(len(pipeline.generate_shots(shots)))
+        summary = pipeline.get_summary()
+        ok = results == [2, 0]
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Two runs under one monthly budget: {results[0]} then "
+              f"{results[1]} shots; session cost {summary['costo_total_usd']}, "
+              f"month {summary['gasto_mes_usd']}, left {summary['presupuesto_restante']}")
+
+        # 3. Reservation from a dead process no longer blocks the budget
+        dead = subprocess.Popen([sys.executable, "-c", "pass"])
+        dead.wait()
+        with ledger._connect() as conn:
+            conn.execute("INSERT INTO reservations VALUES ('ghost', 'x', 'm', 's', 100, ?, ?)",
+                         (time.time(), dead.pid))
+        ok = ledger.reserved() == 0
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Reservation of killed pid {dead.pid} dropped")
+
+        # 4. Report
+        print()
+        by = ["project", "model", "day"]
+        print_report(ledger.report(by), by)
+        os.chdir("/")
+
+    return 0 if all(checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+"""
+Check: last/first/N-frame extraction reads only what it needs and stays frame-accurate.
+
+Encodes a long synthetic clip (each frame's index is painted as base-32
+digits into four gray bars, GOP of 2 s) and compares the old
+`CAP_PROP_FRAME_COUNT - 1` seek with FrameExtractor:
+
+- last frame: correct index, a tail of frames decoded instead of the clip,
+- 6 evenly spaced frames in one pass land on the expected indices,
+- a truncated MP4 whose header still promises the full length,
+- a second extraction is served from the sha256 cache.
+
+    python scripts/bench_frame_extract.py
+    python scripts/bench_frame_extract.py --minutes 30
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+# The truncated clip makes FFmpeg complain on every seek
+os.environ.setdefault("OPENCV_FFMPEG_LOGLEVEL", "-8")
+import cv2
+import numpy as np
+
+from frame_extract import FrameExtractor
+
+FPS = 24
+WIDTH, HEIGHT = 320, 180
+BARS = 4
+BAR = WIDTH // BARS
+
+
+def make_clip(path, frames, gop=2 * FPS):
+    """Frame i: bar k is gray level 8 * (k-th base-32 digit of i)."""
+    proc = subprocess.Popen(
+        ["ffmpeg", "-y", "-loglevel", "error", "-f", "rawvideo", "-pix_fmt", "gray",
+         "-s", f"{WIDTH}x{HEIGHT}", "-r", str(FPS), "-i", "-", "-c:v", "libx264",
+         "-preset", "ultrafast", "-g", str(gop), "-pix_fmt", "yuv420p",
+         "-movflags", "+faststart", str(path)],
+        stdin=subprocess.PIPE)
+    frame = np.zeros((HEIGHT, WIDTH), np.uint8)
+    for i in range(frames):
+        for k in range(BARS):
+            frame[:, k * BAR:(k + 1) * BAR] = (i >> (5 * k) & 31) * 8
+        proc.stdin.write(frame.tobytes())
+    proc.stdin.close()
+    if proc.wait():
+        raise RuntimeError("ffmpeg failed")
+
+
+def frame_index(image):
+    return sum(int(round(image[HEIGHT // 2, k * BAR + BAR // 2, 0] / 8)) << (5 * k)
+               for k in range(BARS))
+
+
+def legacy_last(path):
+    cap = cv2.VideoCapture(str(path))
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    cap.set(cv2.CAP_PROP_POS_FRAMES, total - 1)
+    ok, image = cap.read()
+    cap.release()
+    return frame_index(image) if ok else None
+
+
+def full_decode(path):
+    cap = cv2.VideoCapture(str(path))
+    count, last = 0, None
+    while True:
+        ok, image = cap.read()
+        if not ok:
+            break
+        count, last = count + 1, image
+    cap.release()
+    return count, frame_index(last)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--minutes", type=float, default=10)
+    args = parser.parse_args()
+    frames = int(args.minutes * 60 * FPS)
+    checks = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        clip = os.path.join(tmp, "long clip.mp4")
+        make_clip(clip, frames)
+        (count, _), full_s = timed(full_decode, clip)
+        print(f"   {args.minutes:g} min clip, {frames} frames; full decode {full_s:.2f}s")
+
+        # 1. Last frame
+        legacy, legacy_s = timed(legacy_last, clip)
+        extractor = FrameExtractor(os.path.join(tmp, "frames"))
+        last, new_s = timed(extractor.read, clip, "last")
+        got = frame_index(last[0].image)
+        ok = got == frames - 1 and extractor.decoded < 4 * FPS and new_s < full_s / 5
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Last frame #{got} (legacy #{legacy}, {legacy_s * 1000:.0f} ms): "
+              f"{new_s * 1000:.0f} ms, {extractor.decoded} frames decoded of {count}")
+
+        # 2. Evenly spaced, one pass
+        extractor.decoded = 0
+        spaced, spaced_s = timed(extractor.read, clip, 6)
+        expected = [round(i * frames / 5) for i in range(5)] + [frames - 1]
+        got = [frame_index(f.image) for f in spaced]
+        ok = got == expected and spaced_s < full_s / 2
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} 6 spaced frames {got} in {spaced_s * 1000:.0f} ms, "
+              f"{extractor.decoded} decoded")
+
+        # 3. Truncated file: the header still claims every frame
+        truncated = os.path.join(tmp, "truncated.mp4")
+        with open(clip, 'rb') as src, open(truncated, 'wb') as dst:
+            dst.write(src.read(int(os.path.getsize(clip) * 0.9)))
+        decodable, real_last = full_decode(truncated)
+        legacy = legacy_last(truncated)
+        extractor.decoded = 0
+        last = extractor.read(truncated, "last")
+        got = frame_index(last[0].image)
+        ok = got == real_last
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Truncated ({decodable}/{frames} frames decodable): "
+              f"last #{got}, expected #{real_last}, legacy {legacy}; {extractor.decoded} decoded")
+
+        # 4. Cache by video hash
+        first, cold_s = timed(extractor.extract, clip, "last")
+        extractor.decoded = 0
+        again, warm_s = timed(extractor.extract, clip, "last")
+        ok = again == first and extractor.decoded == 0 and extractor.hits == 1
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Cached PNG: cold {cold_s * 1000:.0f} ms, warm {warm_s * 1000:.1f} ms")
+
+    return 0 if all(checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
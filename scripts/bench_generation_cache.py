@@ -0,0 +1,97 @@
+"""
+Check: re-running the same shots is served from the generation cache.
+
+Runs UltraCinePipeline twice over the same batch against an in-process
+fake Veo client (no API key, no network), then once more with one prompt
+changed. The second run must make zero Veo calls and cost $0; the third
+only regenerates the changed shot. Eviction by size is checked last.
+
+    python scripts/bench_generation_cache.py
+"""
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from poll_policy import PollPolicy
+
+
+class FakeVeo:
+    """Bare minimum of client.models / client.operations for the pipeline."""
+
+    def __init__(self, latency=0.2):
+        self.latency = latency
+        self.submits = 0
+        self.models = SimpleNamespace(generate_videos=self.generate_videos)
+        self.operations = SimpleNamespace(get=self.get)
+
+    def generate_videos(self, model, prompt, config=None):
+        self.submits += 1
+        payload = f"{model}|{prompt}".encode() * 2000
+        return SimpleNamespace(name=f"fake/{self.submits}", done=False, error=None,
+                               ready_at=time.monotonic() + self.latency, payload=payload, response=None)
+
+    def get(self, operation):
+        if time.monotonic() >= operation.ready_at:
+            video = SimpleNamespace(uri=None, video_bytes=operation.payload)
+            operation.done = True
+            operation.response = SimpleNamespace(generated_videos=[SimpleNamespace(video=video)])
+        return operation
+
+
+def make_pipeline(ultra_cine, tmp, client):
+    config = ultra_cine.ProjectConfig(
+        project_name="cache_bench",
+        output_dir=tmp,
+        cost_ledger_db=os.path.join(tmp, "cost_ledger.sqlite"),
+        poll_policy=PollPolicy(initial_delay=0.05, min_interval=0.05, max_interval=0.1, jitter=0),
+    )
+    pipeline = ultra_cine.UltraCinePipeline(api_key="fake", config=config)
+    pipeline.client = client
+    return pipeline
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        # ultra_cine logs to ./ultra_cine.log; keep it out of the repo
+        os.chdir(tmp)
+        import ultra_cine
+        ultra_cine.logging.getLogger().setLevel("WARNING")
+
+        shots = [ultra_cine.ShotConfig(shot_id=f"shot_{i}", prompt=f"Golden particles, take {i}",
+                                       use_audio=i % 2 == 0) for i in range(6)]
+        ok = True
+        for label, batch, expected_submits in (
+            ("first run", shots, 6),
+            ("same shots again", shots, 0),
+            ("one prompt changed", shots[:5] + [ultra_cine.ShotConfig(
+                shot_id="shot_5", prompt="Golden particles, new take", use_audio=False)], 1),
+        ):
+            client = FakeVeo()
+            pipeline = make_pipeline(ultra_cine, tmp, client)
+            start = time.monotonic()
+            results = pipeline.generate_shots(batch)
+            elapsed = time.monotonic() - start
+            summary = pipeline.get_summary()
+            good = client.submits == expected_submits and len(results) == len(batch)
+            if expected_submits == 0:
+                good &= pipeline.session_cost == 0
+            ok &= good
+            cache = summary["cache"]
+            print(f"{'✅' if good else '❌'} {label:<20} Veo calls {client.submits}  "
+                  f"cost {summary['costo_total_usd']:>7}  hits {cache['hits']} misses {cache['misses']}  "
+                  f"saved ${cache['saved_usd']:.2f}  {elapsed:.2f}s")
+
+        entries = pipeline.cache.stats()["entries"]
+        evicted = pipeline.cache.evict(max_bytes=0)
+        good = evicted == entries and pipeline.cache.stats()["entries"] == 0
+        good &= all(os.path.exists(r["path"]) for r in results)
+        ok &= good
+        print(f"{'✅' if good else '❌'} Evicting to 0 bytes dropped {evicted} entries, shots/ untouched")
+        os.chdir("/")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
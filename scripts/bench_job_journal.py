@@ -0,0 +1,176 @@
+"""
+Check: a pipeline killed mid-batch re-attaches to its Veo operations on restart.
+
+A worker process runs UltraCinePipeline over a batch against a fake Veo
+client whose operation names encode when they were submitted, so any
+process can poll them. Once every shot is journaled as `submitted` the
+worker gets SIGKILL. A fresh pipeline then calls resume_pending(): it must finish
+every shot with zero new submissions. Also checks that a torn last
+journal line is ignored, that project_log.json is written once per
+batch instead of once per shot, and that shots given up on after a poll
+timeout are charged once and re-attached (not resubmitted) on restart.
+
+    python scripts/bench_job_journal.py
+    python scripts/bench_job_journal.py --shots 24
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from job_journal import SUBMITTED, JobJournal
+from poll_policy import PollPolicy
+
+
+class FakeVeo:
+    """Operations are looked up by name, so they survive a process restart."""
+
+    def __init__(self, latency=1.0):
+        self.latency = latency
+        self.submits = 0
+        self.models = SimpleNamespace(generate_videos=self.generate_videos)
+        self.operations = SimpleNamespace(get=self.get)
+
+    def generate_videos(self, model, prompt, config=None):
+        self.submits += 1
+        name = f"fake/{time.time():.3f}/{self.submits}"
+        return SimpleNamespace(name=name, done=False, error=None, response=None)
+
+    def get(self, operation):
+        done = time.time() >= float(operation.name.split("/")[1]) + self.latency
+        response = None
+        if done:
+            video = SimpleNamespace(uri=None, video_bytes=operation.name.encode() * 5000)
+            response = SimpleNamespace(generated_videos=[SimpleNamespace(video=video)])
+        return SimpleNamespace(name=operation.name, done=done, error=None, response=response)
+
+
+def make_pipeline(ultra_cine, tmp, client, timeout=900.0):
+    config = ultra_cine.ProjectConfig(
+        project_name="journal_bench",
+        output_dir=tmp,
+        cost_ledger_db=os.path.join(tmp, "cost_ledger.sqlite"),
+        use_cache=False,
+        max_concurrent_shots=64,
+        poll_policy=PollPolicy(initial_delay=0.05, min_interval=0.05, max_interval=0.1, jitter=0,
+                               timeout=timeout),
+    )
+    pipeline = ultra_cine.UltraCinePipeline(api_key="fake", config=config)
+    pipeline.client = client
+    return pipeline
+
+
+def make_shots(ultra_cine, n, prefix="shot"):
+    return [ultra_cine.ShotConfig(shot_id=f"{prefix}_{i}", prompt=f"Gold leaf drifting, take {i}",
+                                  use_audio=i % 2 == 0) for i in range(n)]
+
+
+def worker(tmp, n):
+    os.chdir(tmp)
+    import ultra_cine
+    ultra_cine.logging.getLogger().setLevel("WARNING")
+    # Long enough that the batch is still in flight when it gets killed
+    pipeline = make_pipeline(ultra_cine, tmp, FakeVeo(latency=60))
+    pipeline.generate_shots(make_shots(ultra_cine, n))
+
+
+def submitted(journal_path):
+    if not os.path.exists(journal_path):
+        return 0
+    with open(journal_path, encoding="utf-8") as f:
+        return sum(1 for line in f if f'"state": "{SUBMITTED}"' in line)
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(sys.argv[2], int(sys.argv[3]))
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shots", type=int, default=12)
+    args = parser.parse_args()
+    checks = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        journal_path = os.path.join(tmp, "journal_bench", "journal.jsonl")
+
+        # 1. Crash with every shot submitted and none downloaded
+        proc = subprocess.Popen([sys.executable, __file__, "--worker", tmp, str(args.shots)])
+        deadline = time.monotonic() + 60
+        while submitted(journal_path) < args.shots and time.monotonic() < deadline:
+            time.sleep(0.05)
+        proc.send_signal(signal.SIGKILL)
+        proc.wait()
+        in_flight = len(JobJournal(journal_path, compact=False).in_flight())
+        ok = in_flight == args.shots
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Worker killed with {in_flight}/{args.shots} shots in flight")
+
+        # 2. Torn last line from the crash is skipped
+        with open(journal_path, "a", encoding="utf-8") as f:
+            f.write('{"job": "shot_0_vA", "state": "do')
+        ok = len(JobJournal(journal_path).in_flight()) == args.shots
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Partial trailing record ignored")
+
+        # 3. Restart: re-attach, no new submissions
+        os.chdir(tmp)
+        import ultra_cine
+        ultra_cine.logging.getLogger().setLevel("WARNING")
+        client = FakeVeo(latency=0.2)
+        pipeline = make_pipeline(ultra_cine, tmp, client)
+        log_writes = []
+        save = pipeline._save_project_log
+        pipeline._save_project_log = lambda: (log_writes.append(1), save())
+        start = time.monotonic()
+        results = pipeline.resume_pending()
+        elapsed = time.monotonic() - start
+        ok = (client.submits == 0 and len(results) == args.shots
+              and all(os.path.exists(r["path"]) for r in results)
+              and not pipeline.journal.in_flight())
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Restart finished {len(results)} shots with "
+              f"{client.submits} new Veo submissions in {elapsed:.2f}s")
+
+        # 4. One project_log.json write per batch
+        log_writes.clear()
+        pipeline.generate_shots(make_shots(ultra_cine, args.shots))
+        ok = len(log_writes) == 1 and client.submits == args.shots
+        checks.append(ok)
+        with open(os.path.join(tmp, "journal_bench", "project_log.json"), encoding="utf-8") as f:
+            logged = len(json.load(f)["shots"])
+        print(f"{'✅' if ok else '❌'} {args.shots} new shots: project_log.json written "
+              f"{len(log_writes)} time(s), {logged} shots logged this session")
+
+        # 5. Poll timeout: the operations stay resumable and are charged once
+        # Timeouts log one error + one warning per shot; expected here
+        ultra_cine.logging.getLogger().setLevel("CRITICAL")
+        slow = FakeVeo(latency=1.0)
+        impatient = make_pipeline(ultra_cine, tmp, slow, timeout=0.3)
+        spend = impatient.ledger.month_spend()
+        results = impatient.generate_shots(make_shots(ultra_cine, args.shots, prefix="slow"))
+        charged = impatient.ledger.month_spend() - spend
+        in_flight = len(impatient.journal.in_flight())
+        client = FakeVeo(latency=1.0)
+        pipeline = make_pipeline(ultra_cine, tmp, client)
+        resumed = pipeline.resume_pending()
+        ultra_cine.logging.getLogger().setLevel("WARNING")
+        ok = (not results and in_flight == args.shots and charged > 0
+              and client.submits == 0 and len(resumed) == args.shots
+              and abs(pipeline.ledger.month_spend() - spend - charged) < 1e-9)
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Poll timeout on {args.shots} shots, then restart: "
+              f"{in_flight} left resumable, ${charged:.2f} charged once, "
+              f"{client.submits} new Veo submissions, {len(resumed)} finished")
+        os.chdir("/")
+
+    return 0 if all(checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
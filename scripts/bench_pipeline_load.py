@@ -0,0 +1,126 @@
+"""
+Load test: UltraCinePipeline throughput, polling and cost accounting against a fake Veo.
+
+Runs batches of hundreds of shots through the real pipeline (scheduler,
+rate limiter, poll policy, journal, ledger, downloads) with FakeVeoClient
+standing in for the API. Time is compressed with --time-scale, and every
+rate below is reported in real-time equivalents. One run per
+max_concurrent_shots setting, plus one with safety_buffer < 1 that
+submits faster than the fake's quota.
+
+Reported per run: shots/min, polls per shot, quota errors, failed
+generations, and whether session cost, ledger spend and reservations add
+up exactly.
+
+    python scripts/bench_pipeline_load.py
+    python scripts/bench_pipeline_load.py --shots 500 --concurrency 8 32 --failure-rate 0.1
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+from poll_policy import PollPolicy
+from veo_client import FakeVeoClient
+
+QUOTA_PER_MINUTE = 20
+
+
+def run(ultra_cine, tmp, label, args, max_concurrent, safety_buffer=1.2):
+    scale = args.time_scale
+    defaults = PollPolicy()
+    config = ultra_cine.ProjectConfig(
+        project_name=label,
+        output_dir=tmp,
+        cost_ledger_db=os.path.join(tmp, label, "cost_ledger.sqlite"),
+        use_cache=False,
+        monthly_budget_usd=1e9,
+        max_concurrent_shots=max_concurrent,
+        requests_per_minute=QUOTA_PER_MINUTE / scale,
+        poll_requests_per_minute=60 / scale,
+        download_requests_per_minute=30 / scale,
+        safety_buffer=safety_buffer,
+        quota_window_seconds=60 * scale,
+        poll_policy=PollPolicy(initial_delay=defaults.initial_delay * scale,
+                               min_interval=defaults.min_interval * scale,
+                               max_interval=defaults.max_interval * scale,
+                               timeout=defaults.timeout * scale,
+                               factor=defaults.factor, jitter=defaults.jitter),
+    )
+    client = FakeVeoClient(latency=(args.min_latency, args.max_latency),
+                           failure_rate=args.failure_rate, quota_per_minute=QUOTA_PER_MINUTE,
+                           time_scale=scale, seed=max_concurrent)
+    pipeline = ultra_cine.UltraCinePipeline(api_key=None, config=config, client=client)
+    shots = [ultra_cine.ShotConfig(shot_id=f"shot_{i:04d}", prompt=f"Gold leaf drifting, take {i}",
+                                   use_audio=i % 3 != 0) for i in range(args.shots)]
+
+    start = time.monotonic()
+    results = pipeline.generate_shots(shots)
+    minutes = (time.monotonic() - start) / scale / 60
+
+    stats = client.stats()
+    expected_cost = sum(r["cost_usd"] for r in results)
+    ledger_spend = pipeline.ledger.month_spend()
+    accounted = (len(results) == stats["completed"]
+                 and abs(pipeline.session_cost - expected_cost) < 1e-6
+                 and abs(ledger_spend - expected_cost) < 1e-6
+                 and abs(pipeline.reserved_cost) < 1e-6
+                 and pipeline.ledger.reserved() == 0)
+    return {
+        "label": label,
+        "done": len(results),
+        "shots_per_min": len(results) / minutes if minutes else 0.0,
+        "polls_per_shot": stats["polls"] / max(1, stats["submits"]),
+        "quota_errors": stats["quota_errors"],
+        "failures": stats["failures"],
+        "cost": pipeline.session_cost,
+        "accounted": accounted,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shots", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--min-latency", type=float, default=60.0, help="seconds per generation")
+    parser.add_argument("--max-latency", type=float, default=120.0)
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--time-scale", type=float, default=0.01,
+                        help="wall seconds per simulated second")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # ultra_cine logs to ./ultra_cine.log; keep it out of the repo
+        os.chdir(tmp)
+        import ultra_cine
+        logging.getLogger().setLevel("CRITICAL")
+
+        runs = [run(ultra_cine, tmp, f"concurrency_{n}", args, n) for n in args.concurrency]
+        over = run(ultra_cine, tmp, "over_quota", args, max(args.concurrency), safety_buffer=0.5)
+        os.chdir("/")
+
+    print(f"   {args.shots} shots, latency {args.min_latency:g}-{args.max_latency:g}s, "
+          f"failure rate {args.failure_rate:g}, fake quota {QUOTA_PER_MINUTE}/min\n")
+    print(f"   {'run':<16} {'done':>5} {'shots/min':>10} {'polls/shot':>11} "
+          f"{'429s':>5} {'failed':>7} {'cost':>10}")
+    for r in runs + [over]:
+        print(f"{'✅' if r['accounted'] else '❌'} {r['label']:<16} {r['done']:>5} "
+              f"{r['shots_per_min']:>10.1f} {r['polls_per_shot']:>11.1f} {r['quota_errors']:>5} "
+              f"{r['failures']:>7} {'$' + format(r['cost'], '.2f'):>10}")
+
+    checks = [r["accounted"] for r in runs + [over]]
+    scaling = all(b["shots_per_min"] > a["shots_per_min"] * 1.2
+                  for a, b in zip(runs, runs[1:]) if a["shots_per_min"] < QUOTA_PER_MINUTE / 1.2 * 0.8)
+    checks.append(scaling)
+    print(f"\n{'✅' if scaling else '❌'} Throughput grows with concurrency until the submit rate limit")
+    within_quota = all(r["quota_errors"] == 0 for r in runs) and over["quota_errors"] > 0
+    checks.append(within_quota)
+    print(f"{'✅' if within_quota else '❌'} No 429s with safety_buffer 1.2; "
+          f"{over['quota_errors']} with 0.5")
+    return 0 if all(checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
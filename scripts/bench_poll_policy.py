@@ -0,0 +1,89 @@
+"""
+Benchmark: polls per shot and detection delay for the Veo polling policies.
+
+Simulates operations whose completion times follow a log-normal around
+`--typical` seconds and compares, on a simulated clock:
+
+- the old loop (poll every 2s),
+- PollPolicy defaults (initial delay, exponential backoff with cap),
+- PollPolicy learned from a project_log.json history of earlier shots.
+
+Reports average polls per shot (quota spent) and average delay between
+the operation finishing and the pipeline noticing.
+
+    python scripts/bench_poll_policy.py
+    python scripts/bench_poll_policy.py --typical 45 --shots 500
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+from poll_policy import PollHistory, PollPolicy
+
+MODEL = "veo-3.1-generate-preview"
+
+
+class FixedInterval:
+    """The `while not operation.done: time.sleep(2)` loop."""
+    timeout = float('inf')
+
+    def next_delay(self, polls, rng=None):
+        return 2.0
+
+
+def simulate(policy, durations, rng):
+    """(polls, detection delay) per shot."""
+    results = []
+    for duration in durations:
+        t = polls = 0
+        while True:
+            t += policy.next_delay(polls, rng)
+            polls += 1
+            if t >= duration or t > policy.timeout:
+                break
+        results.append((polls, t - duration))
+    return results
+
+
+def report(name, results):
+    polls = sum(p for p, _ in results) / len(results)
+    delay = sum(d for _, d in results) / len(results)
+    worst = max(d for _, d in results)
+    print(f"{name:<22}{polls:>12.1f}{delay:>13.1f}s{worst:>12.1f}s")
+    return polls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--typical", type=float, default=90.0, help="median generation time (s)")
+    parser.add_argument("--spread", type=float, default=0.25, help="log-normal sigma")
+    parser.add_argument("--shots", type=int, default=300)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    history_runs = [rng.lognormvariate(0, args.spread) * args.typical for _ in range(30)]
+    durations = [rng.lognormvariate(0, args.spread) * args.typical for _ in range(args.shots)]
+
+    # History as an earlier session would have left it in project_log.json
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "project_log.json")
+        with open(log_path, 'w', encoding='utf-8') as f:
+            json.dump({"shots": [{"model": MODEL, "generation_seconds": round(d, 1)}
+                                 for d in history_runs]}, f)
+        learned = PollHistory.from_log(log_path).policy_for(MODEL)
+
+    print(f"{args.shots} shots, median {args.typical:.0f}s; learned first poll at "
+          f"{learned.initial_delay:.0f}s\n")
+    print(f"{'policy':<22}{'polls/shot':>12}{'avg delay':>14}{'worst delay':>13}")
+    fixed = report("fixed 2s (old)", simulate(FixedInterval(), durations, rng))
+    report("PollPolicy default", simulate(PollPolicy(), durations, rng))
+    smart = report("PollPolicy learned", simulate(learned, durations, rng))
+    print(f"\n📉 {fixed / smart:.1f}x fewer poll requests with the learned policy")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
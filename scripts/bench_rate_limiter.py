@@ -0,0 +1,140 @@
+"""
+Check: token-bucket rate limiter against a fake clock, threads and processes.
+
+1. Fake clock: a client calls acquire() as fast as it can for a simulated
+   hour; the achieved rate must match the configured limit and no 60s
+   window may exceed burst + limit.
+2. Threads: 8 threads share one in-memory bucket in real time.
+3. Processes: 3 processes share a SQLite-backed bucket in real time.
+
+Prints achieved vs configured rate and exits non-zero on a violation.
+
+    python scripts/bench_rate_limiter.py
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from rate_limiter import RateLimiter, SharedTokenBucket, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def peak_window(stamps, window=60.0):
+    """Most calls in any `window`-second sliding window."""
+    peak = start = 0
+    for end, t in enumerate(stamps):
+        while t - stamps[start] >= window:
+            start += 1
+        peak = max(peak, end - start + 1)
+    return peak
+
+
+def check_fake_clock(per_minute=20, burst=5, minutes=60):
+    clock = FakeClock()
+    limiter = RateLimiter({"submit": per_minute, "poll": 4 * per_minute},
+                          burst={"submit": burst}, clock=clock, sleep=clock.sleep)
+    stamps = {"submit": [], "poll": []}
+    for kind in stamps:
+        # Each bucket runs its own simulated hour
+        clock.now = 0.0
+        while clock.now < minutes * 60:
+            limiter.acquire(kind)
+            stamps[kind].append(clock.now)
+
+    ok = True
+    for kind, configured in (("submit", per_minute), ("poll", 4 * per_minute)):
+        calls = stamps[kind]
+        achieved = len(calls) / (calls[-1] / 60)
+        cap = limiter.buckets[kind].capacity
+        peak = peak_window(calls)
+        good = abs(achieved - configured) / configured < 0.05 and peak <= configured + cap
+        ok &= good
+        print(f"  {kind:<8} configured {configured:>5}/min  achieved {achieved:>7.2f}/min  "
+              f"peak 60s window {peak:>4} (≤ {configured + cap:.0f})  {'✅' if good else '❌'}")
+    return ok
+
+
+def _hammer(bucket, stamps, until):
+    while time.time() < until:
+        bucket.acquire()
+        stamps.append(time.time())
+
+
+def allowed_calls(per_minute, burst, started, stamps):
+    """Burst plus refill over the span actually covered by the calls."""
+    return burst + per_minute / 60 * (max(stamps) - started) + 1
+
+
+def check_threads(per_minute=600, burst=5, seconds=3.0, threads=8):
+    bucket = TokenBucket(per_minute, burst, clock=time.time)
+    stamps = []
+    started = time.time()
+    until = started + seconds
+    workers = [threading.Thread(target=_hammer, args=(bucket, stamps, until)) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    allowed = allowed_calls(per_minute, burst, started, stamps)
+    good = len(stamps) <= allowed
+    print(f"  {threads} threads: {len(stamps)} calls (allowed ≤ {allowed:.0f})  "
+          f"{'✅' if good else '❌'}")
+    return good
+
+
+def _process_worker(path, per_minute, burst, until, queue):
+    bucket = SharedTokenBucket(path, "veo:submit", per_minute, burst)
+    stamps = []
+    _hammer(bucket, stamps, until)
+    queue.put(stamps)
+
+
+def check_processes(per_minute=300, burst=3, seconds=3.0, processes=3):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "ratelimit.sqlite")
+        SharedTokenBucket(path, "veo:submit", per_minute, burst)
+        queue = multiprocessing.Queue()
+        started = time.time()
+        until = started + seconds
+        procs = [multiprocessing.Process(target=_process_worker,
+                                         args=(path, per_minute, burst, until, queue))
+                 for _ in range(processes)]
+        for p in procs:
+            p.start()
+        per_process = [queue.get() for _ in procs]
+        for p in procs:
+            p.join()
+    counts = [len(s) for s in per_process]
+    allowed = allowed_calls(per_minute, burst, started, [t for s in per_process for t in s])
+    good = sum(counts) <= allowed
+    print(f"  {processes} processes: {'+'.join(map(str, counts))} = {sum(counts)} calls "
+          f"(allowed ≤ {allowed:.0f})  {'✅' if good else '❌'}")
+    return good
+
+
+def main():
+    print("Fake clock, 1 simulated hour:")
+    ok = check_fake_clock()
+    print("Real time, shared in-memory bucket:")
+    ok &= check_threads()
+    print("Real time, SQLite bucket shared across processes:")
+    ok &= check_processes()
+    print(f"\n{'✅' if ok else '❌'} Rate never exceeded the configured limit")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
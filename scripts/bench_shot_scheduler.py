@@ -0,0 +1,91 @@
+"""
+Benchmark: serial vs concurrent shot scheduling against a fake Veo client.
+
+Each fake operation finishes `--latency` seconds (±50%) after submission
+and each download takes `--download` seconds. Submissions go through the
+same fixed-interval limiter UltraCinePipeline uses, so the run also shows
+the requests-per-minute ceiling is respected. Exits non-zero if a shot
+is lost or the request rate is exceeded.
+
+    python scripts/bench_shot_scheduler.py
+    python scripts/bench_shot_scheduler.py --shots 40 --concurrency 8 --latency 1.0
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+from shot_scheduler import ShotJob, ShotScheduler
+
+
+class FakeClient:
+    """Operations that complete after a random delay; counts every request."""
+
+    def __init__(self, latency, download, requests_per_minute, seed=0):
+        self.latency = latency
+        self.download = download
+        self.min_interval = 60.0 / requests_per_minute
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.submits = []
+        self.polls = 0
+        self.last_submit = 0.0
+
+    def submit(self, job):
+        # Mirrors UltraCinePipeline._wait_rate_limit
+        wait = self.min_interval - (time.monotonic() - self.last_submit)
+        if wait > 0:
+            time.sleep(wait)
+        self.last_submit = time.monotonic()
+        self.submits.append(self.last_submit)
+        ready_at = self.last_submit + self.latency * self.rng.uniform(0.5, 1.5)
+        job.operation = SimpleNamespace(done=False, ready_at=ready_at)
+
+    def poll(self, job):
+        with self.lock:
+            self.polls += 1
+        job.operation.done = time.monotonic() >= job.operation.ready_at
+
+    def finish(self, job):
+        time.sleep(self.download)
+        return {"shot_id": job.shot, "polls": job.polls}
+
+
+def run(args, concurrency):
+    client = FakeClient(args.latency, args.download, args.rpm)
+    scheduler = ShotScheduler(client.submit, client.poll, client.finish,
+                              max_in_flight=concurrency, poll_interval=args.poll)
+    start = time.monotonic()
+    jobs = scheduler.run([ShotJob(f"shot_{i:03d}") for i in range(args.shots)])
+    elapsed = time.monotonic() - start
+
+    # Worst submissions-per-minute over any sliding 60s window
+    peak = max(sum(1 for t in client.submits if s <= t < s + 60) for s in client.submits)
+    ok = all(job.ok for job in jobs) and peak <= args.rpm
+    print(f"{concurrency:>11}{elapsed:>9.1f}s{args.shots / elapsed * 60:>12.1f}"
+          f"{client.polls:>8}{peak:>10}  {'✅' if ok else '❌'}")
+    return ok, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--shots", type=int, default=24)
+    parser.add_argument("--concurrency", type=int, default=6)
+    parser.add_argument("--latency", type=float, default=2.0, help="mean seconds per fake generation")
+    parser.add_argument("--download", type=float, default=0.2, help="seconds per fake download")
+    parser.add_argument("--poll", type=float, default=0.1, help="poll interval in seconds")
+    parser.add_argument("--rpm", type=int, default=600, help="submissions per minute allowed")
+    args = parser.parse_args()
+
+    print(f"{args.shots} shots, ~{args.latency}s each, limit {args.rpm} submits/min\n")
+    print(f"{'concurrency':>11}{'wall':>10}{'shots/min':>12}{'polls':>8}{'peak rpm':>10}")
+    ok_serial, serial = run(args, 1)
+    ok_parallel, parallel = run(args, args.concurrency)
+    print(f"\n⚡ {serial / parallel:.1f}x faster with {args.concurrency} shots in flight")
+    return 0 if ok_serial and ok_parallel else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""
+Check: streaming resize keeps peak RSS under the configured ceiling.
+
+Writes a synthetic 30k x 30k RGB PNG row by row (cycling through all five
+PNG filter types so the strip decoder sees every one), then downscales it
+to 3840px in a fresh subprocess and compares that process's peak RSS with
+`--limit`. A small image is also streamed and compared pixel-for-pixel
+against a regular full decode going through the same reduce/resize steps.
+Exits non-zero on failure.
+
+    python scripts/bench_streaming_resize.py
+    python scripts/bench_streaming_resize.py --size 12000 --limit 256
+"""
+import argparse
+import json
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+from PIL import Image
+
+from bench_thumbnails import peak_rss_mb
+from streaming_resize import PNG_SIGNATURE, plan, stream_resize
+
+
+def _chunk(ctype, data):
+    return (struct.pack('>I', len(data)) + ctype + data
+            + struct.pack('>I', zlib.crc32(ctype + data) & 0xffffffff))
+
+
+def _filter_row(ftype, row, prev, bpp=3):
+    """Encode one row with PNG filter `ftype` (vectorized; predictors use raw bytes)."""
+    row = row.astype(np.int16)
+    prev = prev.astype(np.int16)
+    left = np.concatenate([np.zeros(bpp, np.int16), row[:-bpp]])
+    upleft = np.concatenate([np.zeros(bpp, np.int16), prev[:-bpp]])
+    if ftype == 0:
+        pred = 0
+    elif ftype == 1:
+        pred = left
+    elif ftype == 2:
+        pred = prev
+    elif ftype == 3:
+        pred = (left + prev) // 2
+    else:
+        p = left + prev - upleft
+        pa, pb, pc = np.abs(p - left), np.abs(p - prev), np.abs(p - upleft)
+        pred = np.where((pa <= pb) & (pa <= pc), left, np.where(pb <= pc, prev, upleft))
+    return bytes([ftype]) + ((row - pred) & 0xff).astype(np.uint8).tobytes()
+
+
+def write_synthetic_png(path, width, height):
+    """Gradient plus a diagonal pattern, streamed so the writer stays small too."""
+    x = np.arange(width, dtype=np.int32)
+    prev = np.zeros(width * 3, np.uint8)
+    compressor = zlib.compressobj(1)
+    with open(path, 'wb') as f:
+        f.write(PNG_SIGNATURE)
+        f.write(_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)))
+        for y in range(height):
+            rgb = np.empty((width, 3), np.uint8)
+            rgb[:, 0] = (x * 255 // max(width - 1, 1))
+            rgb[:, 1] = (y * 255 // max(height - 1, 1))
+            rgb[:, 2] = ((x + y) * 7) & 0xff
+            row = rgb.reshape(-1)
+            data = compressor.compress(_filter_row(y % 5, row, prev))
+            if data:
+                f.write(_chunk(b'IDAT', data))
+            prev = row
+        f.write(_chunk(b'IDAT', compressor.flush()))
+        f.write(_chunk(b'IEND', b''))
+
+
+def worker(source_path, target, limit_mb, dest_path):
+    start = time.perf_counter()
+    img, original = stream_resize(source_path, target, limit_mb)
+    img.save(dest_path, 'WEBP', quality=90)
+    print(json.dumps({
+        'seconds': time.perf_counter() - start,
+        'peak_rss_mb': peak_rss_mb(),
+        'original': original,
+        'size': img.size,
+    }))
+
+
+def check_pixels(tmp):
+    """Streamed output must equal a full decode through the same steps."""
+    path = os.path.join(tmp, 'small.png')
+    write_synthetic_png(path, 1531, 977)
+    target = 300
+    factor, _ = plan(1531, 977, target, 3, 512)
+    streamed, _ = stream_resize(path, target, memory_limit_mb=512)
+
+    # Tiny strips so plenty of strip boundaries are exercised
+    tiny, _ = stream_resize(path, target, memory_limit_mb=512, strip_rows=factor * 2)
+
+    with Image.open(path) as img:
+        full = img.reduce(factor) if factor > 1 else img.copy()
+    full = full.resize(streamed.size, Image.Resampling.LANCZOS)
+    return (np.array_equal(np.asarray(streamed), np.asarray(full))
+            and np.array_equal(np.asarray(tiny), np.asarray(full)))
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        worker(sys.argv[2], int(sys.argv[3]), int(sys.argv[4]), sys.argv[5])
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size", type=int, default=30_000, help="synthetic source is size x size")
+    parser.add_argument("--target", type=int, default=3840)
+    parser.add_argument("--limit", type=int, default=512, help="memory ceiling in MB")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ok = check_pixels(tmp)
+        print(f"{'✅' if ok else '❌'} Streamed pixels match a full decode (strip boundaries included)")
+
+        source = os.path.join(tmp, 'huge.png')
+        start = time.perf_counter()
+        write_synthetic_png(source, args.size, args.size)
+        print(f"🖼️  Wrote {args.size}x{args.size} PNG "
+              f"({os.path.getsize(source) / 1e6:.0f} MB) in {time.perf_counter() - start:.0f}s")
+
+        full_mb = args.size * args.size * 4 / 1024 / 1024
+        proc = subprocess.run(
+            [sys.executable, __file__, '--worker', source, str(args.target), str(args.limit),
+             os.path.join(tmp, 'out.webp')],
+            check=True, capture_output=True, text=True,
+        )
+        res = json.loads(proc.stdout.strip().splitlines()[-1])
+        print(f"⚡ Streamed to {res['size'][0]}x{res['size'][1]} in {res['seconds']:.1f}s")
+        print(f"📈 Peak RSS {res['peak_rss_mb']:.0f} MB (limit {args.limit} MB, "
+              f"a full decode needs ~{full_mb:.0f} MB for pixels alone)")
+
+        under = res['peak_rss_mb'] <= args.limit
+        print(f"{'✅' if under else '❌'} Peak RSS {'within' if under else 'over'} the configured limit")
+        return 0 if ok and under else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,107 @@
+"""
+Benchmark: incremental SyncState scans vs a full listdir on a large folder.
+
+Creates a synthetic images folder (50k small files by default) and times:
+the old `os.listdir` + filter the sync scripts used to run, the first scan
+(hashes everything), a rescan with nothing changed (folder mtime fast path),
+a rescan after adding, touching and renaming files, and a `--since` scan.
+Exits non-zero if a scan reports the wrong changes.
+
+    python scripts/bench_sync_state.py
+    python scripts/bench_sync_state.py --files 200000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from sync_state import SyncState
+
+EXTENSIONS = ('.webp', '.png', '.jpg', '.jpeg')
+
+
+def populate(folder, count):
+    for i in range(count):
+        with open(os.path.join(folder, f"artwork-{i:06d}.webp"), 'wb') as f:
+            f.write(b'RIFF' + i.to_bytes(4, 'little') + b'WEBPVP8 ' + os.urandom(64))
+
+
+def age(folder, seconds=3600):
+    """Backdate the folder so the scan trusts its mtime (see RACY_SECONDS)."""
+    past = time.time() - seconds
+    os.utime(folder, (past, past))
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34}{elapsed * 1000:>10.1f} ms")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=50_000)
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        folder = os.path.join(tmp, 'artworks')
+        os.mkdir(folder)
+        start = time.perf_counter()
+        populate(folder, args.files)
+        age(folder)
+        print(f"🖼️  {args.files} files written in {time.perf_counter() - start:.1f}s\n")
+        state_path = os.path.join(tmp, '.database.sync-state.json')
+
+        timed("listdir + filter (old)",
+              lambda: sorted(f for f in os.listdir(folder) if f.lower().endswith(EXTENSIONS)))
+
+        state = SyncState(state_path, folder)
+        first = timed("first scan (hash all)", state.scan)
+        timed("save state", state.save)
+        ok &= len(first.added) == args.files
+
+        state = timed("load state", lambda: SyncState(state_path, folder))
+        same = timed("rescan, nothing changed", state.scan)
+        ok &= not same and same.skipped_scan
+        state.save()
+
+        # Same check without the folder fast path: stat every file, hash none
+        state.dir_mtime_ns = None
+        same = timed("rescan, stat only", state.scan)
+        ok &= not same and not same.skipped_scan
+        state.save()
+
+        time.sleep(0.05)
+        since = time.time()
+        new_names = [f"new-{i}.webp" for i in range(100)]
+        for name in new_names:
+            with open(os.path.join(folder, name), 'wb') as f:
+                f.write(os.urandom(128))
+        for i in range(100):
+            os.rename(os.path.join(folder, f"artwork-{i:06d}.webp"),
+                      os.path.join(folder, f"renamed-{i:06d}.webp"))
+        touched = os.path.join(folder, f"artwork-{args.files - 1:06d}.webp")
+        with open(touched, 'ab') as f:
+            f.write(b'edit')
+        age(folder)
+
+        state = SyncState(state_path, folder)
+        changes = timed("rescan, 100 new/100 renamed/1 edit", state.scan)
+        ok &= (len(changes.added) == 100 and len(changes.renamed) == 100
+               and len(changes.changed) == 1 and not changes.removed)
+
+        recent = timed("--since scan (just the edits)", lambda: SyncState(state_path, folder).scan(since))
+        # Renames keep their mtime, so only new and edited files are recent
+        ok &= len(recent.added) == 100 and len(recent.changed) == 1
+        state.save()
+
+        print(f"\n{'✅' if ok else '❌'} Scans reported the expected changes")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
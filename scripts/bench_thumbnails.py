@@ -0,0 +1,128 @@
+"""
+Benchmark: full-decode thumbnails vs `--fast-thumbs` reduced decoding.
+
+Generates synthetic JPEG and PNG sources, then builds a 500px thumbnail
+from each in a fresh subprocess per (mode, image) so peak RSS is measured
+in isolation. `limited` is `--fast-thumbs --max-memory 128`, which
+streams PNGs too big to decode whole under that ceiling. Exits non-zero
+if a `limited` run peaks over it.
+
+    python scripts/bench_thumbnails.py
+    python scripts/bench_thumbnails.py --width 12000 --height 9000 --images 2
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from hires_engine import RenderSettings, make_thumbnail
+
+LIMITED_MB = 128
+
+
+def full_decode_thumbnail(source_path, thumb_path, size):
+    """What process-hires.py used to do: decode everything, then shrink."""
+    Image.MAX_IMAGE_PIXELS = None
+    with Image.open(source_path) as img:
+        img.load()
+        img.thumbnail((size, size))
+        img.save(thumb_path, 'WEBP', quality=85)
+
+
+def worker(mode, source_path, out_dir):
+    start = time.perf_counter()
+    if mode == 'full':
+        full_decode_thumbnail(source_path, os.path.join(out_dir, 'thumb-full.webp'), 500)
+        drafted = False
+    else:
+        dest = os.path.join(out_dir, 'artworks', 'thumb.webp')
+        settings = RenderSettings(memory_limit_mb=LIMITED_MB if mode == 'limited' else 0)
+        res = make_thumbnail(source_path, dest, settings)
+        if res['status'] != 'ok':
+            raise RuntimeError(res['error'])
+        drafted = res['drafted']
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'seconds': elapsed, 'peak_rss_mb': peak_rss_mb(), 'drafted': drafted}))
+
+
+def peak_rss_mb():
+    # ru_maxrss survives exec on Linux (it would report the parent's peak),
+    # VmHWM is per address space
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def synthetic_source(path, width, height):
+    """Smooth gradient with noise: compresses like a photo, not like flat color."""
+    import numpy as np
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    x = np.linspace(0, 255, width, dtype=np.float32)[None, :]
+    rng = np.random.default_rng(0)
+    rgb = np.empty((height, width, 3), dtype=np.uint8)
+    rgb[..., 0] = (x + y) / 2
+    rgb[..., 1] = x
+    rgb[..., 2] = y
+    rgb += rng.integers(0, 16, size=(height, width, 3), dtype=np.uint8)
+    options = {'quality': 92} if path.endswith('.jpg') else {}
+    Image.fromarray(rgb).save(path, **options)
+
+
+def run(mode, source_path, out_dir):
+    proc = subprocess.run(
+        [sys.executable, __file__, '--worker', mode, source_path, out_dir],
+        check=True, capture_output=True, text=True,
+    )
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == '--worker':
+        worker(*sys.argv[2:5])
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--width", type=int, default=8000)
+    parser.add_argument("--height", type=int, default=6000)
+    parser.add_argument("--images", type=int, default=3, help="runs per format and mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"🖼️  Synthetic sources {args.width}x{args.height}")
+        sources = {}
+        for ext in ('jpg', 'png'):
+            sources[ext] = os.path.join(tmp, f"source.{ext}")
+            synthetic_source(sources[ext], args.width, args.height)
+
+        print(f"\n{'format':<8}{'mode':<9}{'s/image':>10}{'peak RSS':>12}  draft")
+        over = []
+        for ext, path in sources.items():
+            for mode in ('full', 'fast', 'limited'):
+                runs = [run(mode, path, tmp) for _ in range(args.images)]
+                secs = sum(r['seconds'] for r in runs) / len(runs)
+                peak = max(r['peak_rss_mb'] for r in runs)
+                print(f"{ext:<8}{mode:<9}{secs:>9.2f}s{peak:>9.0f} MB  {runs[0]['drafted']}")
+                if mode == 'limited' and peak > LIMITED_MB:
+                    over.append(f"{ext} {peak:.0f} MB")
+
+    if over:
+        print(f"\n❌ Peak RSS over the {LIMITED_MB} MB limit: {', '.join(over)}")
+        return 1
+    print(f"\n✅ Limited runs stayed within {LIMITED_MB} MB")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
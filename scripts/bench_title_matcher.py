@@ -0,0 +1,124 @@
+"""
+Benchmark: linear SequenceMatcher scan vs indexed TitleMatcher.
+
+Builds a synthetic catalog and notebook export (10k x 10k by default),
+times both matching paths and checks they agree. The legacy path is
+quadratic, so it only runs on a sample of notebook entries and the full
+runtime is extrapolated.
+
+    python scripts/bench_title_matcher.py
+    python scripts/bench_title_matcher.py --artworks 2000 --notes 2000 --legacy-sample 2000
+"""
+import argparse
+import random
+import time
+
+from title_matcher import DEFAULT_THRESHOLD, TitleMatcher, similar
+
+WORDS = [
+    "amy", "rocks", "johnny", "golden", "lagrimas", "oro", "divinos", "retrato",
+    "flores", "papel", "lata", "cantinflas", "celia", "cruz", "asucar", "marilyn",
+    "james", "munsters", "facefood", "vaivenes", "naturaleza", "amor", "noche",
+    "luz", "sombra", "azul", "rojo", "bilbao", "mar", "fuego", "baroque", "farrokh",
+]
+
+
+def synthetic_titles(rng, count):
+    return [
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))) + f" {i}"
+        for i in range(count)
+    ]
+
+
+def mutate(rng, title):
+    """Small typo so the entry needs the fuzzy path."""
+    chars = list(title)
+    pos = rng.randrange(len(chars))
+    chars[pos] = rng.choice("abcdefghijklmnopqrstuvwxyz ")
+    return "".join(chars)
+
+
+def build_inputs(n_artworks, n_notes, seed):
+    rng = random.Random(seed)
+    titles = synthetic_titles(rng, n_artworks)
+    artworks = [{"id": f"art-{i}", "title": t} for i, t in enumerate(titles)]
+
+    notes = []
+    for i in range(n_notes):
+        roll = rng.random()
+        if roll < 0.4:
+            src = rng.choice(artworks)
+            notes.append({"id": src["id"], "title": src["title"]})
+        elif roll < 0.8:
+            src = rng.choice(artworks)
+            notes.append({"id": f"note-{i}", "title": mutate(rng, src["title"])})
+        else:
+            notes.append({"id": f"note-{i}", "title": f"obra nueva {rng.random():.6f}"})
+    return artworks, notes
+
+
+def legacy_match(artworks, note):
+    """The original merge_metadata.py scan, kept verbatim for comparison."""
+    note_id = note.get('id')
+    for art in artworks:
+        if art.get('id') == note_id:
+            return art, 1.0
+
+    best_match = None
+    highest_ratio = 0.0
+    note_title = note.get('title', '').lower()
+    for art in artworks:
+        ratio = similar(note_title, art.get('title', '').lower())
+        if ratio > DEFAULT_THRESHOLD and ratio > highest_ratio:
+            highest_ratio = ratio
+            best_match = art
+    return best_match, highest_ratio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--artworks", type=int, default=10_000)
+    parser.add_argument("--notes", type=int, default=10_000)
+    parser.add_argument("--legacy-sample", type=int, default=100,
+                        help="notebook entries to run through the legacy scan")
+    parser.add_argument("--seed", type=int, default=2026)
+    args = parser.parse_args()
+
+    artworks, notes = build_inputs(args.artworks, args.notes, args.seed)
+    print(f"📦 {len(artworks)} artworks x {len(notes)} notebook entries")
+
+    start = time.perf_counter()
+    matcher = TitleMatcher(artworks)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    indexed = [matcher.match(note) for note in notes]
+    indexed_time = time.perf_counter() - start
+    matched = sum(1 for art, _ in indexed if art is not None)
+
+    sample = notes[:args.legacy_sample]
+    start = time.perf_counter()
+    legacy = [legacy_match(artworks, note) for note in sample]
+    legacy_time = time.perf_counter() - start
+    legacy_full = legacy_time / max(len(sample), 1) * len(notes)
+
+    mismatches = sum(
+        1 for (a, ra), (b, rb) in zip(legacy, indexed)
+        if a is not b or abs(ra - rb) > 1e-12
+    )
+
+    print(f"\n⚡ Indexed: build {build_time:.2f}s + match {indexed_time:.2f}s "
+          f"({matched} matched)")
+    print(f"🐢 Legacy:  {legacy_time:.2f}s for {len(sample)} entries "
+          f"(~{legacy_full:.0f}s extrapolated to {len(notes)})")
+    print(f"🚀 Speedup: ~{legacy_full / (build_time + indexed_time):.0f}x")
+
+    if mismatches:
+        print(f"❌ {mismatches}/{len(sample)} sampled entries disagree with the legacy scan")
+        return 1
+    print(f"✅ Indexed results identical to legacy scan on {len(sample)} sampled entries")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,222 @@
+"""
+Check: streaming video downloads resume, verify and keep memory flat.
+
+Serves a synthetic MP4-sized file from a local HTTP server that honours
+Range requests and can drop the connection part-way. Verifies that:
+
+- an interrupted download resumes with Range and ends byte-identical,
+- a server without Range support still completes (restart from zero),
+- a wrong expected sha256 is rejected and nothing lands at the destination,
+- a stale `.part` from another URI, or from a file that changed behind the
+  same URI (ETag / If-Range), is not resumed into a corrupt mix,
+- peak RSS of a streamed download stays flat while the old
+  `requests.get(uri).content` approach grows with the file size.
+
+    python scripts/bench_video_download.py
+    python scripts/bench_video_download.py --size-mb 400
+"""
+import argparse
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import requests
+
+import video_download
+from bench_thumbnails import peak_rss_mb
+from video_download import DownloadError, download, part_path, source_path
+
+
+class VideoHandler(BaseHTTPRequestHandler):
+    """GET /video.mp4 with Range and If-Range support; `cut_after` drops the first N connections early."""
+    path_on_disk = None
+    etag = None
+    cut_after = None      # bytes sent before dropping the connection
+    cuts_left = 0
+    ranges = True
+    requests_seen = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        size = os.path.getsize(cls.path_on_disk)
+        start = 0
+        range_header = self.headers.get("Range")
+        cls.requests_seen.append(range_header)
+        if_range = self.headers.get("If-Range")
+        if if_range is not None and if_range != cls.etag:
+            range_header = None
+        if range_header and cls.ranges:
+            start = int(range_header.split("=")[1].split("-")[0])
+            if start >= size:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{size - 1}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(size - start))
+        self.send_header("Content-Type", "video/mp4")
+        if cls.etag:
+            self.send_header("ETag", cls.etag)
+        self.end_headers()
+
+        limit = None
+        if cls.cuts_left > 0:
+            cls.cuts_left -= 1
+            limit = cls.cut_after
+        sent = 0
+        with open(cls.path_on_disk, 'rb') as f:
+            f.seek(start)
+            while True:
+                chunk = f.read(256 * 1024)
+                if not chunk:
+                    break
+                if limit is not None and sent + len(chunk) > limit:
+                    self.wfile.write(chunk[:limit - sent])
+                    self.wfile.flush()
+                    # Abrupt close: the client sees a short body
+                    self.connection.shutdown(2)
+                    return
+                self.wfile.write(chunk)
+                sent += len(chunk)
+
+
+def serve(path):
+    VideoHandler.path_on_disk = path
+    server = ThreadingHTTPServer(("127.0.0.1", 0), VideoHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/video.mp4"
+
+
+def make_video(path, size_mb):
+    digest = hashlib.sha256()
+    block = os.urandom(1024 * 1024)
+    with open(path, 'wb') as f:
+        for i in range(size_mb):
+            data = i.to_bytes(4, 'little') + block[4:]
+            f.write(data)
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def worker(mode, url, dest):
+    if mode == "legacy":
+        data = requests.get(url).content
+        with open(dest, 'wb') as f:
+            f.write(data)
+    else:
+        download(url, dest)
+    print(json.dumps({"peak_rss_mb": peak_rss_mb()}))
+
+
+def measure(mode, url, dest):
+    proc = subprocess.run([sys.executable, __file__, "--worker", mode, url, str(dest)],
+                          check=True, capture_output=True, text=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])["peak_rss_mb"]
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(*sys.argv[2:5])
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-mb", type=int, default=200)
+    args = parser.parse_args()
+    video_download.BACKOFF_SECONDS = 0.05
+    checks = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source.mp4")
+        sha = make_video(source, args.size_mb)
+        size = os.path.getsize(source)
+        server, url = serve(source)
+        shots = Path(tmp) / "shots" / "trans_rocks"
+
+        # 1. Two dropped connections, then resume with Range
+        VideoHandler.cut_after, VideoHandler.cuts_left = size // 3, 2
+        VideoHandler.requests_seen = []
+        dest = shots / "trans_rocks_vA.mp4"
+        info = download(url, dest, expected_size=size, expected_sha256=sha)
+        ok = info["sha256"] == sha and info["resumes"] == 2 and not part_path(dest).exists()
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Resumed after 2 drops: {info['attempts']} requests, "
+              f"ranges {VideoHandler.requests_seen}")
+
+        # 2. Server without Range support restarts from zero
+        VideoHandler.ranges, VideoHandler.cuts_left = False, 1
+        dest = shots / "trans_rocks_vB.mp4"
+        info = download(url, dest, expected_sha256=sha)
+        ok = info["sha256"] == sha and info["resumes"] == 0
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} No Range support: completed in {info['attempts']} requests")
+        VideoHandler.ranges = True
+
+        # 3. Checksum mismatch never reaches the destination
+        dest = shots / "trans_rocks_vC.mp4"
+        try:
+            download(url, dest, expected_sha256="0" * 64)
+            ok = False
+        except DownloadError:
+            ok = not dest.exists() and not part_path(dest).exists()
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Bad checksum rejected, nothing written")
+
+        # 4. Stale partials: a .part left by an older video for the same
+        #    shot/version must not be resumed into the new one
+        other = os.path.join(tmp, "other.mp4")
+        make_video(other, 8)
+        VideoHandler.path_on_disk, VideoHandler.etag = other, '"other"'
+        VideoHandler.cut_after, VideoHandler.cuts_left = 3 * 1024 * 1024, 1
+        dest = shots / "trans_rocks_vD.mp4"
+        try:
+            download(url + "?operation=old", dest, max_attempts=1)
+        except DownloadError:
+            pass
+        left_part = part_path(dest).exists() and source_path(dest).exists()
+        VideoHandler.path_on_disk, VideoHandler.etag = source, '"new"'
+        info = download(url + "?operation=new", dest)
+        ok = left_part and info["sha256"] == sha and info["resumes"] == 0
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Partial from another URI discarded, new video intact")
+
+        VideoHandler.path_on_disk, VideoHandler.etag = other, '"v1"'
+        VideoHandler.cut_after, VideoHandler.cuts_left = 3 * 1024 * 1024, 1
+        dest = shots / "trans_rocks_vE.mp4"
+        try:
+            download(url, dest, max_attempts=1)
+        except DownloadError:
+            pass
+        VideoHandler.path_on_disk, VideoHandler.etag = source, '"v2"'
+        info = download(url, dest)
+        ok = (info["sha256"] == sha and info["resumes"] == 0
+              and not source_path(dest).exists())
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} File changed behind the same URI: If-Range refetched it whole")
+        VideoHandler.etag = None
+
+        # 5. Memory: streamed vs buffered
+        legacy = measure("legacy", url, Path(tmp) / "legacy.mp4")
+        streamed = measure("stream", url, Path(tmp) / "stream.mp4")
+        ok = streamed < legacy and streamed < 100
+        checks.append(ok)
+        print(f"{'✅' if ok else '❌'} Peak RSS for {args.size_mb} MB: "
+              f"requests.get().content {legacy:.0f} MB, streamed {streamed:.0f} MB")
+        server.shutdown()
+
+    return 0 if all(checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
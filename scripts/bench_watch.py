@@ -0,0 +1,93 @@
+"""
+Check: --watch mode turns a burst of uploads into one catalog write.
+
+Starts the sync watcher on a temporary images folder and catalog (with
+inotify and with the polling fallback), drops a burst of files into the
+folder from another thread, and reports how long after the last file
+the catalog was published, how many batches/writes it took, and whether
+every file got an entry. Exits non-zero on failure.
+
+    python scripts/bench_watch.py
+    python scripts/bench_watch.py --files 500 --debounce 0.5
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import sync_naroa_gallery as sync
+from folder_watch import PollingWatcher, batches, open_watcher
+from sync_state import SyncState
+
+
+def upload(folder, count, pause):
+    for i in range(count):
+        path = os.path.join(folder, f"rocks-upload-{i:04d}.webp")
+        with open(path + '.part', 'wb') as f:
+            f.write(os.urandom(256))
+        # Browsers and rsync write to a temp name, then rename
+        os.rename(path + '.part', path)
+        time.sleep(pause)
+    return time.monotonic()
+
+
+def run(tmp, polling, files, debounce):
+    folder = os.path.join(tmp, f"artworks-{'poll' if polling else 'inotify'}")
+    os.mkdir(folder)
+    db_path = os.path.join(tmp, f"catalog-{'poll' if polling else 'inotify'}.json")
+    with open(db_path, 'w', encoding='utf-8') as f:
+        json.dump({"artworks": []}, f)
+    sync.IMAGES_DIR, sync.DB_PATH = folder, db_path
+
+    state = SyncState.for_catalog(db_path, folder)
+    quiet_log = io.StringIO()
+    with contextlib.redirect_stdout(quiet_log):
+        sync.sync(state)
+    watcher = open_watcher(folder, polling=polling, interval=0.1)
+    kind = "polling" if isinstance(watcher, PollingWatcher) else "inotify"
+
+    done = {}
+    thread = threading.Thread(target=lambda: done.setdefault('at', upload(folder, files, 0.002)))
+    thread.start()
+    writes = 0
+    batch_sizes = []
+    for names in batches(watcher, quiet=debounce, idle_timeout=debounce * 4 + 1):
+        batch_sizes.append(len(names) if names is not None else -1)
+        before = os.stat(db_path).st_mtime_ns
+        with contextlib.redirect_stdout(quiet_log):
+            sync.sync(state, names=sorted(names) if names is not None else None)
+        published = time.monotonic()
+        writes += os.stat(db_path).st_mtime_ns != before
+        if not thread.is_alive() and len(json.load(open(db_path))["artworks"]) == files:
+            break
+    thread.join()
+    watcher.close()
+
+    entries = json.load(open(db_path, encoding='utf-8'))["artworks"]
+    latency = published - done['at']
+    print(f"{kind:<8}{files:>6} files  {len(batch_sizes):>3} batches  {writes:>3} writes  "
+          f"published {latency:.2f}s after the last file")
+    return len(entries) == files and len({e['id'] for e in entries}) == files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--debounce", type=float, default=0.3)
+    args = parser.parse_args()
+
+    ok = True
+    with tempfile.TemporaryDirectory() as tmp:
+        for polling in (False, True):
+            ok &= run(tmp, polling, args.files, args.debounce)
+    print(f"\n{'✅' if ok else '❌'} Every uploaded file got exactly one catalog entry")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,247 @@
+"""
+Shared artwork catalog layer for the metadata scripts.
+
+Loads `database.json` / `artworks-metadata.json` style files once, whether
+the root is a bare list or an object wrapping the list (`{"artworks": [...]}`),
+normalizes image paths and keeps in-memory indexes by id, base id
+(hq-/web- prefixes stripped), image filename and series.
+
+    catalog = ArtworkCatalog.load('data/database.json')
+    entry = catalog.get('amy-rocks')
+    if not catalog.has_image('amy-rocks.webp'):
+        catalog.add({...})
+    catalog.save()
+
+Saves are atomic (temp file + rename in the same directory) and skipped
+entirely when the serialized content is unchanged, so untouched files keep
+their mtime and CDN cache entries. Each real write can append an RFC 6902
+JSON Patch of what changed to a JSON-lines changelog, either passed to
+save() or taken from the CATALOG_CHANGELOG environment variable.
+"""
+import copy
+import json
+import os
+import tempfile
+from collections import defaultdict
+from datetime import datetime
+
+ARTWORKS_PREFIX = "images/artworks/"
+VARIANT_PREFIXES = ("hq-", "web-")
+CHANGELOG_ENV = "CATALOG_CHANGELOG"
+
+
+def normalize_image_path(path):
+    """'images/artworks/amy.webp' -> 'amy.webp' (same rule as gallery.js)."""
+    return path.replace(ARTWORKS_PREFIX, "") if path else path
+
+
+def base_id(art_id):
+    """'hq-portrait-2' / 'web-portrait-2' -> 'portrait-2'."""
+    for prefix in VARIANT_PREFIXES:
+        if art_id.startswith(prefix):
+            return art_id[len(prefix):]
+    return art_id
+
+
+def image_name(entry):
+    """The image the gallery shows for an entry: `image`, else `file`."""
+    return normalize_image_path(entry.get('image') or entry.get('file'))
+
+
+def serialize(data):
+    """The on-disk format every metadata script has always written."""
+    return json.dumps(data, indent=2, ensure_ascii=False)
+
+
+def write_atomic(path, text):
+    """Write `text` to `path` via a temp file and rename.
+
+    A crash mid-write leaves the previous file intact instead of a
+    truncated one. The temp file lives in the same directory so the
+    rename never crosses filesystems.
+    """
+    path = os.fspath(path)
+    folder = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=folder, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(path):
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o777)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _pointer(path, key):
+    return f"{path}/{str(key).replace('~', '~0').replace('/', '~1')}"
+
+
+def json_patch(old, new, path=''):
+    """RFC 6902 operations turning `old` into `new`.
+
+    Lists are compared by position with additions/removals at the tail,
+    which is what append-style catalog updates produce.
+    """
+    if type(old) is not type(new):
+        return [{'op': 'replace', 'path': path, 'value': new}]
+
+    if isinstance(old, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': _pointer(path, key)})
+            else:
+                ops.extend(json_patch(old[key], new[key], _pointer(path, key)))
+        for key in new:
+            if key not in old:
+                ops.append({'op': 'add', 'path': _pointer(path, key), 'value': new[key]})
+        return ops
+
+    if isinstance(old, list):
+        ops = []
+        shared = min(len(old), len(new))
+        for i in range(shared):
+            ops.extend(json_patch(old[i], new[i], _pointer(path, i)))
+        # Remove from the end so earlier indexes stay valid
+        for i in range(len(old) - 1, shared - 1, -1):
+            ops.append({'op': 'remove', 'path': _pointer(path, i)})
+        for i in range(shared, len(new)):
+            ops.append({'op': 'add', 'path': _pointer(path, '-'), 'value': new[i]})
+        return ops
+
+    return [] if old == new else [{'op': 'replace', 'path': path, 'value': new}]
+
+
+class ArtworkCatalog:
+    """A catalog file plus indexes over its artwork entries."""
+
+    def __init__(self, data, path=None, key='artworks'):
+        self.path = path
+        self.key = key
+        self.data = data
+        # Snapshot of what was loaded, for the changelog patch
+        self._original = copy.deepcopy(data)
+        if isinstance(data, list):
+            self.artworks = data
+        elif isinstance(data, dict) and key in data:
+            self.artworks = data[key]
+        else:
+            raise ValueError(f"Unknown JSON structure in {path or 'catalog'}")
+        self._reindex()
+
+    @classmethod
+    def load(cls, path, key='artworks'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f), path=path, key=key)
+
+    @property
+    def is_wrapper(self):
+        return isinstance(self.data, dict)
+
+    def __len__(self):
+        return len(self.artworks)
+
+    def __iter__(self):
+        return iter(self.artworks)
+
+    # -- indexes -----------------------------------------------------------
+
+    def _reindex(self):
+        self.by_id = {}
+        self.by_base_id = defaultdict(list)
+        self.by_image = {}
+        self.by_series = defaultdict(list)
+        for entry in self.artworks:
+            self._index(entry)
+
+    def _index(self, entry):
+        art_id = entry.get('id')
+        if art_id is not None:
+            # First entry wins, like the linear scans this replaces
+            self.by_id.setdefault(art_id, entry)
+            self.by_base_id[base_id(art_id)].append(entry)
+        # Both keys count as "already referenced" for the sync scripts
+        for field in ('image', 'file'):
+            if entry.get(field):
+                self.by_image.setdefault(normalize_image_path(entry[field]), entry)
+        if entry.get('series'):
+            self.by_series[entry['series']].append(entry)
+
+    def get(self, art_id):
+        return self.by_id.get(art_id)
+
+    def has_image(self, filename):
+        return normalize_image_path(filename) in self.by_image
+
+    def find_by_image(self, filename):
+        return self.by_image.get(normalize_image_path(filename))
+
+    def image_names(self):
+        """Filenames referenced by entries, as the gallery resolves them."""
+        return {name for name in map(image_name, self.artworks) if name}
+
+    # -- mutation ----------------------------------------------------------
+
+    def add(self, entry):
+        self.artworks.append(entry)
+        self._index(entry)
+        return entry
+
+    def update(self, entry, **fields):
+        """Set fields on an entry and keep the indexes in step."""
+        entry.update(fields)
+        if {'id', 'image', 'file', 'series'} & fields.keys():
+            self._reindex()
+        return entry
+
+    def replace(self, entries):
+        """Swap in a new entry list (e.g. after deduplication)."""
+        self.artworks[:] = entries
+        self._reindex()
+
+    def changes(self):
+        """JSON Patch from the loaded (or last saved) state to the current one."""
+        return json_patch(self._original, self.data)
+
+    def save(self, path=None, changelog=None):
+        """Persist the catalog if it changed; returns the applied JSON Patch.
+
+        None means nothing changed and nothing was written. A write can
+        still return an empty patch, e.g. when only the formatting or the
+        destination path differs from the loaded state.
+        """
+        path = path or self.path
+        text = serialize(self.data)
+        if text == self._current_text(path):
+            return None
+
+        patch = self.changes()
+        write_atomic(path, text)
+
+        changelog = changelog or os.environ.get(CHANGELOG_ENV)
+        if changelog and patch:
+            record = {
+                'timestamp': datetime.now().isoformat(),
+                'file': os.fspath(path),
+                'patch': patch,
+            }
+            with open(changelog, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+        if path == self.path:
+            self._original = copy.deepcopy(self.data)
+        return patch
+
+    def _current_text(self, path):
+        # Re-read rather than trust the load-time copy: another run may
+        # have rewritten the file since
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
@@ -0,0 +1,211 @@
+"""
+Contact sheets de shots: comparativas A/B/C en video y hojas de frames fijos.
+
+- Video: un `ffmpeg` por shot con lista de argumentos (sin shell, rutas con
+  espacios sin problema). Cada versión se reduce a `tile_width` y se
+  encaja en su celda; una fila usa `hstack`, más de una `xstack` en
+  rejilla de `columns`. Se codifica con preset rápido: es para revisar,
+  no para entregar.
+- Frames: N frames equiespaciados por versión (FrameExtractor, una pasada
+  por video) montados en un PNG, una fila por versión.
+
+Los shots se procesan en paralelo hasta `max_workers`. Cada salida lleva
+al lado una huella de sus entradas (ruta, tamaño, mtime) y del layout:
+si no ha cambiado nada, no se vuelve a generar.
+
+    renderer = ContactSheetRenderer(output_dir / "contact_sheets")
+    results = renderer.render({"trans_rocks": [path_a, path_b, path_c]})
+    stills = renderer.render(groups, kind="stills")
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import shutil
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from frame_extract import FrameExtractor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TILE_WIDTH = 480
+DEFAULT_COLUMNS = 3
+DEFAULT_FRAMES = 6
+DEFAULT_MAX_WORKERS = 4
+
+
+@dataclass
+class SheetResult:
+    name: str
+    path: Optional[Path] = None
+    skipped: bool = False
+    seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def ffmpeg_binary() -> str:
+    binary = shutil.which("ffmpeg")
+    if binary is None:
+        raise FileNotFoundError("ffmpeg no encontrado en el PATH")
+    return binary
+
+
+def _even(value: float) -> int:
+    return max(2, int(value) // 2 * 2)
+
+
+def grid_shape(count: int, columns: int):
+    cols = max(1, min(columns, count))
+    return cols, math.ceil(count / cols)
+
+
+def compare_command(videos: Sequence[Path], output: Path, tile_width: int = DEFAULT_TILE_WIDTH,
+                    tile_height: Optional[int] = None, columns: int = DEFAULT_COLUMNS,
+                    crf: int = 23, preset: str = "veryfast", ffmpeg: str = "ffmpeg") -> List[str]:
+    """Argumentos de ffmpeg para una comparativa en rejilla (sin audio)"""
+    width = _even(tile_width)
+    height = _even(tile_height or tile_width * 9 / 16)
+    cols, rows = grid_shape(len(videos), columns)
+
+    args = [ffmpeg, "-y", "-loglevel", "error"]
+    for video in videos:
+        args += ["-i", os.fspath(video)]
+    cells = [
+        f"[{i}:v]scale={width}:{height}:force_original_aspect_ratio=decrease,"
+        f"pad={width}:{height}:(ow-iw)/2:(oh-ih)/2,setsar=1[v{i}]"
+        for i in range(len(videos))
+    ]
+    labels = "".join(f"[v{i}]" for i in range(len(videos)))
+    if len(videos) == 1:
+        stack = f"{labels}null[out]"
+    elif rows == 1:
+        stack = f"{labels}hstack=inputs={len(videos)}[out]"
+    else:
+        layout = "|".join(f"{(i % cols) * width}_{(i // cols) * height}" for i in range(len(videos)))
+        stack = f"{labels}xstack=inputs={len(videos)}:layout={layout}:fill=black[out]"
+    args += [
+        "-filter_complex", ";".join(cells + [stack]),
+        "-map", "[out]", "-an",
+        "-c:v", "libx264", "-preset", preset, "-crf", str(crf), "-pix_fmt", "yuv420p",
+        "-movflags", "+faststart", "-f", "mp4", os.fspath(output),
+    ]
+    return args
+
+
+def _fit(image, width: int, height: int):
+    """Reduce la imagen a la celda manteniendo aspecto, con bandas negras"""
+    h, w = image.shape[:2]
+    scale = min(width / w, height / h)
+    resized = cv2.resize(image, (max(1, round(w * scale)), max(1, round(h * scale))),
+                         interpolation=cv2.INTER_AREA)
+    cell = np.zeros((height, width, 3), np.uint8)
+    y = (height - resized.shape[0]) // 2
+    x = (width - resized.shape[1]) // 2
+    cell[y:y + resized.shape[0], x:x + resized.shape[1]] = resized
+    return cell
+
+
+class ContactSheetRenderer:
+    """Genera contact sheets en paralelo y omite los que no han cambiado"""
+
+    def __init__(self, output_dir, tile_width: int = DEFAULT_TILE_WIDTH, columns: int = DEFAULT_COLUMNS,
+                 frames_per_clip: int = DEFAULT_FRAMES, crf: int = 23,
+                 max_workers: int = DEFAULT_MAX_WORKERS, frames: Optional[FrameExtractor] = None):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.tile_width = tile_width
+        self.columns = columns
+        self.frames_per_clip = frames_per_clip
+        self.crf = crf
+        self.max_workers = max_workers
+        self.frames = frames or FrameExtractor(self.output_dir / ".frames")
+
+    def _fingerprint(self, kind: str, videos: Sequence[Path]) -> str:
+        inputs = []
+        for video in videos:
+            st = os.stat(video)
+            inputs.append([os.fspath(video), st.st_size, st.st_mtime_ns])
+        layout = [kind, self.tile_width, self.columns, self.frames_per_clip, self.crf]
+        return hashlib.sha256(json.dumps([layout, inputs]).encode()).hexdigest()
+
+    @staticmethod
+    def _stamp_path(output: Path) -> Path:
+        return output.with_name(f".{output.name}.inputs")
+
+    def _up_to_date(self, output: Path, fingerprint: str) -> bool:
+        stamp = self._stamp_path(output)
+        return output.exists() and stamp.exists() and stamp.read_text() == fingerprint
+
+    def compare(self, name: str, videos: Sequence[Path]) -> SheetResult:
+        """Comparativa en video de las versiones de un shot"""
+        output = self.output_dir / f"{name}_compare.mp4"
+        return self._render(name, "video", videos, output, self._write_compare)
+
+    def stills(self, name: str, videos: Sequence[Path]) -> SheetResult:
+        """Hoja PNG: una fila por versión, `frames_per_clip` frames por fila"""
+        output = self.output_dir / f"{name}_frames.png"
+        return self._render(name, "stills", videos, output, self._write_stills)
+
+    def _render(self, name, kind, videos, output, write) -> SheetResult:
+        start = time.monotonic()
+        videos = [Path(v) for v in videos]
+        fingerprint = self._fingerprint(kind, videos)
+        if self._up_to_date(output, fingerprint):
+            return SheetResult(name, output, skipped=True)
+        tmp = output.with_name(f".{output.name}.tmp")
+        try:
+            write(videos, tmp)
+            os.replace(tmp, output)
+        except (OSError, ValueError, subprocess.CalledProcessError) as e:
+            if tmp.exists():
+                tmp.unlink()
+            detail = getattr(e, "stderr", None) or str(e)
+            return SheetResult(name, error=str(detail).strip(), seconds=time.monotonic() - start)
+        self._stamp_path(output).write_text(fingerprint)
+        return SheetResult(name, output, seconds=time.monotonic() - start)
+
+    def _write_compare(self, videos: List[Path], dest: Path):
+        args = compare_command(videos, dest, self.tile_width, columns=self.columns,
+                               crf=self.crf, ffmpeg=ffmpeg_binary())
+        subprocess.run(args, check=True, capture_output=True, text=True)
+
+    def _write_stills(self, videos: List[Path], dest: Path):
+        width = _even(self.tile_width / 2)
+        height = _even(width * 9 / 16)
+        rows = []
+        for video in videos:
+            cells = [_fit(frame.image, width, height)
+                     for frame in self.frames.read(video, self.frames_per_clip)]
+            cells += [np.zeros((height, width, 3), np.uint8)] * (self.frames_per_clip - len(cells))
+            row = np.hstack(cells)
+            cv2.putText(row, video.stem, (8, 22), cv2.FONT_HERSHEY_SIMPLEX, 0.6,
+                        (255, 255, 255), 1, cv2.LINE_AA)
+            rows.append(row)
+        ok, data = cv2.imencode(".png", np.vstack(rows))
+        if not ok:
+            raise ValueError(f"No se pudo codificar {dest}")
+        dest.write_bytes(data.tobytes())
+
+    def render(self, groups: Dict[str, Sequence[Path]], kind: str = "video") -> Dict[str, SheetResult]:
+        """Genera un contact sheet por shot, hasta `max_workers` a la vez"""
+        render_one = self.compare if kind == "video" else self.stills
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {name: pool.submit(render_one, name, videos) for name, videos in groups.items()}
+            results = {name: future.result() for name, future in futures.items()}
+        for result in results.values():
+            if result.error:
+                logger.error(f"✗ Contact sheet {result.name}: {result.error}")
+            elif result.skipped:
+                logger.info(f"📊 Sin cambios: {result.path.name}")
+            else:
+                logger.info(f"📊 Contact sheet: {result.path} ({result.seconds:.1f}s)")
+        return results
@@ -0,0 +1,231 @@
+"""
+Ledger de costes de Veo en SQLite, compartido por todos los pipelines de la máquina.
+
+Cada generación cobrada queda registrada (fecha, proyecto, modelo, shot,
+segundos, coste) y cada shot enviado que aún no ha terminado tiene una
+reserva. El presupuesto mensual se comprueba contra lo gastado en el mes
+natural más las reservas vivas, dentro de una transacción
+`BEGIN IMMEDIATE`: dos procesos no pueden reservar el mismo margen.
+
+Las reservas guardan el pid del proceso; las de procesos que ya no
+existen (un crash) o más antiguas que RESERVATION_TTL no cuentan.
+
+    ledger = CostLedger()
+    rid = ledger.reserve("naroa_gallery_2026", "veo-3.1-generate-preview", "trans_rocks_vA",
+                         cost_usd=3.20, budget_usd=250.0)
+    ledger.charge(rid, seconds=8)
+
+Informe:
+    python scripts/cost_ledger.py                  # mes actual por proyecto
+    python scripts/cost_ledger.py --by model day --month 2026-10
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+SQLITE_TIMEOUT = 30.0
+RESERVATION_TTL = 6 * 3600
+DEFAULT_LEDGER_PATH = Path.home() / ".ultra_cine" / "cost_ledger.sqlite"
+REPORT_COLUMNS = ("project", "model", "day", "month", "shot")
+
+
+class BudgetExceeded(RuntimeError):
+    pass
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def current_month() -> str:
+    return datetime.now().strftime("%Y-%m")
+
+
+class CostLedger:
+    """Gastos y reservas; cada operación abre y cierra su propia conexión"""
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else DEFAULT_LEDGER_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = self._connect()
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("CREATE TABLE IF NOT EXISTS charges ("
+                       "id INTEGER PRIMARY KEY, ts REAL NOT NULL, day TEXT NOT NULL, "
+                       "month TEXT NOT NULL, project TEXT, model TEXT, shot TEXT, "
+                       "seconds REAL, cost_usd REAL NOT NULL)")
+            db.execute("CREATE INDEX IF NOT EXISTS charges_month ON charges (month)")
+            db.execute("CREATE TABLE IF NOT EXISTS reservations ("
+                       "id TEXT PRIMARY KEY, project TEXT, model TEXT, shot TEXT, "
+                       "cost_usd REAL NOT NULL, created REAL NOT NULL, pid INTEGER NOT NULL)")
+        finally:
+            db.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT, isolation_level=None)
+
+    def _transaction(self, fn):
+        db = self._connect()
+        try:
+            # IMMEDIATE: el lock de escritura se toma antes de leer el gasto
+            db.execute("BEGIN IMMEDIATE")
+            result = fn(db)
+            db.execute("COMMIT")
+            return result
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+    def _drop_stale(self, db):
+        rows = db.execute("SELECT id, pid, created FROM reservations").fetchall()
+        cutoff = time.time() - RESERVATION_TTL
+        stale = [(rid,) for rid, pid, created in rows
+                 if created < cutoff or (pid != os.getpid() and not _pid_alive(pid))]
+        db.executemany("DELETE FROM reservations WHERE id = ?", stale)
+
+    @staticmethod
+    def _committed(db, month: str) -> float:
+        spent = db.execute("SELECT COALESCE(SUM(cost_usd), 0) FROM charges WHERE month = ?",
+                           (month,)).fetchone()[0]
+        reserved = db.execute("SELECT COALESCE(SUM(cost_usd), 0) FROM reservations").fetchone()[0]
+        return spent + reserved
+
+    def reserve(self, project: str, model: str, shot: str, cost_usd: float,
+                budget_usd: Optional[float] = None) -> str:
+        """Reserva `cost_usd` si cabe en el presupuesto del mes; devuelve el id.
+
+        Con `budget_usd=None` reserva sin comprobar (operaciones ya enviadas).
+        """
+        rid = uuid.uuid4().hex
+
+        def reserve(db):
+            self._drop_stale(db)
+            if budget_usd is not None:
+                committed = self._committed(db, current_month())
+                if committed + cost_usd > budget_usd:
+                    raise BudgetExceeded(
+                        f"⚠️ ALERTA: ${committed + cost_usd:.2f} "
+                        f"excede presupuesto ${budget_usd}"
+                    )
+            db.execute("INSERT INTO reservations (id, project, model, shot, cost_usd, created, pid) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                       (rid, project, model, shot, cost_usd, time.time(), os.getpid()))
+            return rid
+
+        return self._transaction(reserve)
+
+    def release(self, reservation: str):
+        """Libera una reserva sin cobrar (Veo no cobra las generaciones fallidas)"""
+        self._transaction(lambda db: db.execute("DELETE FROM reservations WHERE id = ?",
+                                                (reservation,)))
+
+    def charge(self, reservation: Optional[str], seconds: float, cost_usd: Optional[float] = None,
+               project: Optional[str] = None, model: Optional[str] = None,
+               shot: Optional[str] = None):
+        """Convierte la reserva en gasto; los campos omitidos salen de la reserva"""
+
+        def charge(db):
+            row = None
+            if reservation:
+                row = db.execute("SELECT project, model, shot, cost_usd FROM reservations "
+                                 "WHERE id = ?", (reservation,)).fetchone()
+                db.execute("DELETE FROM reservations WHERE id = ?", (reservation,))
+            row = row or (None, None, None, 0.0)
+            now = datetime.now()
+            db.execute("INSERT INTO charges (ts, day, month, project, model, shot, seconds, cost_usd) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                       (now.timestamp(), now.strftime("%Y-%m-%d"), now.strftime("%Y-%m"),
+                        project or row[0], model or row[1], shot or row[2], seconds,
+                        cost_usd if cost_usd is not None else row[3]))
+
+        self._transaction(charge)
+
+    def month_spend(self, month: Optional[str] = None) -> float:
+        db = self._connect()
+        try:
+            return db.execute("SELECT COALESCE(SUM(cost_usd), 0) FROM charges WHERE month = ?",
+                              (month or current_month(),)).fetchone()[0]
+        finally:
+            db.close()
+
+    def reserved(self) -> float:
+        """Coste de los shots en vuelo de todos los procesos vivos"""
+
+        def reserved(db):
+            self._drop_stale(db)
+            return db.execute("SELECT COALESCE(SUM(cost_usd), 0) FROM reservations").fetchone()[0]
+
+        return self._transaction(reserved)
+
+    def report(self, by: Sequence[str] = ("project",), month: Optional[str] = None) -> List[Dict]:
+        """Gasto agrupado por columnas de REPORT_COLUMNS; `month="all"` sin filtro"""
+        columns = [c for c in by if c in REPORT_COLUMNS]
+        if len(columns) != len(by) or not columns:
+            raise ValueError(f"agrupar por {list(by)}: columnas válidas {REPORT_COLUMNS}")
+        group = ", ".join(columns)
+        where, params = "", ()
+        if month != "all":
+            where, params = "WHERE month = ?", (month or current_month(),)
+        db = self._connect()
+        try:
+            rows = db.execute(f"SELECT {group}, COUNT(*), SUM(seconds), SUM(cost_usd) "
+                              f"FROM charges {where} GROUP BY {group} ORDER BY {group}",
+                              params).fetchall()
+        finally:
+            db.close()
+        return [dict(zip(columns, row[:len(columns)]),
+                     videos=row[-3], seconds=row[-2], cost_usd=round(row[-1], 2))
+                for row in rows]
+
+
+def print_report(rows: List[Dict], by: Sequence[str]):
+    if not rows:
+        print("Sin gastos registrados")
+        return
+    widths = [max(len(str(c)), *(len(str(r[c])) for r in rows)) for c in by]
+    header = "  ".join(c.ljust(w) for c, w in zip(by, widths))
+    print(f"{header}  {'videos':>6}  {'seg':>7}  {'USD':>9}")
+    for row in rows:
+        keys = "  ".join(str(row[c]).ljust(w) for c, w in zip(by, widths))
+        print(f"{keys}  {row['videos']:>6}  {row['seconds'] or 0:>7.0f}  {row['cost_usd']:>9.2f}")
+    print(f"{'total'.ljust(len(header))}  {sum(r['videos'] for r in rows):>6}  "
+          f"{sum(r['seconds'] or 0 for r in rows):>7.0f}  {sum(r['cost_usd'] for r in rows):>9.2f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Informe de gasto en Veo del ledger de costes")
+    parser.add_argument("--db", help=f"Ledger SQLite (por defecto {DEFAULT_LEDGER_PATH})")
+    parser.add_argument("--by", nargs="+", default=["project"], choices=REPORT_COLUMNS,
+                        help="Columnas por las que agrupar")
+    parser.add_argument("--month", help="YYYY-MM (por defecto el actual) o 'all'")
+    parser.add_argument("--json", action="store_true", help="Salida JSON")
+    args = parser.parse_args(argv)
+
+    ledger = CostLedger(args.db)
+    rows = ledger.report(args.by, args.month)
+    if args.json:
+        print(json.dumps(rows, indent=2, ensure_ascii=False))
+    else:
+        print_report(rows, args.by)
+        print(f"Reservado en vuelo: ${ledger.reserved():.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
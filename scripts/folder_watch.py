@@ -0,0 +1,162 @@
+"""
+Change notifications for a single folder, batched for the sync scripts.
+
+On Linux the kernel's inotify is used directly (through ctypes, no extra
+package); elsewhere, or with `polling=True`, the folder is re-stat'ed
+every `interval` seconds instead. Both report changed filenames, and
+`batches()` debounces them: it waits for the first event, then keeps
+collecting until the folder has been quiet for `quiet` seconds (or
+`max_wait` has passed), so an upload of 200 files becomes one batch.
+
+    watcher = open_watcher(IMAGES_DIR)
+    for names in batches(watcher):
+        ...
+"""
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+
+DEFAULT_QUIET = 1.0
+DEFAULT_MAX_WAIT = 10.0
+DEFAULT_POLL_INTERVAL = 1.0
+
+# <sys/inotify.h>
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_Q_OVERFLOW = 0x4000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_ATTRIB | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct('iIII')
+
+
+class InotifyWatcher:
+    """Filenames changed in `directory`, straight from inotify."""
+
+    def __init__(self, directory):
+        if not sys.platform.startswith('linux'):
+            raise OSError("inotify is only available on Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.directory = os.fspath(directory)
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        wd = libc.inotify_add_watch(self.fd, os.fsencode(self.directory), WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"cannot watch {self.directory}")
+        # The queue overflowed: events were lost and the caller should rescan
+        self.overflowed = False
+
+    def wait(self, timeout):
+        """Changed filenames, or an empty set after `timeout` seconds."""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return set()
+        names = set()
+        while True:
+            try:
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset < len(buf):
+                _, mask, _, length = EVENT_HEADER.unpack_from(buf, offset)
+                offset += EVENT_HEADER.size
+                name = buf[offset:offset + length].rstrip(b'\0')
+                offset += length
+                if mask & IN_Q_OVERFLOW:
+                    self.overflowed = True
+                elif name:
+                    names.add(os.fsdecode(name))
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+class PollingWatcher:
+    """Filenames changed in `directory`, by comparing stat snapshots."""
+
+    overflowed = False
+
+    def __init__(self, directory, interval=DEFAULT_POLL_INTERVAL):
+        self.directory = os.fspath(directory)
+        self.interval = interval
+        self._snapshot = self._take()
+
+    def _take(self):
+        snapshot = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                snapshot[entry.name] = (st.st_size, st.st_mtime_ns, st.st_ino)
+        return snapshot
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            current = self._take()
+            previous, self._snapshot = self._snapshot, current
+            names = {name for name in previous.keys() | current.keys()
+                     if previous.get(name) != current.get(name)}
+            remaining = deadline - time.monotonic()
+            if names or remaining <= 0:
+                return names
+            time.sleep(min(self.interval, remaining))
+
+    def close(self):
+        pass
+
+
+def open_watcher(directory, polling=False, interval=DEFAULT_POLL_INTERVAL):
+    """inotify where available, polling otherwise (or when asked to)."""
+    if not polling:
+        try:
+            return InotifyWatcher(directory)
+        except (OSError, AttributeError):
+            # AttributeError: a libc without inotify symbols
+            pass
+    return PollingWatcher(directory, interval)
+
+
+def batches(watcher, quiet=DEFAULT_QUIET, max_wait=DEFAULT_MAX_WAIT, idle_timeout=None):
+    """Yield sets of changed filenames, one per burst of activity.
+
+    Yields None instead when the kernel dropped events, meaning the whole
+    folder has to be rescanned. Stops after `idle_timeout` seconds without
+    any event (None: never).
+    """
+    while True:
+        names = watcher.wait(idle_timeout if idle_timeout is not None else 3600)
+        if not names and not watcher.overflowed:
+            if idle_timeout is not None:
+                return
+            continue
+        started = time.monotonic()
+        while True:
+            remaining = max_wait - (time.monotonic() - started)
+            if remaining <= 0:
+                break
+            more = watcher.wait(min(quiet, remaining))
+            if not more:
+                break
+            names |= more
+        if watcher.overflowed:
+            watcher.overflowed = False
+            yield None
+        else:
+            yield names
@@ -0,0 +1,217 @@
+"""
+Extracción de frames (primero, último o N equiespaciados) para VideoExtender.
+
+`CAP_PROP_FRAME_COUNT` sale de la cabecera del contenedor y no es fiable:
+en un MP4 truncado o con timestamps irregulares apunta más allá del final
+y `cap.read()` no devuelve nada, o el backend decodifica desde el inicio.
+Aquí nunca se pide "el frame N-1": para el último frame se busca por
+tiempo `TAIL_SECONDS` antes del final (FFmpeg salta al keyframe anterior
+y decodifica hacia delante) y se lee hasta que el fichero se acaba. Si esa
+ventana no devuelve frames, se amplía hasta llegar al principio.
+
+Los N frames equiespaciados salen de una sola apertura del video,
+avanzando siempre hacia delante: saltos cortos se decodifican, saltos
+largos se buscan. Los PNG se guardan por sha256 del video, así que el
+mismo clip no se vuelve a decodificar.
+
+    extractor = FrameExtractor(output_dir / "extends" / "frames")
+    last = extractor.extract(video_path, "last")[0]
+    thumbs = extractor.extract(video_path, 6)
+"""
+import hashlib
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import cv2
+
+logger = logging.getLogger(__name__)
+
+# Mayor que el GOP típico de Veo; con menos se decodifica de más al ampliar
+TAIL_SECONDS = 2.0
+# Distancias menores se decodifican frame a frame en lugar de buscar
+SEEK_MIN_GAP = 1.0
+HASH_CHUNK = 1024 * 1024
+
+
+@dataclass
+class VideoInfo:
+    fps: float
+    frame_count: int  # según la cabecera; puede mentir
+    duration: float
+
+
+@dataclass
+class Frame:
+    ms: float
+    image: object  # ndarray BGR
+
+
+def file_sha256(path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def probe(cap) -> VideoInfo:
+    fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+    count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+    duration = count / fps if fps > 0 and count > 0 else 0.0
+    return VideoInfo(fps, count, duration)
+
+
+class FrameReader:
+    """Lectura hacia delante con búsqueda por tiempo; cuenta frames decodificados"""
+
+    def __init__(self, video_path):
+        self.path = Path(video_path)
+        self.cap = cv2.VideoCapture(str(self.path))
+        if not self.cap.isOpened():
+            raise ValueError(f"No se pudo abrir {self.path}")
+        self.info = probe(self.cap)
+        self.decoded = 0
+        self.seeks = 0
+
+    def close(self):
+        self.cap.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _seek(self, seconds: float):
+        self.seeks += 1
+        if seconds <= 0:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+        else:
+            self.cap.set(cv2.CAP_PROP_POS_MSEC, seconds * 1000)
+
+    def _read(self) -> Optional[Frame]:
+        ok, image = self.cap.read()
+        if not ok:
+            return None
+        self.decoded += 1
+        return Frame(self.cap.get(cv2.CAP_PROP_POS_MSEC), image)
+
+    def at(self, seconds: float, position: float) -> Optional[Frame]:
+        """Primer frame en `seconds` o después; `position` es dónde está el lector"""
+        if seconds - position > SEEK_MIN_GAP or seconds < position:
+            self._seek(seconds)
+            return self._read()
+        half_frame = 500 / self.info.fps if self.info.fps else 0
+        while True:
+            if not self.cap.grab():
+                return None
+            self.decoded += 1
+            ms = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+            if ms + half_frame >= seconds * 1000:
+                ok, image = self.cap.retrieve()
+                return Frame(ms, image) if ok else None
+
+    def last(self, tail_seconds: float = TAIL_SECONDS) -> Frame:
+        """Último frame decodificable, leyendo solo la cola del fichero"""
+        window = tail_seconds
+        while True:
+            start = max(0.0, self.info.duration - window)
+            self._seek(start)
+            last = None
+            while True:
+                frame = self._read()
+                if frame is None:
+                    break
+                last = frame
+            if last is not None:
+                return last
+            if start == 0:
+                raise ValueError(f"No se pudo extraer frame de {self.path}")
+            # La cabecera promete más video del que hay
+            window *= 4
+
+    def spaced(self, count: int, tail_seconds: float = TAIL_SECONDS) -> List[Frame]:
+        """`count` frames equiespaciados de primero a último, en una pasada"""
+        if count < 2:
+            raise ValueError("count >= 2 (primero y último)")
+        duration = self.info.duration
+        frames = []
+        position = 0.0
+        self._seek(0)
+        for i in range(count - 1):
+            target = duration * i / (count - 1)
+            frame = self.at(target, position)
+            if frame is None:
+                break
+            frames.append(frame)
+            position = frame.ms / 1000
+        last = self.last(tail_seconds)
+        if not frames or last.ms > frames[-1].ms:
+            frames.append(last)
+        return frames
+
+
+Which = Union[str, int]
+
+
+class FrameExtractor:
+    """Extrae frames a PNG con caché por sha256 del video"""
+
+    def __init__(self, cache_dir, tail_seconds: float = TAIL_SECONDS):
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.tail_seconds = tail_seconds
+        self._hashes: Dict[Tuple[str, int, int], str] = {}
+        self.decoded = 0
+        self.hits = 0
+
+    def video_hash(self, video_path) -> str:
+        st = os.stat(video_path)
+        key = (os.fspath(video_path), st.st_size, st.st_mtime_ns)
+        if key not in self._hashes:
+            self._hashes[key] = file_sha256(video_path)
+        return self._hashes[key]
+
+    def read(self, video_path, which: Which = "last") -> List[Frame]:
+        """Frames en memoria, sin caché: "first", "last" o un número N"""
+        with FrameReader(video_path) as reader:
+            if which == "first":
+                reader._seek(0)
+                frame = reader._read()
+                if frame is None:
+                    raise ValueError(f"No se pudo extraer frame de {video_path}")
+                frames = [frame]
+            elif which == "last":
+                frames = [reader.last(self.tail_seconds)]
+            else:
+                frames = reader.spaced(int(which), self.tail_seconds)
+            self.decoded += reader.decoded
+        return frames
+
+    def extract(self, video_path, which: Which = "last") -> List[Path]:
+        """Como `read`, pero a PNG en la caché; devuelve las rutas"""
+        label = which if isinstance(which, str) else f"{int(which)}x"
+        stem = f"{self.video_hash(video_path)[:20]}_{label}"
+        done = self.cache_dir / f"{stem}.done"
+        if done.exists():
+            paths = [self.cache_dir / name for name in done.read_text().split()]
+            if all(p.exists() for p in paths):
+                self.hits += 1
+                return paths
+
+        paths = []
+        for i, frame in enumerate(self.read(video_path, which)):
+            path = self.cache_dir / f"{stem}_{i:02d}.png"
+            tmp = path.with_name(f".{path.name}.tmp.png")
+            if not cv2.imwrite(str(tmp), frame.image):
+                raise ValueError(f"No se pudo escribir {path}")
+            os.replace(tmp, path)
+            paths.append(path)
+        # Marca escrita al final: una extracción a medias no cuenta como caché
+        tmp = done.with_name(f".{done.name}.tmp")
+        tmp.write_text("\n".join(p.name for p in paths))
+        os.replace(tmp, done)
+        return paths
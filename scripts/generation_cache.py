@@ -0,0 +1,159 @@
+"""
+Caché direccionada por contenido para generaciones de Veo.
+
+La clave es el sha256 del prompt ya mejorado, el modelo, el aspect ratio
+y los bytes de cada imagen de referencia: si coinciden, Veo devolvería
+(y cobraría) lo mismo otra vez. Los MP4 se guardan en
+`<output_dir>/cache/objects/<aa>/<clave>.mp4` como hardlink del fichero
+en `shots/` (copia si el sistema de ficheros no admite hardlinks) y un
+índice SQLite registra tamaño, fecha y último uso para expulsar entradas
+por tamaño total o antigüedad. Expulsar nunca toca `shots/`.
+
+    cache = GenerationCache(output_dir / "cache")
+    key = cache_key(prompt, model, "16:9", [img.image_bytes for img in refs])
+    hit = cache.get(key, save_path)
+"""
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+SQLITE_TIMEOUT = 30.0
+
+
+def cache_key(prompt: str, model: str, aspect_ratio: str, ref_images: Iterable[bytes] = ()) -> str:
+    header = json.dumps({
+        "prompt": prompt,
+        "model": model,
+        "aspect_ratio": aspect_ratio,
+        "refs": [hashlib.sha256(data).hexdigest() for data in ref_images],
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(header.encode("utf-8")).hexdigest()
+
+
+def _link_or_copy(source: Path, dest: Path):
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dest.with_name(f".{dest.name}.cache-tmp")
+    if tmp.exists():
+        tmp.unlink()
+    try:
+        os.link(source, tmp)
+    except OSError:
+        shutil.copy2(source, tmp)
+    os.replace(tmp, dest)
+
+
+class GenerationCache:
+    """Índice SQLite + objetos MP4; seguro entre hilos y procesos"""
+
+    def __init__(self, root, max_bytes: Optional[int] = None, max_age_days: Optional[float] = None):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.sqlite"
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.saved_usd = 0.0
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS entries ("
+                       "key TEXT PRIMARY KEY, bytes INTEGER NOT NULL, sha256 TEXT, model TEXT, "
+                       "prompt TEXT, cost_usd REAL, created REAL NOT NULL, last_used REAL NOT NULL, "
+                       "uses INTEGER NOT NULL DEFAULT 0)")
+
+    @contextmanager
+    def _connect(self):
+        """Conexión por operación: commit al salir y cierre siempre"""
+        db = sqlite3.connect(self.index_path, timeout=SQLITE_TIMEOUT)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def object_path(self, key: str) -> Path:
+        return self.objects / key[:2] / f"{key}.mp4"
+
+    def get(self, key: str, dest: Path) -> Optional[Dict]:
+        """Si la clave está en caché, deja el MP4 en `dest` y devuelve la entrada"""
+        obj = self.object_path(key)
+        with self._connect() as db:
+            row = db.execute("SELECT bytes, sha256, cost_usd FROM entries WHERE key = ?",
+                             (key,)).fetchone()
+            if row is None or not obj.exists() or obj.stat().st_size != row[0]:
+                if row is not None:
+                    # Objeto borrado o truncado fuera de la caché
+                    db.execute("DELETE FROM entries WHERE key = ?", (key,))
+                with self._lock:
+                    self.misses += 1
+                return None
+            db.execute("UPDATE entries SET last_used = ?, uses = uses + 1 WHERE key = ?",
+                       (time.time(), key))
+
+        dest = Path(dest)
+        if not dest.exists() or not os.path.samefile(obj, dest):
+            _link_or_copy(obj, dest)
+        with self._lock:
+            self.hits += 1
+            self.saved_usd += row[2] or 0.0
+        return {"path": str(dest), "bytes": row[0], "sha256": row[1], "cost_usd": row[2]}
+
+    def put(self, key: str, video_path: Path, sha256: Optional[str] = None,
+            model: Optional[str] = None, prompt: Optional[str] = None, cost_usd: float = 0.0):
+        """Registra un MP4 recién generado"""
+        video_path = Path(video_path)
+        obj = self.object_path(key)
+        _link_or_copy(video_path, obj)
+        now = time.time()
+        with self._connect() as db:
+            db.execute("INSERT OR REPLACE INTO entries "
+                       "(key, bytes, sha256, model, prompt, cost_usd, created, last_used, uses) "
+                       "VALUES (?, ?, ?, ?, ?, ?, ?, ?, 0)",
+                       (key, obj.stat().st_size, sha256, model, prompt, cost_usd, now, now))
+
+    def evict(self, max_bytes: Optional[int] = None, max_age_days: Optional[float] = None) -> int:
+        """Quita entradas sin uso desde hace `max_age_days` y las menos usadas
+        recientemente hasta quedar por debajo de `max_bytes`. Devuelve cuántas."""
+        max_bytes = max_bytes if max_bytes is not None else self.max_bytes
+        max_age_days = max_age_days if max_age_days is not None else self.max_age_days
+        doomed = []
+        with self._connect() as db:
+            rows = db.execute("SELECT key, bytes, last_used FROM entries ORDER BY last_used").fetchall()
+            total = sum(r[1] for r in rows)
+            cutoff = time.time() - max_age_days * 86400 if max_age_days else None
+            for key, size, last_used in rows:
+                too_old = cutoff is not None and last_used < cutoff
+                too_big = max_bytes is not None and total > max_bytes
+                if not (too_old or too_big):
+                    continue
+                doomed.append(key)
+                total -= size
+            db.executemany("DELETE FROM entries WHERE key = ?", [(k,) for k in doomed])
+        for key in doomed:
+            try:
+                self.object_path(key).unlink()
+            except FileNotFoundError:
+                pass
+        return len(doomed)
+
+    def stats(self) -> Dict:
+        with self._connect() as db:
+            entries, size = db.execute("SELECT COUNT(*), COALESCE(SUM(bytes), 0) FROM entries").fetchone()
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "saved_usd": round(self.saved_usd, 2),
+                "entries": entries,
+                "size_mb": round(size / 1024 / 1024, 1),
+            }
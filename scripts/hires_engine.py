@@ -0,0 +1,505 @@
+"""
+Batch engine for high-res artwork derivatives.
+
+Takes a manifest of source -> destination pairs (or globs the
+`source-*` masters), fans the work out over a process pool and skips
+images whose source hash and render settings match the last run. Each
+job reports decode/resize/encode timings so slow stages are visible.
+
+Every source is decoded once and turned into a rendition ladder: the 4K
+WebP master, responsive rungs in WebP/AVIF/JPEG under `images/optimized/`
+and the thumbnail, each downscaled from the rung above it. The ladder is
+indexed in `public/data/renditions.json` for the gallery's `srcset`.
+"""
+import glob
+import hashlib
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+
+from PIL import Image, features
+
+from streaming_resize import StreamingUnsupported, full_decode_fits, stream_resize
+
+DEFAULT_GLOB = "public/images/artworks/source-*"
+DEFAULT_STATE_PATH = "public/images/.hires-state.json"
+DEFAULT_MANIFEST_PATH = "public/data/renditions.json"
+SOURCE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp', '.tif', '.tiff')
+HASH_CHUNK = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class RenderSettings:
+    target_size: int = 3840   # 4K resolution for "Ultra Premium"
+    quality: int = 95         # High quality WebP
+    thumb_size: int = 500
+    thumb_quality: int = 85
+    # Responsive rungs below the 4K master, each one downscaled from the
+    # previous rung rather than from the full-resolution source
+    ladder: tuple = (1920, 1280, 640, 320)
+    formats: tuple = ('webp', 'avif', 'jpeg')
+    ladder_quality: tuple = (('webp', 82), ('avif', 60), ('jpeg', 85))
+    # Thumbnails only, decoded at reduced resolution where the format allows
+    fast_thumbs: bool = False
+    # Stream PNG masters in strips under this ceiling (MB); 0 decodes in one go
+    memory_limit_mb: int = 0
+
+    def fingerprint(self):
+        blob = json.dumps(asdict(self), sort_keys=True).encode()
+        return hashlib.sha256(blob).hexdigest()[:16]
+
+
+FORMAT_EXTENSIONS = {'webp': 'webp', 'avif': 'avif', 'jpeg': 'jpg'}
+
+
+def thumbnail_path(dest_path):
+    return dest_path.replace("/artworks/", "/thumbnails-webp/")
+
+
+def rendition_path(dest_path, width, fmt):
+    """`.../artworks/amy-rocks.webp` -> `.../optimized/amy-rocks-1280w.avif`."""
+    folder, name = os.path.split(dest_path)
+    stem = os.path.splitext(name)[0]
+    optimized = os.path.join(os.path.dirname(folder), "optimized")
+    return os.path.join(optimized, f"{stem}-{width}w.{FORMAT_EXTENSIONS[fmt]}")
+
+
+def available_formats(formats):
+    return tuple(fmt for fmt in formats if fmt != 'avif' or features.check('avif'))
+
+
+def expected_outputs(dest_path, settings, original_size=None):
+    """Every file a job writes; rungs above the source size are never rendered."""
+    if settings.fast_thumbs:
+        return [thumbnail_path(dest_path)]
+    outputs = [dest_path, thumbnail_path(dest_path)]
+    for width in settings.ladder:
+        if original_size and width >= max(original_size):
+            continue
+        outputs.extend(rendition_path(dest_path, width, fmt)
+                       for fmt in available_formats(settings.formats))
+    return outputs
+
+
+def web_path(path):
+    """Path as the gallery requests it (relative to `public/`)."""
+    path = path.replace(os.sep, '/')
+    return path.split('public/', 1)[1] if 'public/' in path else path
+
+
+def load_manifest(path):
+    """Manifest is a JSON object {source: dest} or a list of {source, dest}."""
+    with open(path, 'r') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        return list(data.items())
+    return [(item['source'], item['dest']) for item in data]
+
+
+def glob_sources(pattern=DEFAULT_GLOB):
+    """`source-marilyn.png` -> `marilyn.webp` in the same folder."""
+    jobs = []
+    for src in sorted(glob.glob(pattern)):
+        if not src.lower().endswith(SOURCE_EXTENSIONS):
+            continue
+        folder, name = os.path.split(src)
+        stem = os.path.splitext(name)[0]
+        if stem.startswith("source-"):
+            stem = stem[len("source-"):]
+        jobs.append((src, os.path.join(folder, f"{stem}.webp")))
+    return jobs
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildState:
+    """Persistent record of what each destination was last built from.
+
+    Hashing a multi-hundred-MB PNG is cheap next to decoding it, but still
+    not free, so the hash is only recomputed when size or mtime moved.
+    """
+
+    def __init__(self, path=DEFAULT_STATE_PATH):
+        self.path = path
+        self.entries = {}
+        self._hashed = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+
+    def _same_stat(self, source_path, prev):
+        st = os.stat(source_path)
+        return prev.get('size') == st.st_size and prev.get('mtime_ns') == st.st_mtime_ns
+
+    def known_hash(self, source_path, dest_path):
+        """The source's sha256 if it is known without reading the file, else None."""
+        prev = self.entries.get(dest_path)
+        if prev and prev.get('source_sha256') and self._same_stat(source_path, prev):
+            return prev['source_sha256']
+        return self._hashed.get(source_path)
+
+    def source_hash(self, source_path, dest_path):
+        digest = self.known_hash(source_path, dest_path)
+        if digest is None:
+            digest = self._hashed[source_path] = file_sha256(source_path)
+        return digest
+
+    def is_fresh(self, source_path, dest_path, settings_fp, outputs):
+        prev = self.entries.get(dest_path)
+        if not prev or prev.get('settings') != settings_fp:
+            return False
+        if not all(os.path.exists(p) for p in outputs):
+            return False
+        if not prev.get('source_sha256'):
+            # Thumbnail-only builds skip the hash; only the stat vouches for them
+            return self._same_stat(source_path, prev)
+        if prev['source_sha256'] != self.source_hash(source_path, dest_path):
+            return False
+        # Touched but identical: remember the new stat so we skip the hash next time
+        st = os.stat(source_path)
+        prev['size'], prev['mtime_ns'] = st.st_size, st.st_mtime_ns
+        return True
+
+    def record(self, source_path, dest_path, source_sha256, settings_fp, original_size):
+        st = os.stat(source_path)
+        self.entries[dest_path] = {
+            'source': source_path,
+            'source_sha256': source_sha256,
+            'original_size': original_size,
+            'size': st.st_size,
+            'mtime_ns': st.st_mtime_ns,
+            'settings': settings_fp,
+        }
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+
+def _fit(size, target):
+    width, height = size
+    if width <= target and height <= target:
+        return size
+    ratio = min(target / width, target / height)
+    return max(1, int(width * ratio)), max(1, int(height * ratio))
+
+
+def _encode(img, path, fmt, quality):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    if fmt == 'jpeg' and img.mode not in ('RGB', 'L'):
+        img = img.convert('RGB')
+    img.save(path, fmt.upper(), quality=quality)
+
+
+def _should_stream(source_path, target, settings):
+    """Stream only under a memory ceiling that a normal decode would break."""
+    if not settings.memory_limit_mb:
+        return False
+    with Image.open(source_path) as img:
+        return not full_decode_fits(img.size, target, settings.memory_limit_mb)
+
+
+def _decode_master(source_path, settings, timings):
+    """Decode a source and fit it to the 4K master size (only ever down).
+
+    When a full decode would break the memory ceiling, PNGs are streamed in
+    strips and the combined decode + downscale time is reported as the
+    `stream` stage.
+    """
+    if _should_stream(source_path, settings.target_size, settings):
+        t0 = time.perf_counter()
+        try:
+            rung, original_size = stream_resize(source_path, settings.target_size,
+                                                settings.memory_limit_mb)
+            timings['stream'] = time.perf_counter() - t0
+            return rung, original_size
+        except StreamingUnsupported:
+            pass
+
+    t0 = time.perf_counter()
+    with Image.open(source_path) as img:
+        img.load()
+        timings['decode'] = time.perf_counter() - t0
+        original_size = img.size
+
+        t0 = time.perf_counter()
+        size = _fit(img.size, settings.target_size)
+        rung = img.resize(size, Image.Resampling.LANCZOS) if size != img.size else img.copy()
+        timings['resize'] += time.perf_counter() - t0
+    return rung, original_size
+
+
+def process_image(source_path, dest_path, settings=RenderSettings(), source_sha256=None):
+    """Decode one source once and render its full rendition ladder. Runs in a worker.
+
+    `source_sha256` is the digest when the caller already knows it; otherwise
+    the source is hashed here, which is cheap next to the full decode.
+    """
+    timings = {'decode': 0.0, 'resize': 0.0, 'encode': 0.0, 'thumbnail': 0.0}
+    result = {'source': source_path, 'dest': dest_path, 'timings': timings, 'renditions': []}
+
+    # Disable decompression bomb checks for huge images
+    Image.MAX_IMAGE_PIXELS = None
+
+    try:
+        result['source_sha256'] = source_sha256 or file_sha256(source_path)
+
+        rung, original_size = _decode_master(source_path, settings, timings)
+        result['original_size'] = list(original_size)
+        result['size'] = list(rung.size)
+        result['streamed'] = 'stream' in timings
+
+        t0 = time.perf_counter()
+        _encode(rung, dest_path, 'webp', settings.quality)
+        timings['encode'] += time.perf_counter() - t0
+
+        # The full-resolution buffer is gone by now; every smaller rung
+        # is derived from the one above it
+        formats = available_formats(settings.formats)
+        qualities = dict(settings.ladder_quality)
+        thumb_base = rung
+        for width in sorted(settings.ladder, reverse=True):
+            if width >= max(result['original_size']):
+                continue
+            t0 = time.perf_counter()
+            rung = rung.resize(_fit(rung.size, width), Image.Resampling.LANCZOS)
+            timings['resize'] += time.perf_counter() - t0
+            if max(rung.size) >= settings.thumb_size:
+                thumb_base = rung
+
+            t0 = time.perf_counter()
+            for fmt in formats:
+                path = rendition_path(dest_path, width, fmt)
+                _encode(rung, path, fmt, qualities.get(fmt, settings.quality))
+                result['renditions'].append({
+                    'format': fmt, 'width': rung.width, 'height': rung.height, 'path': path,
+                })
+            timings['encode'] += time.perf_counter() - t0
+
+        # Thumbnail from the smallest rung that is still large enough,
+        # instead of a copy of the 4K buffer
+        t0 = time.perf_counter()
+        thumb_path = thumbnail_path(dest_path)
+        thumb = thumb_base.copy()
+        thumb.thumbnail((settings.thumb_size, settings.thumb_size))
+        _encode(thumb, thumb_path, 'webp', settings.thumb_quality)
+        timings['thumbnail'] = time.perf_counter() - t0
+        result['thumbnail'] = thumb_path
+
+        result['status'] = 'ok'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f"{e}\n{traceback.format_exc()}"
+    return result
+
+
+def open_reduced(source_path, box):
+    """Open and decode `source_path` at the smallest size that still covers `box`.
+
+    JPEG decodes straight to a 1/2, 1/4 or 1/8 scale via `draft`, so the
+    full-resolution bitmap never exists. Other formats fall back to a full
+    decode followed by an integer `reduce`, which at least frees the big
+    buffer before the LANCZOS pass. Returns (image, original_size, drafted).
+    """
+    img = Image.open(source_path)
+    original_size = img.size
+    drafted = False
+    if img.format == 'JPEG':
+        mode = img.mode if img.mode in ('RGB', 'L') else 'RGB'
+        drafted = img.draft(mode, box) is not None
+    img.load()
+
+    # Keep at least 2x the target for the final LANCZOS to stay sharp
+    factor = min(img.width // (box[0] * 2), img.height // (box[1] * 2))
+    if factor > 1:
+        reduced = img.reduce(factor)
+        img.close()
+        img = reduced
+    return img, original_size, drafted
+
+
+def _decode_thumbnail(source_path, box, settings, timings):
+    """open_reduced, except that PNGs (where draft and reduce don't avoid the
+    full bitmap) are streamed in strips when a full decode would break the
+    memory ceiling, as in _decode_master. Returns (image, original_size, drafted)."""
+    if _should_stream(source_path, max(box), settings):
+        t0 = time.perf_counter()
+        try:
+            img, original_size = stream_resize(source_path, max(box), settings.memory_limit_mb)
+            timings['stream'] = time.perf_counter() - t0
+            return img, original_size, False
+        except StreamingUnsupported:
+            pass
+
+    t0 = time.perf_counter()
+    decoded = open_reduced(source_path, box)
+    timings['decode'] = time.perf_counter() - t0
+    return decoded
+
+
+def make_thumbnail(source_path, dest_path, settings=RenderSettings(), source_sha256=None):
+    """Thumbnail-only job for `--fast-thumbs`. Runs in a worker.
+
+    The source is not hashed: reading all of a large master would cost as
+    much as the reduced decode saves. `source_sha256` is recorded if known.
+    """
+    timings = {'decode': 0.0, 'resize': 0.0, 'encode': 0.0}
+    thumb_path = thumbnail_path(dest_path)
+    result = {'source': source_path, 'dest': thumb_path, 'timings': timings, 'renditions': []}
+
+    Image.MAX_IMAGE_PIXELS = None
+
+    try:
+        result['source_sha256'] = source_sha256
+        box = (settings.thumb_size, settings.thumb_size)
+
+        img, original_size, drafted = _decode_thumbnail(source_path, box, settings, timings)
+        result['original_size'] = list(original_size)
+        result['drafted'] = drafted
+        result['streamed'] = 'stream' in timings
+
+        t0 = time.perf_counter()
+        img.thumbnail(box, Image.Resampling.LANCZOS)
+        timings['resize'] = time.perf_counter() - t0
+        result['size'] = list(img.size)
+
+        t0 = time.perf_counter()
+        _encode(img, thumb_path, 'webp', settings.thumb_quality)
+        timings['encode'] = time.perf_counter() - t0
+        img.close()
+
+        result['thumbnail'] = thumb_path
+        result['status'] = 'ok'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f"{e}\n{traceback.format_exc()}"
+    return result
+
+
+class RenditionManifest:
+    """`srcset`-ready index of every rendition, keyed by artwork file stem."""
+
+    def __init__(self, path=DEFAULT_MANIFEST_PATH):
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                self.entries = json.load(f)
+
+    def record(self, res):
+        stem = os.path.splitext(os.path.basename(res['dest']))[0]
+        sources = {}
+        for r in sorted(res['renditions'], key=lambda r: r['width']):
+            sources.setdefault(r['format'], []).append({'width': r['width'], 'src': web_path(r['path'])})
+        width, height = res['size']
+        sources.setdefault('webp', []).append({'width': width, 'src': web_path(res['dest'])})
+        self.entries[stem] = {
+            'src': web_path(res['dest']),
+            'width': width,
+            'height': height,
+            'thumbnail': web_path(res['thumbnail']),
+            'srcset': {
+                fmt: ", ".join(f"{s['src']} {s['width']}w" for s in items)
+                for fmt, items in sources.items()
+            },
+            'sources': sources,
+        }
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def run_batch(jobs, settings=RenderSettings(), workers=None, state_path=DEFAULT_STATE_PATH,
+              manifest_path=DEFAULT_MANIFEST_PATH, force=False, log=print):
+    """Process (source, dest) jobs in parallel; returns the batch report."""
+    state = BuildState(state_path)
+    manifest = RenditionManifest(manifest_path)
+    settings_fp = settings.fingerprint()
+    report = {'processed': [], 'skipped': [], 'missing': [], 'failed': []}
+
+    # Thumbnail-only runs track their own output so they never invalidate
+    # (or get mistaken for) a full ladder build of the same source
+    worker = make_thumbnail if settings.fast_thumbs else process_image
+    state_key = thumbnail_path if settings.fast_thumbs else (lambda dest: dest)
+
+    pending = []
+    for src, dest in jobs:
+        if not os.path.exists(src):
+            log(f"❌ Source not found: {src}")
+            report['missing'].append(src)
+            continue
+        prev = state.entries.get(state_key(dest), {})
+        outputs = expected_outputs(dest, settings, prev.get('original_size'))
+        if not force and state.is_fresh(src, state_key(dest), settings_fp, outputs):
+            log(f"⏭️  Up to date: {state_key(dest)}")
+            report['skipped'].append(state_key(dest))
+            continue
+        pending.append((src, dest, state.known_hash(src, state_key(dest))))
+
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    if pending:
+        with ProcessPoolExecutor(max_workers=min(workers, len(pending))) as pool:
+            futures = [pool.submit(worker, src, dest, settings, digest) for src, dest, digest in pending]
+            for future in as_completed(futures):
+                res = future.result()
+                if res['status'] != 'ok':
+                    log(f"🚨 Error processing {res['source']}: {res['error']}")
+                    report['failed'].append(res)
+                    continue
+                stages = " ".join(f"{k} {v:.2f}s" for k, v in res['timings'].items())
+                log(f"✅ {res['dest']} {res['original_size'][0]}x{res['original_size'][1]}"
+                    f" -> {res['size'][0]}x{res['size'][1]} +{len(res['renditions'])} renditions"
+                    f" | {stages}")
+                state.record(res['source'], res['dest'], res['source_sha256'], settings_fp,
+                             res['original_size'])
+                if not settings.fast_thumbs:
+                    manifest.record(res)
+                report['processed'].append(res)
+                # Save as we go so an interrupted batch resumes where it stopped
+                state.save()
+                if not settings.fast_thumbs:
+                    manifest.save()
+    state.save()
+    wall = time.perf_counter() - start
+
+    megapixels = sum(r['original_size'][0] * r['original_size'][1] for r in report['processed']) / 1e6
+    stage_totals = {}
+    for res in report['processed']:
+        for stage, secs in res['timings'].items():
+            stage_totals[stage] = stage_totals.get(stage, 0.0) + secs
+
+    report['wall_seconds'] = wall
+    report['workers'] = workers
+    report['stage_seconds'] = stage_totals
+    report['images_per_second'] = len(report['processed']) / wall if wall else 0.0
+    report['megapixels_per_second'] = megapixels / wall if wall else 0.0
+    return report
+
+
+def print_summary(report, log=print):
+    log("==================================================")
+    log(f"Processed: {len(report['processed'])} | Skipped: {len(report['skipped'])} | "
+        f"Missing: {len(report['missing'])} | Failed: {len(report['failed'])}")
+    if report['processed']:
+        stages = ", ".join(f"{k} {v:.1f}s" for k, v in report['stage_seconds'].items())
+        log(f"CPU time by stage: {stages}")
+        log(f"Wall: {report['wall_seconds']:.1f}s on {report['workers']} workers | "
+            f"{report['images_per_second']:.2f} img/s | "
+            f"{report['megapixels_per_second']:.1f} MP/s decoded")
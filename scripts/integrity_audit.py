@@ -0,0 +1,315 @@
+"""
+Integrity audit over every artwork catalog in public/data.
+
+For each catalog the audit checks that referenced images exist, that ids
+are unique, and (optionally) that every file decodes and still matches
+its stored sha256. Files in the images folder that no catalog references
+are reported as orphans, and works-complete-catalog.json entries (no
+images, Spanish fields) are matched by title against the image catalogs.
+
+Per-file work (stat, hashing, decoding) runs on a thread pool; hashlib
+and Pillow release the GIL, so this scales with cores as well as with
+I/O latency. Results come back as an AuditReport that renders as text,
+JSON or JUnit XML, with timings.
+
+    report = run_audit(DEFAULT_CATALOGS, 'images/artworks', decode=True)
+    print(report.to_json())
+"""
+import json
+import os
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from catalog import ArtworkCatalog, image_name, write_atomic
+from sync_state import file_sha256
+from title_matcher import TitleMatcher
+
+IMAGE_EXTENSIONS = ('.webp', '.jpg', '.png')
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+DEFAULT_CHECKSUMS_PATH = 'images/.artwork-checksums.json'
+
+
+@dataclass(frozen=True)
+class CatalogSpec:
+    """Where a catalog lives and which fields carry id and title."""
+    name: str
+    path: str
+    key: str = 'artworks'
+    id_field: str = 'id'
+    title_field: str = 'title'
+    has_images: bool = True
+
+
+DEFAULT_CATALOGS = (
+    CatalogSpec('database.json', 'public/data/database.json'),
+    CatalogSpec('artworks-metadata.json', 'public/data/artworks-metadata.json'),
+    CatalogSpec('seo-artworks.json', 'public/data/seo-artworks.json'),
+    CatalogSpec('works-complete-catalog.json', 'public/data/works-complete-catalog.json',
+                key='works', id_field=None, title_field='titulo', has_images=False),
+)
+
+
+@dataclass
+class Issue:
+    kind: str        # missing | corrupt | checksum | duplicate-id | unreadable | orphan | unmatched
+    catalog: str
+    subject: str     # entry id/title or filename
+    message: str
+    severity: str = 'error'
+
+    def as_dict(self):
+        return {'kind': self.kind, 'catalog': self.catalog, 'subject': self.subject,
+                'message': self.message, 'severity': self.severity}
+
+
+@dataclass
+class AuditReport:
+    image_dir: str
+    catalogs: dict = field(default_factory=dict)    # name -> {'entries', 'references', 'seconds'}
+    issues: list = field(default_factory=list)
+    files_checked: int = 0
+    timings: dict = field(default_factory=dict)
+
+    @property
+    def errors(self):
+        return [i for i in self.issues if i.severity == 'error']
+
+    @property
+    def warnings(self):
+        return [i for i in self.issues if i.severity == 'warning']
+
+    @property
+    def ok(self):
+        return not self.errors
+
+    def as_dict(self):
+        return {
+            'image_dir': self.image_dir,
+            'ok': self.ok,
+            'files_checked': self.files_checked,
+            'catalogs': self.catalogs,
+            'timings': {k: round(v, 4) for k, v in self.timings.items()},
+            'errors': len(self.errors),
+            'warnings': len(self.warnings),
+            'issues': [i.as_dict() for i in self.issues],
+        }
+
+    def to_json(self):
+        return json.dumps(self.as_dict(), indent=2, ensure_ascii=False)
+
+    def to_junit(self):
+        """One testsuite per catalog (plus one for orphans); warnings are skipped cases."""
+        root = ET.Element('testsuites', name='integrity-audit', tests='0', failures='0',
+                          time=f"{self.timings.get('total', 0):.3f}")
+        suites = {name: [] for name in self.catalogs}
+        suites['images'] = []
+        for issue in self.issues:
+            suites.setdefault(issue.catalog, []).append(issue)
+
+        total = failures = 0
+        for name, issues in suites.items():
+            info = self.catalogs.get(name, {})
+            checked = info.get('references', 0) if name != 'images' else self.files_checked
+            failed = sum(1 for i in issues if i.severity == 'error')
+            suite = ET.SubElement(root, 'testsuite', name=name, tests=str(max(checked, len(issues))),
+                                  failures=str(failed), time=f"{info.get('seconds', 0):.3f}")
+            for issue in issues:
+                case = ET.SubElement(suite, 'testcase', classname=f"{name}.{issue.kind}", name=issue.subject)
+                tag = 'failure' if issue.severity == 'error' else 'skipped'
+                ET.SubElement(case, tag, type=issue.kind, message=issue.message)
+            passed = max(checked, len(issues)) - len(issues)
+            if passed:
+                ET.SubElement(suite, 'testcase', classname=f"{name}.ok", name=f"{passed} checks passed")
+            total += max(checked, len(issues))
+            failures += failed
+        root.set('tests', str(total))
+        root.set('failures', str(failures))
+        ET.indent(root)
+        return ET.tostring(root, encoding='unicode', xml_declaration=True)
+
+
+def load_checksums(path):
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_checksums(path, checksums):
+    write_atomic(path, json.dumps(checksums, indent=2, sort_keys=True))
+
+
+def check_file(path, decode=False, hash_file=False):
+    """Stat, optionally hash and decode one image. Runs on a worker thread."""
+    start = time.perf_counter()
+    result = {'exists': False, 'sha256': None, 'decode_error': None}
+    try:
+        result['size'] = os.stat(path).st_size
+        result['exists'] = True
+    except FileNotFoundError:
+        result['seconds'] = time.perf_counter() - start
+        return result
+    if hash_file:
+        result['sha256'] = file_sha256(path)
+    if decode:
+        # Imported here so plain reference checks don't need Pillow
+        from PIL import Image
+        try:
+            with Image.open(path) as img:
+                img.load()
+        except Exception as e:
+            result['decode_error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+
+def _load(spec, base_dir):
+    path = os.path.join(base_dir, spec.path)
+    try:
+        return ArtworkCatalog.load(path, key=spec.key)
+    except FileNotFoundError:
+        return None
+
+
+def run_audit(specs=DEFAULT_CATALOGS, image_dir='images/artworks', base_dir='.', decode=False,
+              checksums_path=None, update_checksums=False, workers=DEFAULT_WORKERS):
+    """Audit `specs` against `image_dir`; returns an AuditReport."""
+    started = time.perf_counter()
+    image_dir = os.path.join(base_dir, image_dir)
+    report = AuditReport(image_dir=image_dir)
+
+    # 1. Load catalogs and collect references
+    t = time.perf_counter()
+    loaded = {}
+    for spec in specs:
+        try:
+            catalog = _load(spec, base_dir)
+        except (ValueError, json.JSONDecodeError) as e:
+            report.issues.append(Issue('unreadable', spec.name, spec.path, str(e)))
+            continue
+        if catalog is None:
+            report.issues.append(Issue('unreadable', spec.name, spec.path, "file not found"))
+            continue
+        loaded[spec] = catalog
+    report.timings['load'] = time.perf_counter() - t
+
+    references = {}   # filename -> [(catalog name, entry label)]
+    for spec, catalog in loaded.items():
+        count = 0
+        seen_ids = set()
+        for entry in catalog:
+            art_id = entry.get(spec.id_field) if spec.id_field else None
+            label = str(art_id or entry.get(spec.title_field) or '?')
+            if art_id is not None:
+                if art_id in seen_ids:
+                    report.issues.append(Issue('duplicate-id', spec.name, str(art_id),
+                                               f"id '{art_id}' appears more than once"))
+                seen_ids.add(art_id)
+            name = image_name(entry) if spec.has_images else None
+            if name:
+                references.setdefault(name, []).append((spec.name, label))
+                count += 1
+        report.catalogs[spec.name] = {'entries': len(catalog), 'references': count, 'seconds': 0.0}
+
+    # 2. Referenced + physical files through the thread pool
+    t = time.perf_counter()
+    try:
+        physical = {f for f in os.listdir(image_dir) if f.lower().endswith(IMAGE_EXTENSIONS)}
+    except FileNotFoundError:
+        report.issues.append(Issue('missing', 'images', image_dir, "image directory does not exist"))
+        physical = set()
+
+    stored = load_checksums(checksums_path)
+    hash_files = bool(checksums_path)
+    names = sorted(set(references) | physical)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = dict(zip(names, pool.map(
+            lambda n: check_file(os.path.join(image_dir, n), decode, hash_files), names)))
+    report.files_checked = len(names)
+    report.timings['files'] = time.perf_counter() - t
+    report.timings['file_cpu'] = sum(r['seconds'] for r in results.values())
+
+    # 3. Turn per-file results into issues
+    for name, refs in sorted(references.items()):
+        res = results[name]
+        for catalog_name, label in refs:
+            report.catalogs[catalog_name]['seconds'] += res['seconds']
+            if not res['exists']:
+                report.issues.append(Issue('missing', catalog_name, label, f"{name} does not exist"))
+    for name in names:
+        res = results[name]
+        if not res['exists']:
+            continue
+        if res['decode_error']:
+            report.issues.append(Issue('corrupt', 'images', name, res['decode_error']))
+        expected = stored.get(name)
+        if expected and res['sha256'] and expected != res['sha256']:
+            report.issues.append(Issue('checksum', 'images', name,
+                                       f"sha256 {res['sha256'][:12]}… != stored {expected[:12]}…"))
+        if name not in references:
+            report.issues.append(Issue('orphan', 'images', name,
+                                       "file is not referenced by any catalog", 'warning'))
+
+    # 4. Image-less catalogs: every work should exist in an image catalog by title
+    t = time.perf_counter()
+    image_entries = [e for s, c in loaded.items() if s.has_images for e in c if e.get('title')]
+    matcher = TitleMatcher(image_entries) if image_entries else None
+    for spec, catalog in loaded.items():
+        if spec.has_images or matcher is None:
+            continue
+        for entry in catalog:
+            title = entry.get(spec.title_field)
+            if title and matcher.match_title(title)[0] is None:
+                report.issues.append(Issue('unmatched', spec.name, title,
+                                           "no artwork with this title in the image catalogs", 'warning'))
+    report.timings['titles'] = time.perf_counter() - t
+
+    if update_checksums and checksums_path:
+        current = {n: r['sha256'] for n, r in results.items() if r['sha256'] and not r['decode_error']}
+        if current != stored:
+            save_checksums(checksums_path, current)
+
+    report.timings['total'] = time.perf_counter() - started
+    return report
+
+
+def print_report(report):
+    """The human-readable report verify_integrity.py has always printed."""
+    print("\n" + "=" * 40)
+    print("📊 INTEGRITY REPORT")
+    print("=" * 40)
+    for name, info in report.catalogs.items():
+        print(f"   {name}: {info['entries']} entries, {info['references']} image references")
+
+    by_kind = {}
+    for issue in report.issues:
+        by_kind.setdefault(issue.kind, []).append(issue)
+
+    titles = {
+        'unreadable': "❌ UNREADABLE CATALOGS",
+        'duplicate-id': "❌ DUPLICATE IDS",
+        'missing': "❌ MISSING IMAGES",
+        'corrupt': "❌ IMAGES THAT DON'T DECODE",
+        'checksum': "❌ CHECKSUM MISMATCHES",
+        'orphan': "⚠️  ORPHANED FILES",
+        'unmatched': "⚠️  WORKS WITHOUT A MATCHING ARTWORK",
+    }
+    for kind, heading in titles.items():
+        issues = by_kind.get(kind)
+        if not issues:
+            continue
+        print(f"\n{heading} ({len(issues)}):")
+        for issue in issues:
+            where = f"[{issue.catalog}] " if issue.catalog != 'images' else ""
+            print(f"   - {where}{issue.subject}: {issue.message}")
+
+    if not by_kind.get('missing'):
+        print("\n✅ All JSON references point to existing files.")
+    if not by_kind.get('orphan'):
+        print("✅ No orphaned files found.")
+
+    t = report.timings
+    print(f"\n⏱️  {report.files_checked} files in {t.get('files', 0):.2f}s "
+          f"({t.get('file_cpu', 0):.2f}s of per-file work), total {t.get('total', 0):.2f}s")
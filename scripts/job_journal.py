@@ -0,0 +1,90 @@
+"""
+Journal write-ahead de los shots de UltraCinePipeline.
+
+Cada cambio de estado de un shot se añade como una línea JSON a
+`<output_dir>/journal.jsonl` (append + fsync) antes de continuar:
+
+    queued -> submitted (nombre de la operación) -> downloading -> done
+                                                               \\-> failed
+
+Si el proceso muere, al reiniciar se lee el último estado de cada shot:
+los que quedaron en `submitted`/`downloading` ya están pagados en Veo y
+se vuelven a enganchar a su operación en lugar de enviarse otra vez.
+
+Añadir una línea cuesta lo mismo con 3 shots que con 300; el journal se
+compacta (un registro por shot, escritura atómica) al abrirlo.
+
+    journal = JobJournal(output_dir / "journal.jsonl")
+    journal.record("trans_rocks_vA", "submitted", operation="models/.../operations/123")
+    pending = journal.in_flight()
+"""
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from catalog import write_atomic
+
+QUEUED = "queued"
+SUBMITTED = "submitted"
+DOWNLOADING = "downloading"
+DONE = "done"
+FAILED = "failed"
+IN_FLIGHT_STATES = (SUBMITTED, DOWNLOADING)
+
+
+class JobJournal:
+    """Log append-only de estados por shot, con el último estado en memoria"""
+
+    def __init__(self, path, compact: bool = True):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.jobs: Dict[str, Dict] = {}
+        self._replay()
+        if compact and self.path.exists():
+            self.compact()
+
+    def _replay(self):
+        if not self.path.exists():
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Última línea a medio escribir en un crash: se ignora
+                    continue
+                state = self.jobs.setdefault(record["job"], {})
+                state.update(record)
+
+    def record(self, job: str, state: str, **fields) -> Dict:
+        """Añade un cambio de estado y lo fuerza a disco antes de volver"""
+        record = {"job": job, "state": state, "ts": datetime.now().isoformat(), **fields}
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.jobs.setdefault(job, {}).update(record)
+            return dict(self.jobs[job])
+
+    def get(self, job: str) -> Optional[Dict]:
+        with self._lock:
+            state = self.jobs.get(job)
+            return dict(state) if state else None
+
+    def in_flight(self) -> List[Dict]:
+        """Shots enviados a Veo que no llegaron a terminar"""
+        with self._lock:
+            return [dict(s) for s in self.jobs.values()
+                    if s.get("state") in IN_FLIGHT_STATES and s.get("operation")]
+
+    def compact(self):
+        """Reescribe el journal con un solo registro por shot"""
+        with self._lock:
+            text = "".join(json.dumps(state, ensure_ascii=False) + "\n" for state in self.jobs.values())
+            write_atomic(self.path, text)
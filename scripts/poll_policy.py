@@ -0,0 +1,98 @@
+"""
+Política de consulta (polling) para operaciones de Veo.
+
+Una generación tarda minutos; consultar cada 2 segundos gasta cuota de
+`requests_per_minute` sin adelantar nada. PollPolicy espera un retraso
+inicial, luego consulta con intervalos que crecen de forma exponencial
+hasta un tope, con jitter para que varios shots no consulten a la vez,
+y se rinde tras un timeout total.
+
+PollHistory aprende de project_log.json cuánto tarda cada modelo y
+ajusta el retraso inicial para que la primera consulta llegue justo
+antes del tiempo típico de finalización.
+
+    history = PollHistory.from_log("output/proj/project_log.json")
+    policy = history.policy_for("veo-3.1-generate-preview")
+    delay = policy.next_delay(polls=0)
+"""
+import json
+import random
+import statistics
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Muestras por modelo que se conservan en el log
+HISTORY_LIMIT = 50
+# Fracción del tiempo típico a la que se hace la primera consulta
+FIRST_POLL_FRACTION = 0.85
+
+
+@dataclass(frozen=True)
+class PollPolicy:
+    """Retraso inicial + backoff exponencial con tope, jitter y timeout"""
+    initial_delay: float = 20.0
+    min_interval: float = 2.0
+    factor: float = 1.6
+    max_interval: float = 30.0
+    jitter: float = 0.1
+    timeout: float = 900.0
+
+    def next_delay(self, polls: int, rng=random) -> float:
+        """Segundos hasta la consulta número `polls + 1`"""
+        if polls == 0:
+            base = self.initial_delay
+        else:
+            base = min(self.max_interval, self.min_interval * self.factor ** (polls - 1))
+        if self.jitter:
+            base *= 1 + rng.uniform(-self.jitter, self.jitter)
+        return max(0.0, base)
+
+    def expired(self, elapsed: float) -> bool:
+        return elapsed > self.timeout
+
+
+class PollHistory:
+    """Duraciones observadas por modelo (segundos desde el envío hasta `done`)"""
+
+    def __init__(self, durations: Optional[Dict[str, List[float]]] = None):
+        self.durations = {model: list(values) for model, values in (durations or {}).items()}
+
+    @classmethod
+    def from_log(cls, log_path) -> "PollHistory":
+        """Lee `poll_history` y los shots con `generation_seconds` del log previo"""
+        path = Path(log_path)
+        if not path.exists():
+            return cls()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                log = json.load(f)
+        except (OSError, ValueError):
+            return cls()
+        history = cls(log.get("poll_history"))
+        if not log.get("poll_history"):
+            for shot in log.get("shots", []):
+                if shot.get("model") and shot.get("generation_seconds"):
+                    history.record(shot["model"], shot["generation_seconds"])
+        return history
+
+    def record(self, model: str, seconds: float):
+        samples = self.durations.setdefault(model, [])
+        samples.append(round(seconds, 1))
+        del samples[:-HISTORY_LIMIT]
+
+    def typical(self, model: str) -> Optional[float]:
+        samples = self.durations.get(model)
+        return statistics.median(samples) if samples else None
+
+    def policy_for(self, model: str, base: Optional[PollPolicy] = None) -> PollPolicy:
+        """`base` con el retraso inicial ajustado al historial del modelo"""
+        base = base or PollPolicy()
+        typical = self.typical(model)
+        if typical is None:
+            return base
+        initial = min(max(typical * FIRST_POLL_FRACTION, base.min_interval), base.timeout / 2)
+        return replace(base, initial_delay=initial)
+
+    def as_dict(self) -> Dict[str, List[float]]:
+        return {model: list(values) for model, values in self.durations.items()}
@@ -1,6 +1,17 @@
+import argparse
 import os
 import sys
-from PIL import Image
+
+from hires_engine import (
+    DEFAULT_GLOB,
+    DEFAULT_MANIFEST_PATH,
+    DEFAULT_STATE_PATH,
+    RenderSettings,
+    glob_sources,
+    load_manifest,
+    print_summary,
+    run_batch,
+)
 
 # Config
 TARGET_SIZE = 3840  # 4K resolution for "Ultra Premium"
@@ -11,63 +22,43 @@ SOURCES = {
     "public/images/artworks/source-amy.png": "public/images/artworks/amy-rocks.webp",
     "public/images/artworks/source-james.png": "public/images/artworks/james-rocks-hq-3.webp",
     "public/images/artworks/source-johnny.png": "public/images/artworks/johnny-rocks-hq-5.webp",
-    
+
     # Previous Batch (Keeping for reference)
     "public/images/artworks/cantinflas-platos-source.png": "public/images/artworks/cantinflas-0.webp",
     "public/images/artworks/source-portrait-1.png": "public/images/artworks/cantinflas-1.webp",
     "public/images/artworks/source-portrait-2.png": "public/images/artworks/johnny-rocks-hq-4.webp"
 }
 
-def process_image(source_path, dest_path):
-    if not os.path.exists(source_path):
-        print(f"❌ Source not found: {source_path}")
-        return
-
-    try:
-        print(f"🔄 Processing {source_path}...")
-        
-        # Disable decompression bomb checks for huge images
-        Image.MAX_IMAGE_PIXELS = None
-        
-        with Image.open(source_path) as img:
-            # Get dimensions
-            width, height = img.size
-            print(f"   Original size: {width}x{height}")
-
-            # Calculate new size (max dimension = TARGET_SIZE)
-            # Only resize down if larger
-            if width > TARGET_SIZE or height > TARGET_SIZE:
-                ratio = min(TARGET_SIZE / width, TARGET_SIZE / height)
-                new_width = int(width * ratio)
-                new_height = int(height * ratio)
-                img = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-                print(f"   Resized to: {new_width}x{new_height}")
-            else:
-                print("   Size within target limits, keeping original.")
-
-            # Save as WebP
-            img.save(dest_path, 'WEBP', quality=QUALITY)
-            print(f"✅ Saved to {dest_path}")
-            
-            # Generate Thumbnail (500px)
-            thumb_path = dest_path.replace("/artworks/", "/thumbnails-webp/")
-            thumb_dir = os.path.dirname(thumb_path)
-            if not os.path.exists(thumb_dir):
-                os.makedirs(thumb_dir)
-            
-            # Create a copy for thumbnail
-            thumb_img = img.copy()
-            thumb_img.thumbnail((500, 500))
-            thumb_img.save(thumb_path, 'WEBP', quality=85)
-            print(f"   Thumbnail created at {thumb_path}")
-
-    except Exception as e:
-        print(f"🚨 Error processing {source_path}: {e}")
-        import traceback
-        traceback.print_exc()
+def parse_args():
+    parser = argparse.ArgumentParser(description="Naroa High-Res Processing")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--manifest", help="JSON {source: dest} or [{source, dest}] (default: built-in SOURCES)")
+    source.add_argument("--glob", nargs="?", const=DEFAULT_GLOB, metavar="PATTERN",
+                        help=f"process every match, source-<name>.png -> <name>.webp (default: {DEFAULT_GLOB})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="process pool size")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="resume state file")
+    parser.add_argument("--renditions", default=DEFAULT_MANIFEST_PATH, help="srcset rendition manifest")
+    parser.add_argument("--force", action="store_true", help="rebuild even if up to date")
+    parser.add_argument("--fast-thumbs", action="store_true",
+                        help="only write 500px thumbnails, decoding JPEGs at reduced resolution")
+    parser.add_argument("--max-memory", type=int, default=0, metavar="MB",
+                        help="stream PNG sources in strips to stay under this much memory per worker")
+    return parser.parse_args()
 
 if __name__ == "__main__":
-    print(f"🎨 Naroa High-Res Processing (Target: {TARGET_SIZE}px)")
+    args = parse_args()
+    if args.manifest:
+        jobs = load_manifest(args.manifest)
+    elif args.glob:
+        jobs = glob_sources(args.glob)
+    else:
+        jobs = list(SOURCES.items())
+
+    settings = RenderSettings(target_size=TARGET_SIZE, quality=QUALITY, fast_thumbs=args.fast_thumbs,
+                              memory_limit_mb=args.max_memory)
+    print(f"🎨 Naroa High-Res Processing (Target: {TARGET_SIZE}px, {args.workers} workers)")
     print("==================================================")
-    for src, dest in SOURCES.items():
-        process_image(src, dest)
+    report = run_batch(jobs, settings, workers=args.workers, state_path=args.state,
+                       manifest_path=args.renditions, force=args.force)
+    print_summary(report)
+    sys.exit(1 if report['failed'] else 0)
@@ -0,0 +1,151 @@
+"""
+Rate limiting por token bucket para las llamadas a Veo.
+
+Cada tipo de llamada (envío, consulta, descarga) tiene su propio bucket:
+se rellena a `per_minute / 60` tokens por segundo hasta `burst` tokens,
+así que tras un rato sin actividad se pueden hacer `burst` llamadas de
+golpe y, a la larga, nunca más de `per_minute` por minuto.
+
+Con `shared_path` el estado de los buckets vive en una base SQLite local
+y varias pipelines (hilos o procesos) de la misma máquina comparten la
+cuota; SQLite serializa las transacciones entre procesos.
+
+    limiter = RateLimiter({"submit": 16, "poll": 60, "download": 30})
+    limiter.acquire("submit")
+"""
+import os
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+SQLITE_TIMEOUT = 30.0
+
+
+class TokenBucket:
+    """Bucket en memoria, seguro entre hilos."""
+
+    def __init__(self, per_minute: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        if per_minute <= 0:
+            raise ValueError("per_minute debe ser positivo")
+        self.rate = per_minute / 60.0
+        self.capacity = float(burst if burst is not None else per_minute)
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = clock()
+
+    def _take(self, tokens: float) -> float:
+        """Consume si hay tokens; si no, segundos hasta que los haya."""
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> float:
+        """Bloquea hasta obtener `tokens`; devuelve los segundos esperados.
+
+        Con `timeout` lanza TimeoutError si la espera sería más larga.
+        """
+        if tokens > self.capacity:
+            raise ValueError(f"{tokens} tokens no caben en un bucket de {self.capacity}")
+        waited = 0.0
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return waited
+            if timeout is not None and waited + wait > timeout:
+                raise TimeoutError(f"rate limit: harían falta {waited + wait:.1f}s")
+            self.sleep(wait)
+            waited += wait
+
+
+class SharedTokenBucket(TokenBucket):
+    """Bucket cuyo estado vive en SQLite, compartido entre procesos.
+
+    Usa el reloj de pared por defecto: los relojes monotónicos no son
+    comparables entre procesos.
+    """
+
+    def __init__(self, path: str, name: str, per_minute: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], None] = time.sleep):
+        super().__init__(per_minute, burst, clock, sleep)
+        self.path = os.fspath(path)
+        self.name = name
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as db:
+            db.execute("CREATE TABLE IF NOT EXISTS buckets ("
+                       "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)")
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=SQLITE_TIMEOUT, isolation_level=None)
+
+    def _take(self, tokens: float) -> float:
+        db = self._connect()
+        try:
+            # IMMEDIATE toma el lock de escritura antes de leer: nadie más
+            # puede gastar los mismos tokens entre la lectura y la escritura
+            db.execute("BEGIN IMMEDIATE")
+            now = self.clock()
+            row = db.execute("SELECT tokens, updated FROM buckets WHERE name = ?",
+                             (self.name,)).fetchone()
+            available = self.capacity if row is None else min(
+                self.capacity, row[0] + max(0.0, now - row[1]) * self.rate)
+            wait = 0.0
+            if available >= tokens:
+                available -= tokens
+            else:
+                wait = (tokens - available) / self.rate
+            db.execute("INSERT OR REPLACE INTO buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                       (self.name, available, now))
+            db.execute("COMMIT")
+            return wait
+        except BaseException:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            raise
+        finally:
+            db.close()
+
+
+class RateLimiter:
+    """Un bucket por tipo de llamada, con contadores de espera."""
+
+    def __init__(self, limits: Dict[str, float], burst: Optional[Dict[str, float]] = None,
+                 shared_path: Optional[str] = None, scope: str = "veo", **bucket_kwargs):
+        burst = burst or {}
+        self.buckets = {}
+        for kind, per_minute in limits.items():
+            if shared_path:
+                self.buckets[kind] = SharedTokenBucket(shared_path, f"{scope}:{kind}", per_minute,
+                                                       burst.get(kind), **bucket_kwargs)
+            else:
+                self.buckets[kind] = TokenBucket(per_minute, burst.get(kind), **bucket_kwargs)
+        self._lock = threading.Lock()
+        self.calls = {kind: 0 for kind in limits}
+        self.waited = {kind: 0.0 for kind in limits}
+
+    def acquire(self, kind: str, timeout: Optional[float] = None) -> float:
+        bucket = self.buckets.get(kind)
+        if bucket is None:
+            return 0.0
+        waited = bucket.acquire(timeout=timeout)
+        with self._lock:
+            self.calls[kind] += 1
+            self.waited[kind] += waited
+        return waited
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {kind: {"calls": self.calls[kind], "waited_s": round(self.waited[kind], 2)}
+                    for kind in self.buckets}
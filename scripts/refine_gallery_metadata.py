@@ -1,31 +1,16 @@
 
-import json
-import os
 import re
 
+from catalog import ArtworkCatalog
+
 DATABASE_PATH = 'data/database.json'
 
 def main():
-    with open(DATABASE_PATH, 'r') as f:
-        database = json.load(f)
-    
-    # Create a map of normalized "base" names to entries
-    # e.g. "portrait-2" -> [entry_hq, entry_web]
-    base_map = {}
-    
-    # Helper to get base name
-    def get_base_name(id_str):
-        if id_str.startswith('hq-'):
-            return id_str[3:]
-        if id_str.startswith('web-'):
-            return id_str[4:]
-        return id_str
+    catalog = ArtworkCatalog.load(DATABASE_PATH)
 
-    for entry in database:
-        base = get_base_name(entry['id'])
-        if base not in base_map:
-            base_map[base] = []
-        base_map[base].append(entry)
+    # Normalized "base" names to entries
+    # e.g. "portrait-2" -> [entry_hq, entry_web]
+    base_map = catalog.by_base_id
 
     new_database = []
     removed_count = 0
@@ -77,11 +62,15 @@ def main():
         if entry['id'] not in base_ids:
             final_database.append(entry)
             base_ids.add(entry['id'])
-    
-    with open(DATABASE_PATH, 'w') as f:
-        json.dump(final_database, f, indent=2, ensure_ascii=False)
 
-    print(f"Cleanup complete.\nRemoved duplicates: {removed_count}\nRenamed/Cleaned: {renamed_count}\nTotal unique entries: {len(final_database)}")
+    # by_base_id only indexes entries with an id; keep the rest as they are
+    without_id = [entry for entry in catalog if entry.get('id') is None]
+    final_database.extend(without_id)
+
+    catalog.replace(final_database)
+    catalog.save()
+
+    print(f"Cleanup complete.\nRemoved duplicates: {removed_count}\nRenamed/Cleaned: {renamed_count}\nKept without id: {len(without_id)}\nTotal unique entries: {len(final_database)}")
 
 if __name__ == "__main__":
     main()
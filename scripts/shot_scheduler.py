@@ -0,0 +1,177 @@
+"""
+Scheduler concurrente de shots para UltraCinePipeline.
+
+Veo es asíncrono: `generate_videos` devuelve una operación que tarda
+minutos en completarse. En lugar de esperar cada shot en serie, el
+scheduler mantiene hasta `max_in_flight` operaciones abiertas, las
+consulta todas en cada ronda y entrega las terminadas a un pool de
+descargas mientras sigue enviando shots pendientes.
+
+El scheduler no sabe nada de Veo: recibe tres callables, así que se
+puede probar con un cliente falso que simule la latencia.
+
+    scheduler = ShotScheduler(submit=..., poll=..., finish=..., max_in_flight=4)
+    jobs = scheduler.run([ShotJob(shot) for shot in shots])
+"""
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_DOWNLOAD_WORKERS = 4
+DEFAULT_POLL_INTERVAL = 2.0
+# Errores de red seguidos antes de dar una operación por perdida
+MAX_POLL_ERRORS = 5
+
+
+@dataclass
+class ShotJob:
+    """Estado de un shot a lo largo del scheduler"""
+    shot: Any
+    refs: Optional[list] = None
+    operation: Any = None
+    cost: float = 0.0
+    prompt: Optional[str] = None
+    polls: int = 0
+    submitted_at: Optional[float] = None
+    completed_at: Optional[float] = None
+    next_poll_at: float = 0.0
+    policy: Any = None
+    result: Optional[Dict] = None
+    error: Optional[BaseException] = None
+    extra: Dict = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        return self.result is not None
+
+
+class ShotScheduler:
+    """Envía, consulta y descarga shots con un límite de concurrencia.
+
+    - submit(job): envía el shot y asigna job.operation (aplica rate
+      limit y presupuesto; si lanza, el job falla sin ocupar hueco)
+    - poll(job): refresca job.operation
+    - finish(job) -> dict: descarga y registra; corre en el pool
+    - abandon(job): opcional, se llama si una operación enviada se da
+      por perdida (MAX_POLL_ERRORS fallos seguidos o timeout)
+    - poll_policy(job) -> PollPolicy: opcional; sin ella se consulta
+      cada `poll_interval` segundos
+    """
+
+    def __init__(self, submit: Callable, poll: Callable, finish: Callable,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                 download_workers: int = DEFAULT_DOWNLOAD_WORKERS,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep,
+                 abandon: Optional[Callable] = None,
+                 poll_policy: Optional[Callable] = None):
+        self.submit = submit
+        self.poll = poll
+        self.finish = finish
+        self.abandon = abandon
+        self.poll_policy = poll_policy
+        self.max_in_flight = max(1, max_in_flight)
+        self.download_workers = max(1, download_workers)
+        self.poll_interval = poll_interval
+        self.clock = clock
+        self.sleep = sleep
+        self._stop = threading.Event()
+
+    def stop(self):
+        """No envía más shots; los que están en vuelo terminan."""
+        self._stop.set()
+
+    def _next_poll(self, job: ShotJob, now: float) -> float:
+        if job.policy is None:
+            return now + self.poll_interval
+        return now + job.policy.next_delay(job.polls)
+
+    def _give_up(self, job: ShotJob, error: BaseException, in_flight: List[ShotJob]):
+        job.error = error
+        in_flight.remove(job)
+        if self.abandon:
+            self.abandon(job)
+
+    def run(self, jobs: List[ShotJob]) -> List[ShotJob]:
+        """Procesa todos los jobs; devuelve la misma lista con result/error."""
+        pending = deque(jobs)
+        in_flight: List[ShotJob] = []
+        downloads = {}
+
+        with ThreadPoolExecutor(max_workers=self.download_workers,
+                                thread_name_prefix="shot-download") as pool:
+            while pending or in_flight or downloads:
+                # 1. Rellenar huecos libres
+                while pending and len(in_flight) < self.max_in_flight and not self._stop.is_set():
+                    job = pending.popleft()
+                    try:
+                        self.submit(job)
+                    except Exception as e:
+                        job.error = e
+                        logger.error(f"✗ Error enviando {getattr(job.shot, 'shot_id', job.shot)}: {e}")
+                        continue
+                    now = self.clock()
+                    job.submitted_at = now
+                    if self.poll_policy:
+                        job.policy = self.poll_policy(job)
+                    job.next_poll_at = self._next_poll(job, now)
+                    in_flight.append(job)
+                if self._stop.is_set():
+                    pending.clear()
+
+                # 2. Consultar las operaciones que tocan en esta ronda
+                now = self.clock()
+                for job in list(in_flight):
+                    if job.next_poll_at > now:
+                        continue
+                    if job.policy is not None and job.policy.expired(now - job.submitted_at):
+                        logger.error(f"✗ Timeout esperando {getattr(job.shot, 'shot_id', job.shot)} "
+                                     f"tras {job.polls} consultas")
+                        self._give_up(job, TimeoutError(f"operación sin terminar tras "
+                                                        f"{now - job.submitted_at:.0f}s"), in_flight)
+                        continue
+                    try:
+                        job.polls += 1
+                        self.poll(job)
+                        job.extra.pop('poll_errors', None)
+                    except Exception as e:
+                        errors = job.extra['poll_errors'] = job.extra.get('poll_errors', 0) + 1
+                        logger.warning(f"Error consultando {getattr(job.shot, 'shot_id', job.shot)} "
+                                       f"({errors}/{MAX_POLL_ERRORS}): {e}")
+                        if errors >= MAX_POLL_ERRORS:
+                            self._give_up(job, e, in_flight)
+                        else:
+                            job.next_poll_at = self._next_poll(job, self.clock())
+                        continue
+                    if job.operation.done:
+                        job.completed_at = self.clock()
+                        in_flight.remove(job)
+                        downloads[pool.submit(self.finish, job)] = job
+                    else:
+                        job.next_poll_at = self._next_poll(job, self.clock())
+
+                # 3. Recoger descargas terminadas y esperar al siguiente evento
+                timeout = None
+                if in_flight:
+                    timeout = max(0.0, min(j.next_poll_at for j in in_flight) - self.clock())
+                if downloads:
+                    done, _ = wait(downloads, timeout=timeout, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        job = downloads.pop(future)
+                        try:
+                            job.result = future.result()
+                        except Exception as e:
+                            job.error = e
+                            logger.error(f"✗ Error en {getattr(job.shot, 'shot_id', job.shot)}: {e}")
+                elif timeout:
+                    self.sleep(timeout)
+
+        return jobs
@@ -0,0 +1,255 @@
+"""
+Strip-wise downscaling for gigapixel PNG sources.
+
+Pillow can only decode a PNG in one go, so a 30k x 30k scan costs
+several GB before the first resize. Here the IDAT stream is inflated
+incrementally and handed to Pillow's own PNG ("zip") decoder a strip of
+rows at a time. Each strip is box-reduced by an integer factor and pasted
+into a small intermediate image, which gets the final LANCZOS pass. The
+full-resolution bitmap never exists.
+
+PNG filters reference the previous row, so each strip is decoded with the
+last reconstructed row of the previous strip prepended as an unfiltered
+row. Only 8-bit, non-interlaced PNGs are handled; anything else raises
+StreamingUnsupported and callers fall back to a normal decode.
+"""
+import math
+import struct
+import zlib
+
+from PIL import Image
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+READ_CHUNK = 1024 * 1024
+DEFAULT_MEMORY_LIMIT_MB = 512
+# Headroom for the interpreter, Pillow and the encoder output
+BASELINE_MB = 64
+
+# (color type, bit depth) -> (mode, rawmode, bytes per pixel)
+PNG_MODES = {
+    (0, 8): ('L', 'L', 1),
+    (2, 8): ('RGB', 'RGB', 3),
+    (3, 8): ('P', 'P', 1),
+    (4, 8): ('LA', 'LA', 2),
+    (6, 8): ('RGBA', 'RGBA', 4),
+}
+
+
+class StreamingUnsupported(ValueError):
+    """The source can't be streamed; decode it normally instead."""
+
+
+def _read_chunks(f):
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        length, ctype = struct.unpack('>I4s', header)
+        yield ctype, length
+        if ctype == b'IEND':
+            return
+
+
+class PngStripReader:
+    """Yields successive strips of a PNG as Pillow images."""
+
+    def __init__(self, path):
+        self.path = path
+        self.palette = None
+        self.transparency = None
+        self._idat_offset = None
+
+        with open(path, 'rb') as f:
+            if f.read(8) != PNG_SIGNATURE:
+                raise StreamingUnsupported(f"{path} is not a PNG")
+            for ctype, length in _read_chunks(f):
+                if ctype == b'IHDR':
+                    data = f.read(length)
+                    f.seek(4, 1)
+                    (self.width, self.height, bit_depth, color_type,
+                     _, _, interlace) = struct.unpack('>IIBBBBB', data)
+                    if interlace:
+                        raise StreamingUnsupported("interlaced PNG")
+                    if (color_type, bit_depth) not in PNG_MODES:
+                        raise StreamingUnsupported(f"PNG color type {color_type} / {bit_depth}-bit")
+                    self.mode, self.rawmode, self.bpp = PNG_MODES[(color_type, bit_depth)]
+                elif ctype == b'PLTE':
+                    self.palette = f.read(length)
+                    f.seek(4, 1)
+                elif ctype == b'tRNS':
+                    self.transparency = f.read(length)
+                    f.seek(4, 1)
+                elif ctype == b'IDAT':
+                    self._idat_offset = f.tell() - 8
+                    break
+                else:
+                    f.seek(length + 4, 1)
+
+        if self._idat_offset is None:
+            raise StreamingUnsupported("PNG without image data")
+        self.row_bytes = self.width * self.bpp
+
+    @property
+    def output_mode(self):
+        """Mode strips are converted to before reducing (reduce() has no P)."""
+        if self.mode == 'P':
+            return 'RGBA' if self.transparency else 'RGB'
+        return self.mode
+
+    def _idat_data(self, f):
+        f.seek(self._idat_offset)
+        for ctype, length in _read_chunks(f):
+            if ctype != b'IDAT':
+                f.seek(length + 4, 1)
+                continue
+            remaining = length
+            while remaining:
+                block = f.read(min(remaining, READ_CHUNK))
+                if not block:
+                    raise StreamingUnsupported("truncated IDAT")
+                remaining -= len(block)
+                yield block
+            f.seek(4, 1)
+
+    def _decode(self, filtered, rows, skip_first):
+        """Run Pillow's PNG row decoder on `rows` filtered rows.
+
+        `filtered` is emptied once its stored-zlib copy exists, so the two
+        never outlive each other; `skip_first` drops the prepended row.
+        """
+        compressed = zlib.compress(filtered, 0)
+        filtered.clear()
+        strip = Image.frombytes(self.mode, (self.width, rows), compressed, 'zip', self.rawmode)
+        del compressed
+        if skip_first:
+            strip = strip.crop((0, 1, self.width, rows))
+        return strip
+
+    def _finish(self, strip):
+        if self.mode == 'P':
+            strip.putpalette(self.palette)
+            if self.transparency:
+                strip.info['transparency'] = self.transparency
+            strip = strip.convert(self.output_mode)
+        return strip
+
+    def strips(self, strip_rows):
+        """Yield (y, image) for consecutive strips of `strip_rows` rows."""
+        stride = self.row_bytes + 1
+        prev_row = None
+        y = 0
+
+        with open(self.path, 'rb') as f:
+            idat = _Inflater(self._idat_data(f))
+            while y < self.height:
+                rows = min(strip_rows, self.height - y)
+                # The previous strip's last row goes in first, unfiltered, and
+                # the inflated rows are appended to the same buffer
+                filtered = bytearray(b'\x00' + prev_row) if prev_row is not None else bytearray()
+                skip = len(filtered)
+                idat.read_into(filtered, skip + rows * stride)
+                if len(filtered) < skip + rows * stride:
+                    raise StreamingUnsupported(
+                        f"PNG ended after {y + (len(filtered) - skip) // stride} of {self.height} rows")
+
+                strip = self._decode(filtered, rows + (prev_row is not None), prev_row is not None)
+                prev_row = strip.crop((0, rows - 1, self.width, rows)).tobytes('raw', self.rawmode)
+                yield y, self._finish(strip)
+                # Let the full-width strip go before the next one is inflated
+                del strip
+                y += rows
+
+
+class _Inflater:
+    """Inflates a stream of IDAT blocks on demand, never more than asked for."""
+
+    def __init__(self, blocks):
+        self._blocks = blocks
+        self._zlib = zlib.decompressobj()
+        self._tail = b''
+
+    def read_into(self, buffer, size):
+        """Append inflated bytes until `buffer` holds `size`; fewer only at the end."""
+        while len(buffer) < size:
+            exhausted = False
+            if not self._tail:
+                self._tail = next(self._blocks, b'')
+                exhausted = not self._tail
+            data = self._zlib.decompress(self._tail, size - len(buffer))
+            self._tail = self._zlib.unconsumed_tail
+            if exhausted and not data:
+                return
+            buffer += data
+
+
+def plan(width, height, target, bpp, memory_limit_mb, reducing_gap=2.0):
+    """Pick the box-reduce factor and strip height for a memory ceiling.
+
+    Returns (factor, strip_rows). The reduced intermediate should stay at
+    least `reducing_gap` times the target for a sharp final LANCZOS; the
+    gap shrinks towards 1.0 if the ceiling is too tight for it.
+    """
+    budget = (memory_limit_mb - BASELINE_MB) * 1024 * 1024
+    scale = max(width / target, height / target, 1.0)
+    max_factor = max(1, int(scale))
+
+    # Pillow keeps 3-channel images as 4 bytes per pixel; the final resize
+    # and the encoder each hold an output-sized buffer
+    output = math.ceil(width / scale) * math.ceil(height / scale) * 4 * 2
+
+    factor = max(1, min(max_factor, int(scale / reducing_gap)))
+    while True:
+        reduced = math.ceil(width / factor) * math.ceil(height / factor) * 4
+        strip_budget = budget - reduced - output
+        # strips() peaks at the filtered rows plus their stored-zlib copy,
+        # then at the decoded strip plus its crop (or palette convert);
+        # budgeting for both at once leaves room for the inflater and
+        # the reduced strip
+        per_row = width * (2 * bpp + 4 + 4) + 2
+        rows = strip_budget // per_row
+        if rows >= factor or factor >= max_factor:
+            break
+        factor += 1
+
+    if rows < factor:
+        raise MemoryError(f"{memory_limit_mb} MB is not enough to stream a {width}x{height} image")
+    rows = min(rows, height)
+    return factor, max(factor, rows - rows % factor)
+
+
+def full_decode_fits(size, target, memory_limit_mb):
+    """Whether a normal decode of an image of `size` stays under the ceiling.
+
+    Counts the full bitmap at 4 bytes per pixel plus one downscaled copy
+    (the reduce or resize output). When it fits, streaming only costs time.
+    """
+    pixels = size[0] * size[1]
+    copy = min(pixels, max(target * target, pixels // 4))
+    return (pixels + copy) * 4 <= (memory_limit_mb - BASELINE_MB) * 1024 * 1024
+
+
+def stream_resize(source_path, target, memory_limit_mb=DEFAULT_MEMORY_LIMIT_MB,
+                  resample=Image.Resampling.LANCZOS, strip_rows=None):
+    """Downscale `source_path` so its longest side is at most `target`.
+
+    Returns (image, original_size) without ever holding the full bitmap.
+    `strip_rows` overrides the planned strip height (rounded up to a
+    multiple of the reduce factor).
+    """
+    reader = PngStripReader(source_path)
+    width, height = reader.width, reader.height
+    factor, planned_rows = plan(width, height, target, reader.bpp, memory_limit_mb)
+    if strip_rows:
+        planned_rows = -(-strip_rows // factor) * factor
+
+    reduced = Image.new(reader.output_mode, (math.ceil(width / factor), math.ceil(height / factor)))
+    for y, strip in reader.strips(planned_rows):
+        reduced.paste(strip.reduce(factor) if factor > 1 else strip, (0, y // factor))
+        strip.close()
+
+    if width > target or height > target:
+        ratio = min(target / width, target / height)
+        size = (max(1, int(width * ratio)), max(1, int(height * ratio)))
+        if size != reduced.size:
+            reduced = reduced.resize(size, resample)
+    return reduced, (width, height)
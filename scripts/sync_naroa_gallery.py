@@ -1,8 +1,12 @@
+import argparse
 import json
-import os
 import re
 from pathlib import Path
 
+from catalog import ArtworkCatalog
+from folder_watch import DEFAULT_QUIET, PollingWatcher, batches, open_watcher
+from sync_state import SyncState, parse_since
+
 # Configuration
 PROJECT_ROOT = Path("/Users/borjafernandezangulo/game/naroa-2026")
 IMAGES_DIR = PROJECT_ROOT / "public/images/artworks"
@@ -61,99 +65,124 @@ def generate_seo(title, series, technique="Mixed Media"):
     
     return alt_text, meta_desc, schema
 
-def main():
-    print(f"Loading metadata from {DB_PATH}")
-    # Read existing data
-    try:
-        with open(DB_PATH, "r") as f:
-            # Handle potential JSON or array root
-            content = f.read()
-            # If it wrapped in "artworks": [] or is a list directly?
-            # Based on previous view, it seemed to be a list of objects at root? 
-            # Actually line 800 indent suggests it's inside an object or array.
-            data = json.loads(content)
-    except Exception as e:
-        print(f"Error reading DB: {e}")
-        return
-
-    # Normalize data structure (if it's a dict with "artworks" key, use that. If list, use that)
-    if isinstance(data, dict) and "artworks" in data:
-        artworks_list = data["artworks"]
-        is_wrapper = True
-    elif isinstance(data, list):
-        artworks_list = data
-        is_wrapper = False
-    else:
-        print("Unknown JSON structure")
-        return
+def is_ignored(img_file):
+    """Variants and system files never get their own catalog entry."""
+    return (img_file.startswith("super-hq-") or 
+            img_file.startswith("blur-") or 
+            img_file.startswith("web-") or 
+            img_file.startswith("source-") or 
+            "placeholder" in img_file)
 
-    existing_files = set()
-    for art in artworks_list:
-        if "file" in art:
-             # Normalize path: remove 'images/artworks/' prefix if present for comparison
-             fname = art["file"].replace("images/artworks/", "")
-             existing_files.add(fname)
-        elif "image" in art:
-             fname = art["image"].replace("images/artworks/", "")
-             existing_files.add(fname)
-    
-    print(f"Found {len(artworks_list)} existing artworks in metadata.")
+def build_entry(img_file):
+    stem = Path(img_file).stem
+    title = infer_title(stem)
+    series = infer_series(stem)
+    technique = "Mixed Media"
+    if "pencil" in stem: technique = "Pencil"
     
-    # Scan images
-    image_files = sorted([f for f in os.listdir(IMAGES_DIR) if f.lower().endswith(('.webp', '.png', '.jpg', '.jpeg'))])
+    alt, meta, schema = generate_seo(title, series, technique)
     
+    return {
+        "id": stem,
+        "title": title,
+        "series": series,
+        "technique": technique,
+        "year": 2026,
+        "file": f"images/artworks/{img_file}", # Standardize path
+        "image": f"images/artworks/{img_file}", # Dual compatibility
+        "altText": alt,
+        "metaDescription": meta,
+        "schemaLD": schema,
+        "category": series
+    }
+
+def apply_changes(catalog, changes):
+    """Add entries for new files and move entries along with renamed ones."""
     new_count = 0
-    
+    renamed_count = 0
+    candidates = list(changes.added) + list(changes.changed)
 
-    for img_file in image_files:
-        # Ignore variants and system files
-        if (img_file.startswith("super-hq-") or 
-            img_file.startswith("blur-") or 
-            img_file.startswith("web-") or 
-            img_file.startswith("source-") or 
-            "placeholder" in img_file):
+    for old_name, new_name in changes.renamed:
+        entry = catalog.find_by_image(old_name)
+        if entry is None or is_ignored(new_name):
+            candidates.append(new_name)
             continue
-            
-        if img_file in existing_files:
+        moved = {k: f"images/artworks/{new_name}" for k in ("file", "image") if k in entry}
+        catalog.update(entry, **moved)
+        renamed_count += 1
+        print(f"Renamed: {old_name} -> {new_name}")
+
+    for img_file in sorted(candidates):
+        if is_ignored(img_file) or catalog.has_image(img_file):
             continue
-            
-        # Add new
-        stem = Path(img_file).stem
-        title = infer_title(stem)
-        series = infer_series(stem)
-        technique = "Mixed Media"
-        if "pencil" in stem: technique = "Pencil"
-        
-        alt, meta, schema = generate_seo(title, series, technique)
-        
-        new_entry = {
-            "id": stem,
-            "title": title,
-            "series": series,
-            "technique": technique,
-            "year": 2026,
-            "file": f"images/artworks/{img_file}", # Standardize path
-            "image": f"images/artworks/{img_file}", # Dual compatibility
-            "altText": alt,
-            "metaDescription": meta,
-            "schemaLD": schema,
-            "category": series
-        }
-        
-        artworks_list.append(new_entry)
+        new_entry = catalog.add(build_entry(img_file))
         new_count += 1
-        print(f"Added: {title}")
-
-    # Write back
-    if is_wrapper:
-        data["artworks"] = artworks_list
-    else:
-        data = artworks_list
-        
-    with open(DB_PATH, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
-        
-    print(f"Done. Added {new_count} new artworks. Total: {len(artworks_list)}")
+        print(f"Added: {new_entry['title']}")
+
+    return new_count, renamed_count
+
+def sync(state, names=None, since=None):
+    """One incremental pass; `names` restricts it to files a watcher reported."""
+    changes = state.scan(since=since, names=names)
+    if not changes:
+        print(f"Nothing changed in {IMAGES_DIR} ({changes.unchanged} files up to date).")
+        # Nothing for the catalog, but keep the refreshed stats and the folder
+        # mtime so the next run skips the hashing and takes the fast path
+        state.save()
+        return
+
+    print(f"Loading metadata from {DB_PATH}")
+    try:
+        # Handles both a bare list and a {"artworks": [...]} wrapper
+        catalog = ArtworkCatalog.load(DB_PATH)
+    except Exception as e:
+        print(f"Error reading DB: {e}")
+        return
+
+    print(f"Found {len(catalog)} existing artworks in metadata.")
+    print(f"Scan: {len(changes.added)} new, {len(changes.changed)} changed, "
+          f"{len(changes.renamed)} renamed, {len(changes.removed)} removed, {changes.unchanged} unchanged")
+
+    new_count, renamed_count = apply_changes(catalog, changes)
+
+    catalog.save()
+    state.save()
+
+    print(f"Done. Added {new_count} new artworks, followed {renamed_count} renames. Total: {len(catalog)}")
+
+def watch(state, quiet=DEFAULT_QUIET, polling=False):
+    """Keep syncing as files land in IMAGES_DIR, one catalog write per burst."""
+    watcher = open_watcher(IMAGES_DIR, polling=polling)
+    kind = "polling" if isinstance(watcher, PollingWatcher) else "inotify"
+    print(f"👀 Watching {IMAGES_DIR} ({kind}, {quiet}s debounce). Ctrl+C to stop.")
+    try:
+        for names in batches(watcher, quiet=quiet):
+            # None: events were dropped, fall back to a full scan
+            sync(state, names=sorted(names) if names is not None else None)
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        watcher.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Sync public/images/artworks into the metadata catalog")
+    parser.add_argument("--since", metavar="WHEN",
+                        help="only look at files modified since WHEN: 'last' run, unix time or ISO date")
+    parser.add_argument("--watch", action="store_true",
+                        help="keep running and sync new files as they arrive")
+    parser.add_argument("--debounce", type=float, default=DEFAULT_QUIET, metavar="SECONDS",
+                        help="quiet period that ends a burst of file events in --watch mode")
+    parser.add_argument("--poll", action="store_true",
+                        help="poll the folder instead of using inotify in --watch mode")
+    return parser.parse_args()
+
+def main(since=None, watch_mode=False, debounce=DEFAULT_QUIET, poll=False):
+    # Only new, changed or renamed files since the last run are looked at
+    state = SyncState.for_catalog(DB_PATH, IMAGES_DIR)
+    sync(state, since=parse_since(since, state.last_run) if since else None)
+    if watch_mode:
+        watch(state, quiet=debounce, polling=poll)
 
 if __name__ == "__main__":
-    main()
+    args = parse_args()
+    main(args.since, args.watch, args.debounce, args.poll)
@@ -3,6 +3,8 @@ import os
 import re
 from pathlib import Path
 
+from catalog import ArtworkCatalog
+
 # Configuration
 PROJECT_ROOT = Path("/Users/borjafernandezangulo/game/naroa-2026")
 IMAGES_DIR = PROJECT_ROOT / "public/images/artworks"
@@ -64,13 +66,9 @@ def generate_seo(title, series, technique="Mixed Media"):
 
 def main():
     print(f"Loading database from {DB_PATH}")
-    with open(DB_PATH, "r") as f:
-        data = json.load(f)
-    
-    existing_files = {art["file"] for art in data["artworks"] if "file" in art}
-    existing_artworks = data["artworks"]
+    catalog = ArtworkCatalog.load(DB_PATH)
     
-    print(f"Found {len(existing_artworks)} existing artworks in DB.")
+    print(f"Found {len(catalog)} existing artworks in DB.")
     
     # Scan images
     image_files = sorted([f for f in os.listdir(IMAGES_DIR) if f.lower().endswith(('.webp', '.png', '.jpg', '.jpeg'))])
@@ -82,7 +80,7 @@ def main():
         if img_file.startswith("super-hq-") or "placeholder" in img_file:
             continue
             
-        if img_file in existing_files:
+        if catalog.has_image(img_file):
             continue
             
         # New artwork found!
@@ -113,17 +111,14 @@ def main():
             "category": series # Legacy field comp
         }
         
-        existing_artworks.append(new_entry)
+        catalog.add(new_entry)
         new_count += 1
         print(f"Added: {title} ({img_file})")
 
-    data["artworks"] = existing_artworks
-    
     # Save
-    with open(DB_PATH, "w") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    catalog.save()
         
-    print(f"Done. Added {new_count} new artworks. Total: {len(data['artworks'])}")
+    print(f"Done. Added {new_count} new artworks. Total: {len(catalog)}")
 
 if __name__ == "__main__":
     main()
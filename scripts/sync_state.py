@@ -0,0 +1,199 @@
+"""
+Persistent scan state for the gallery sync scripts.
+
+Remembers filename -> (size, mtime, content hash) for an images folder so
+a sync run only looks at what is new or changed:
+
+- if the folder's own mtime hasn't moved, no file was added, removed or
+  renamed and the scan returns straight away,
+- files whose size and mtime match the state are trusted without hashing,
+- a new name whose hash matches a vanished name is reported as a rename,
+  so the catalog entry can follow the file instead of being duplicated.
+
+    state = SyncState.for_catalog(DB_PATH, IMAGES_DIR)
+    changes = state.scan()
+    ...
+    state.save()
+"""
+import hashlib
+import json
+import os
+import stat
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from catalog import write_atomic
+
+HASH_CHUNK = 1024 * 1024
+# Like git's "racy clean" check: a folder mtime this close to the scan
+# can still change within the same timestamp tick, so it isn't trusted
+RACY_SECONDS = 2.0
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def parse_since(value, last_run=None):
+    """'last', a unix timestamp or an ISO date/datetime -> epoch seconds."""
+    if value == 'last':
+        return last_run or 0.0
+    try:
+        return float(value)
+    except ValueError:
+        return datetime.fromisoformat(value).timestamp()
+
+
+@dataclass
+class ScanResult:
+    added: list = field(default_factory=list)
+    changed: list = field(default_factory=list)
+    removed: list = field(default_factory=list)
+    renamed: list = field(default_factory=list)   # (old_name, new_name)
+    unchanged: int = 0
+    skipped_scan: bool = False
+
+    def __bool__(self):
+        return bool(self.added or self.changed or self.removed or self.renamed)
+
+
+class SyncState:
+    """Scan state for one images folder, stored as JSON next to its catalog."""
+
+    def __init__(self, path, directory, extensions=('.webp', '.png', '.jpg', '.jpeg')):
+        self.path = os.fspath(path)
+        self.directory = os.fspath(directory)
+        self.extensions = tuple(extensions)
+        self.files = {}
+        self.dir_mtime_ns = None
+        self.last_run = None
+        self._pending = None
+        self._pending_removed = []
+        self._pending_dir_mtime_ns = None
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('directory') == os.path.abspath(self.directory):
+                self.files = data.get('files', {})
+                self.dir_mtime_ns = data.get('dir_mtime_ns')
+                self.last_run = data.get('last_run')
+
+    @classmethod
+    def for_catalog(cls, db_path, directory, **kwargs):
+        """`data/database.json` -> `data/.database.sync-state.json`."""
+        folder, name = os.path.split(os.fspath(db_path))
+        stem = os.path.splitext(name)[0]
+        return cls(os.path.join(folder, f".{stem}.sync-state.json"), directory, **kwargs)
+
+    def scan(self, since=None, names=None):
+        """Compare the folder with the stored state.
+
+        `since` (epoch seconds) limits the scan to files modified at or
+        after that time; older files are assumed unchanged and removals
+        are not reported. `names` limits it to those filenames (e.g. the
+        ones a file watcher reported), including ones that were removed.
+        """
+        started = time.time()
+        result = ScanResult()
+        dir_mtime_ns = os.stat(self.directory).st_mtime_ns
+
+        if since is None and names is None and self.files and dir_mtime_ns == self.dir_mtime_ns:
+            result.unchanged = len(self.files)
+            result.skipped_scan = True
+            return result
+
+        since_ns = int(since * 1e9) if since is not None else None
+        seen = self._stat_names(names) if names is not None else self._stat_all()
+
+        self._pending = {}
+        new_names = []
+        for name, st in seen.items():
+            prev = self.files.get(name)
+            if since_ns is not None and st.st_mtime_ns < since_ns:
+                result.unchanged += 1
+                continue
+            if prev and prev['size'] == st.st_size and prev['mtime_ns'] == st.st_mtime_ns:
+                result.unchanged += 1
+                continue
+            digest = file_sha256(os.path.join(self.directory, name))
+            self._pending[name] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': digest}
+            if prev is None:
+                new_names.append(name)
+            elif prev['sha256'] != digest:
+                result.changed.append(name)
+            else:
+                result.unchanged += 1
+
+        if since_ns is None:
+            candidates = self.files if names is None else [n for n in names if n in self.files]
+            gone = [name for name in candidates if name not in seen]
+            by_hash = {}
+            for name in gone:
+                by_hash.setdefault(self.files[name]['sha256'], []).append(name)
+            for name in sorted(new_names):
+                old_names = by_hash.get(self._pending[name]['sha256'])
+                if old_names:
+                    result.renamed.append((old_names.pop(0), name))
+                else:
+                    result.added.append(name)
+            renamed_from = {old for old, _ in result.renamed}
+            result.removed = sorted(name for name in gone if name not in renamed_from)
+            self._pending_removed = gone
+        else:
+            result.added = sorted(new_names)
+            self._pending_removed = []
+
+        # A partial scan says nothing about the rest of the folder, so the
+        # next full scan must not take the fast path on its account
+        full = since_ns is None and names is None
+        self._pending_dir_mtime_ns = (
+            dir_mtime_ns if full and started - dir_mtime_ns / 1e9 > RACY_SECONDS else None
+        )
+        return result
+
+    def _wanted(self, name):
+        return name.lower().endswith(self.extensions)
+
+    def _stat_all(self):
+        seen = {}
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if self._wanted(entry.name) and entry.is_file():
+                    seen[entry.name] = entry.stat()
+        return seen
+
+    def _stat_names(self, names):
+        seen = {}
+        for name in names:
+            if not self._wanted(name):
+                continue
+            try:
+                st = os.stat(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                continue
+            if stat.S_ISREG(st.st_mode):
+                seen[name] = st
+        return seen
+
+    def save(self):
+        """Record the last scan; call only once the catalog write succeeded."""
+        if self._pending is None:
+            return
+        for name in self._pending_removed:
+            self.files.pop(name, None)
+        self.files.update(self._pending)
+        self.dir_mtime_ns = self._pending_dir_mtime_ns
+        self.last_run = time.time()
+        self._pending = None
+
+        write_atomic(self.path, json.dumps({
+            'directory': os.path.abspath(self.directory),
+            'dir_mtime_ns': self.dir_mtime_ns,
+            'last_run': self.last_run,
+            'files': self.files,
+        }, indent=1, sort_keys=True))
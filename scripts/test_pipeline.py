@@ -2,10 +2,14 @@
 """
 Test del Pipeline UltraCine - Modo Dry Run
 Verifica configuración, imágenes y genera prompts sin llamar a la API
+
+    python scripts/test_pipeline.py             # dry run
+    python scripts/test_pipeline.py --offline   # pipeline real contra Veo simulado
 """
 
 import os
 import sys
+import tempfile
 from pathlib import Path
 from dataclasses import dataclass
 from typing import List, Literal
@@ -135,7 +139,49 @@ def check_api_key():
         print("   export GOOGLE_API_KEY='tu_key_aqui'")
         return False
 
+def run_offline(test_shots):
+    """Ejecuta los shots por UltraCinePipeline con FakeVeoClient (sin API key ni coste)"""
+    print("\n🧪 PIPELINE OFFLINE (Veo simulado)")
+    print("=" * 50)
+    
+    from veo_client import FakeVeoClient
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)  # ultra_cine.log fuera del repo
+        try:
+            import ultra_cine
+            config = ultra_cine.ProjectConfig(
+                project_name="offline_test",
+                output_dir=tmp,
+                cost_ledger_db=os.path.join(tmp, "cost_ledger.sqlite"),
+                # Tiempo comprimido x100, igual que el cliente simulado
+                quota_window_seconds=0.6,
+                requests_per_minute=2000,
+                poll_requests_per_minute=6000,
+                download_requests_per_minute=3000,
+                poll_policy=ultra_cine.PollPolicy(initial_delay=0.2, min_interval=0.05,
+                                                  max_interval=0.3, jitter=0),
+            )
+            client = FakeVeoClient(latency=(60, 120), time_scale=0.01, seed=1)
+            pipeline = ultra_cine.UltraCinePipeline(api_key=None, config=config, client=client)
+            shots = [ultra_cine.ShotConfig(shot_id=s.shot_id, prompt=s.prompt,
+                                           aspect_ratio=s.aspect_ratio, use_audio=s.use_audio)
+                     for s in test_shots]
+            results = pipeline.generate_shots(shots)
+        finally:
+            os.chdir(cwd)
+    
+    for result in results:
+        print(f"  ✓ {result['shot_id']}: {result['bytes']} bytes, "
+              f"{result['polls']} consultas, ${result['cost_usd']:.2f}")
+    stats = client.stats()
+    print(f"✓ {len(results)}/{len(test_shots)} shots | {stats['submits']} envíos, "
+          f"{stats['polls']} consultas | coste simulado ${pipeline.session_cost:.2f}")
+    return len(results) == len(test_shots)
+
 def main():
+    offline = "--offline" in sys.argv[1:]
     print("=" * 60)
     print("🎬 ULTRACINE PIPELINE - TEST MODE")
     print("   Naroa Gallery 2026")
@@ -153,6 +199,9 @@ def main():
     # 4. Verificar API key
     has_key = check_api_key()
     
+    # 5. Pipeline completo contra Veo simulado
+    offline_ok = run_offline(shots) if offline else True
+    
     # Resumen final
     print("\n" + "=" * 60)
     print("📊 RESUMEN")
@@ -171,7 +220,7 @@ def main():
         print("   2. Ejecuta: python scripts/ultra_cine.py")
     
     print("\n" + "=" * 60)
-    return 0
+    return 0 if offline_ok else 1
 
 if __name__ == "__main__":
     sys.exit(main())
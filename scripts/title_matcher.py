@@ -0,0 +1,163 @@
+"""
+Indexed artwork matcher used by the metadata merge scripts.
+
+Exact ID hits come from a dict index. Fuzzy title matching keeps the
+original SequenceMatcher semantics (best ratio strictly above the
+threshold, first artwork wins on ties) but only scores titles that can
+still beat the threshold:
+
+- a trigram inverted index, blocked by title length, only visits titles
+  whose length is compatible with a ratio above the threshold,
+- a q-gram count filter discards titles that share too few trigrams,
+- titles too short to share a trigram are kept in a small side bucket,
+- quick_ratio upper bounds prune before the full ratio, and each
+  title keeps its own SequenceMatcher so its b2j table is built once.
+"""
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+
+DEFAULT_THRESHOLD = 0.85
+NGRAM = 3
+
+
+def similar(a, b):
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def ngrams(text, n=NGRAM):
+    """Multiset of character n-grams of `text`."""
+    return Counter(text[i:i + n] for i in range(len(text) - n + 1))
+
+
+def _min_shared_ngrams(total_len, threshold):
+    """Lower bound on shared trigrams for a ratio above `threshold`.
+
+    With M matched characters spread over k maximal blocks, ratio is
+    2M/T and T >= 2M + k - 1. Each block of length L contributes L - 2
+    trigram occurrences, so shared >= M - 2k >= 5M - 2T - 2. Plugging in
+    M > threshold * T / 2 gives the bound below.
+    """
+    return (2.5 * threshold - 2) * total_len - 2
+
+
+def _short_title_span(threshold):
+    """Largest combined length at which two titles can score above
+    `threshold` without sharing a trigram (14 at 0.85).
+
+    With no shared trigram every matching block is at most 2 long, so
+    k >= M / 2 and T >= 2M + k - 1 give M <= 2 * (T + 1) / 5. The ratio
+    2M/T then tends to 0.8 from above: at or below 0.8 any length can
+    match without a shared trigram.
+    """
+    if threshold <= 0.8:
+        return float('inf')
+    span = 0
+    for total in range(1, int(0.8 / (threshold - 0.8)) + 1):
+        if 2 * (2 * (total + 1) // 5) / total > threshold:
+            span = total
+    return span
+
+
+def _length_window(length, threshold):
+    """Title lengths that can reach `threshold` against a `length` query.
+
+    ratio <= 2 * min(la, lb) / (la + lb), the real_quick_ratio bound.
+    """
+    factor = threshold / (2 - threshold)
+    return length * factor, length / factor if factor else float('inf')
+
+
+class TitleMatcher:
+    """Matches notebook entries against catalog artworks by id, then title."""
+
+    def __init__(self, artworks, threshold=DEFAULT_THRESHOLD):
+        self.artworks = artworks
+        self.threshold = threshold
+        self._short_span = _short_title_span(threshold)
+        self.by_id = {}
+        self._titles = []
+        self._matchers = {}
+        self._postings = defaultdict(list)
+        self._short = []
+
+        for pos, art in enumerate(artworks):
+            # First artwork with a given id wins, like the old linear scan
+            self.by_id.setdefault(art.get('id'), art)
+
+            title = art.get('title', '').lower()
+            self._titles.append(title)
+            for gram, count in ngrams(title).items():
+                self._postings[gram].append((len(title), pos, count))
+            if len(title) <= self._short_span:
+                self._short.append(pos)
+
+        # Postings sorted by title length so a query only walks the block of
+        # lengths inside its window
+        self._posting_lens = {}
+        for gram, postings in self._postings.items():
+            postings.sort()
+            self._posting_lens[gram] = [length for length, _, _ in postings]
+
+    def match_id(self, art_id):
+        return self.by_id.get(art_id)
+
+    def _candidates(self, query):
+        """Artwork positions whose title may score above the threshold."""
+        q_len = len(query)
+        lo, hi = _length_window(q_len, self.threshold)
+
+        shared = Counter()
+        for gram, q_count in ngrams(query).items():
+            postings = self._postings.get(gram)
+            if not postings:
+                continue
+            lens = self._posting_lens[gram]
+            for _, pos, count in postings[bisect_left(lens, lo):bisect_right(lens, hi)]:
+                shared[pos] += min(q_count, count)
+
+        candidates = {
+            pos for pos, n in shared.items()
+            if n > _min_shared_ngrams(q_len + len(self._titles[pos]), self.threshold)
+        }
+        if q_len < self._short_span:
+            candidates.update(
+                pos for pos in self._short
+                if q_len + len(self._titles[pos]) <= self._short_span
+            )
+        return sorted(candidates)
+
+    def _matcher(self, pos):
+        # Query goes in as the first sequence: ratio() is not symmetric and
+        # the old scan compared SequenceMatcher(None, note_title, art_title)
+        matcher = self._matchers.get(pos)
+        if matcher is None:
+            matcher = self._matchers[pos] = SequenceMatcher(None, '', self._titles[pos])
+        return matcher
+
+    def match_title(self, title):
+        """Return (artwork, ratio) for the best fuzzy match, or (None, 0.0)."""
+        query = title.lower()
+        best_match = None
+        highest_ratio = 0.0
+        floor = self.threshold
+
+        for pos in self._candidates(query):
+            matcher = self._matcher(pos)
+            matcher.set_seq1(query)
+            if matcher.real_quick_ratio() <= floor or matcher.quick_ratio() <= floor:
+                continue
+            ratio = matcher.ratio()
+            if ratio > floor:
+                highest_ratio = ratio
+                best_match = self.artworks[pos]
+                floor = ratio
+
+        return best_match, highest_ratio
+
+    def match(self, entry):
+        """Return (artwork, ratio) for a notebook entry; ratio is 1.0 for id hits."""
+        art = self.match_id(entry.get('id'))
+        if art is not None:
+            return art, 1.0
+        return self.match_title(entry.get('title', ''))
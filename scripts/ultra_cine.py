@@ -14,18 +14,29 @@ Uso:
 
 import os
 import json
-import time
+import hashlib
 import logging
+import threading
 from pathlib import Path
 from dataclasses import dataclass, asdict
-from typing import List, Optional, Dict, Literal
+from typing import List, Optional, Dict, Literal, Union
 from datetime import datetime
 
-import cv2
 from google import genai
 from google.genai import types
 from PIL import Image
-import requests
+
+from poll_policy import PollHistory, PollPolicy
+from generation_cache import GenerationCache, cache_key
+from job_journal import DONE, DOWNLOADING, FAILED, QUEUED, SUBMITTED, JobJournal
+from rate_limiter import RateLimiter
+from shot_scheduler import ShotJob, ShotScheduler
+from catalog import write_atomic
+from contact_sheet import ContactSheetRenderer, SheetResult
+from cost_ledger import CostLedger
+from frame_extract import FrameExtractor
+from veo_client import VeoClient
+from video_download import download, write_bytes_atomic
 
 # Configuración de logging
 logging.basicConfig(
@@ -71,7 +82,23 @@ class ProjectConfig:
     cost_per_second_ultra: float = 0.40
     cost_per_second_fast: float = 0.15
     requests_per_minute: int = 20
+    poll_requests_per_minute: int = 60
+    download_requests_per_minute: int = 30
     safety_buffer: float = 1.2
+    # Ventana en la que la API cuenta la cuota (Veo: por minuto)
+    quota_window_seconds: float = 60.0
+    # SQLite compartido para repartir la cuota entre pipelines de la máquina
+    rate_limit_db: Optional[str] = None
+    # Ledger de gasto compartido; None: ~/.ultra_cine/cost_ledger.sqlite
+    cost_ledger_db: Optional[str] = None
+    # None: política por defecto ajustada al historial de cada modelo
+    poll_policy: Optional[PollPolicy] = None
+    # Caché de generaciones (prompt + modelo + aspect + referencias)
+    use_cache: bool = True
+    cache_max_gb: float = 20.0
+    cache_max_age_days: float = 90.0
+    max_concurrent_shots: int = 4
+    contact_sheet_workers: int = 2
 
 
 class ReferenceValidator:
@@ -118,24 +145,18 @@ class VideoExtender:
         self.output_dir = output_dir
         self.extends_dir = output_dir / "extends"
         self.extends_dir.mkdir(parents=True, exist_ok=True)
+        self.frames = FrameExtractor(self.extends_dir / "frames")
     
     def extract_last_frame(self, video_path: Path) -> Path:
-        """Extrae último frame para continuación"""
-        cap = cv2.VideoCapture(str(video_path))
-        total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-        cap.set(cv2.CAP_PROP_POS_FRAMES, total_frames - 1)
-        
-        ret, frame = cap.read()
-        if not ret:
-            raise ValueError(f"No se pudo extraer frame de {video_path}")
-        
-        frame_path = self.extends_dir / f"{video_path.stem}_lastframe.png"
-        cv2.imwrite(str(frame_path), frame)
-        cap.release()
-        
+        """Extrae último frame para continuación (solo decodifica la cola)"""
+        frame_path = self.frames.extract(video_path, "last")[0]
         logger.info(f"Frame final extraído: {frame_path}")
         return frame_path
     
+    def extract_frames(self, video_path: Path, which: Union[str, int] = "last") -> List[Path]:
+        """Primer frame, último o N equiespaciados, en una pasada y con caché"""
+        return self.frames.extract(video_path, which)
+    
     def prepare_extend_prompt(self, original: str, continuation: str) -> str:
         """Prepara prompt para continuación seamless"""
         return (f"{original}. Continuation: {continuation}. "
@@ -146,8 +167,10 @@ class VideoExtender:
 class UltraCinePipeline:
     """Pipeline principal de producción para Google AI Ultra"""
     
-    def __init__(self, api_key: str, config: ProjectConfig):
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, api_key: Optional[str], config: ProjectConfig,
+                 client: Optional[VeoClient] = None):
+        # client: cualquier VeoClient (p. ej. FakeVeoClient para pruebas sin API)
+        self.client = client if client is not None else genai.Client(api_key=api_key)
         self.config = config
         self.output_dir = Path(config.output_dir) / config.project_name
         self.output_dir.mkdir(parents=True, exist_ok=True)
@@ -160,12 +183,46 @@ class UltraCinePipeline:
             logger.info(f"✓ {len(self.reference_images)} referencias cargadas")
         
         self.extender = VideoExtender(self.output_dir)
+        self.contact_sheets = ContactSheetRenderer(self.output_dir / "contact_sheets",
+                                                   max_workers=config.contact_sheet_workers,
+                                                   frames=self.extender.frames)
         
         # Tracking
         self.session_cost = 0.0
+        self.reserved_cost = 0.0  # Shots enviados aún sin terminar
+        self._lock = threading.Lock()
+        # Gasto mensual real, compartido entre ejecuciones y procesos
+        self.ledger = CostLedger(config.cost_ledger_db)
         self.requests_made = 0
-        self.last_request_time = 0
-        self.min_interval = 60.0 / (config.requests_per_minute / config.safety_buffer)
+        quotas = {
+            "submit": config.requests_per_minute,
+            "poll": config.poll_requests_per_minute,
+            "download": config.download_requests_per_minute,
+        }
+        limits = {kind: quota / config.safety_buffer for kind, quota in quotas.items()}
+        self.rate_limiter = RateLimiter(
+            limits,
+            # Ráfaga + una ventana de recarga no debe superar la cuota en
+            # ninguna ventana: con burst = limit se llegaba casi al doble
+            burst={kind: max(1.0, (quotas[kind] - limits[kind]) * config.quota_window_seconds / 60)
+                   for kind in quotas},
+            shared_path=config.rate_limit_db,
+        )
+        
+        self.cache = None
+        if config.use_cache:
+            self.cache = GenerationCache(self.output_dir / "cache",
+                                         max_bytes=int(config.cache_max_gb * 1024 ** 3),
+                                         max_age_days=config.cache_max_age_days)
+            evicted = self.cache.evict()
+            if evicted:
+                logger.info(f"🧹 Caché: {evicted} entradas expulsadas")
+        
+        # Duraciones de sesiones anteriores, antes de sobrescribir el log
+        self.poll_history = PollHistory.from_log(self.output_dir / "project_log.json")
+        
+        # Estado de cada shot, escrito antes de cada paso (sobrevive a un crash)
+        self.journal = JobJournal(self.output_dir / "journal.jsonl")
         
         self.project_log = {
             "project_name": config.project_name,
@@ -175,14 +232,11 @@ class UltraCinePipeline:
             "config": asdict(config)
         }
         
-    def _wait_rate_limit(self):
-        """Rate limiting de 20 req/min"""
-        elapsed = time.time() - self.last_request_time
-        if elapsed < self.min_interval:
-            sleep_time = self.min_interval - elapsed
-            logger.info(f"Rate limiting: {sleep_time:.1f}s...")
-            time.sleep(sleep_time)
-        self.last_request_time = time.time()
+    def _wait_rate_limit(self, kind: str = "submit"):
+        """Rate limiting por token bucket (submit / poll / download)"""
+        waited = self.rate_limiter.acquire(kind)
+        if waited:
+            logger.info(f"Rate limiting ({kind}): {waited:.1f}s...")
     
     def _calculate_cost(self, shot: ShotConfig) -> float:
         """Calcula costo estimado de un shot"""
@@ -191,77 +245,262 @@ class UltraCinePipeline:
         duration = max(shot.duration_seconds, 8)
         return duration * cost_per_sec
     
-    def _check_budget(self, estimated_cost: float):
-        """Verifica presupuesto mensual"""
-        if self.session_cost + estimated_cost > self.config.monthly_budget_usd:
-            raise RuntimeError(
-                f"⚠️ ALERTA: ${self.session_cost + estimated_cost:.2f} "
-                f"excede presupuesto ${self.config.monthly_budget_usd}"
-            )
+    def _check_budget(self, shot: ShotConfig, estimated_cost: float,
+                      enforce: bool = True) -> str:
+        """Verifica el presupuesto del mes en el ledger (gasto de todas las
+        ejecuciones + shots en vuelo) y reserva el coste; devuelve la reserva"""
+        return self.ledger.reserve(
+            self.config.project_name, shot.get_model(), self._job_key(shot), estimated_cost,
+            budget_usd=self.config.monthly_budget_usd if enforce else None,
+        )
+
+    def _charge(self, job: ShotJob, state: str, **fields):
+        """Pasa la reserva del shot a gasto (una sola vez por operación) y
+        journala `state`. El journal marca `charged` antes de escribir en el
+        ledger: si el proceso muere entre las dos escrituras se pierde como
+        mucho un cargo, nunca se cobra dos veces al reanudar."""
+        self.journal.record(self._job_key(job.shot), state, charged=True, **fields)
+        with self._lock:
+            self.reserved_cost -= job.cost
+            if job.extra.get("charged"):
+                return
+            self.session_cost += job.cost
+            job.extra["charged"] = True
+        self.ledger.charge(job.extra.pop("reservation", None),
+                           seconds=max(job.shot.duration_seconds, 8))
     
     def generate_shot(self, shot: ShotConfig, 
                      ref_images: Optional[List[types.Image]] = None) -> Dict:
         """Genera un shot individual con Veo 3.1"""
+        job = self._run_jobs([ShotJob(shot, refs=ref_images)])[0]
+        if job.error:
+            raise job.error
+        return job.result
+
+    def generate_shots(self, shots: List[ShotConfig],
+                       ref_images: Optional[List[types.Image]] = None,
+                       max_concurrent: Optional[int] = None) -> List[Dict]:
+        """Genera varios shots en paralelo; los fallidos se registran y se omiten"""
+        jobs = self._run_jobs([ShotJob(shot, refs=ref_images) for shot in shots], max_concurrent)
+        return [job.result for job in jobs if job.ok]
+
+    def resume_pending(self, max_concurrent: Optional[int] = None) -> List[Dict]:
+        """Termina los shots que quedaron en vuelo en una ejecución anterior"""
+        pending = [ShotJob(ShotConfig(**record["shot"]))
+                   for record in self.journal.in_flight() if record.get("shot")]
+        if not pending:
+            return []
+        logger.info(f"🔗 Retomando {len(pending)} shots en vuelo del journal")
+        jobs = self._run_jobs(pending, max_concurrent)
+        return [job.result for job in jobs if job.ok]
+
+    def _job_key(self, shot: ShotConfig) -> str:
+        return f"{shot.shot_id}_v{shot.version_name}"
+
+    def _run_jobs(self, jobs: List[ShotJob], max_concurrent: Optional[int] = None) -> List[ShotJob]:
+        for job in jobs:
+            job.prompt = self._enhance_prompt_ultra(job.shot)
+            previous = self.journal.get(self._job_key(job.shot))
+            if (previous and previous["state"] in (SUBMITTED, DOWNLOADING)
+                    and previous.get("operation") and previous.get("prompt") == job.prompt):
+                # Ya pagado en Veo: se vuelve a enganchar a la operación
+                job.extra["resume_operation"] = previous["operation"]
+                job.extra["charged"] = previous.get("charged", False)
+        # Los shots ya generados con la misma clave no pasan por Veo
+        to_generate = [job for job in jobs
+                       if "resume_operation" in job.extra or not self._from_cache(job)]
+        for job in to_generate:
+            if "resume_operation" not in job.extra:
+                self.journal.record(self._job_key(job.shot), QUEUED, operation=None,
+                                    prompt=job.prompt, shot=asdict(job.shot))
+        scheduler = ShotScheduler(
+            submit=self._submit_job,
+            poll=self._poll_job,
+            finish=self._finish_job,
+            abandon=self._abandon_job,
+            poll_policy=self._poll_policy_for,
+            max_in_flight=max_concurrent or self.config.max_concurrent_shots,
+        )
+        try:
+            scheduler.run(to_generate)
+        finally:
+            # Un solo volcado por lote; el journal ya cubre cada paso
+            with self._lock:
+                self._save_project_log()
+        return jobs
+
+    def _cache_key(self, job: ShotJob) -> str:
+        refs = job.refs if job.refs is not None else self.reference_images
+        return cache_key(job.prompt, job.shot.get_model(), job.shot.aspect_ratio,
+                         [ref.image_bytes for ref in refs or []])
+
+    def _from_cache(self, job: ShotJob) -> bool:
+        """Resuelve el job desde la caché; coste $0"""
+        if self.cache is None:
+            return False
+        shot = job.shot
+        job.extra["cache_key"] = self._cache_key(job)
+        save_path = self._get_save_path(shot, f"{shot.shot_id}_v{shot.version_name}.mp4")
+        hit = self.cache.get(job.extra["cache_key"], save_path)
+        if hit is None:
+            return False
+        
+        job.result = {
+            "shot_id": shot.shot_id,
+            "version": shot.version_name,
+            "path": hit["path"],
+            "cost_usd": 0.0,
+            "model": shot.get_model(),
+            "prompt": job.prompt,
+            "duration": 8,
+            "polls": 0,
+            "bytes": hit["bytes"],
+            "sha256": hit["sha256"],
+            "cached": True,
+            "timestamp": datetime.now().isoformat()
+        }
+        with self._lock:
+            self.project_log["shots"].append(job.result)
+        logger.info(f"♻️  Desde caché: {Path(hit['path']).name} ($0.00, ahorro ${hit['cost_usd'] or 0:.2f})")
+        return True
+
+    def _poll_policy_for(self, job: ShotJob) -> PollPolicy:
+        with self._lock:
+            return self.poll_history.policy_for(job.shot.get_model(), self.config.poll_policy)
+
+    def _submit_job(self, job: ShotJob):
+        """Envía el shot a Veo y reserva su coste"""
+        shot = job.shot
+        if "resume_operation" in job.extra:
+            return self._resume_job(job)
         self._wait_rate_limit()
         
         cost = self._calculate_cost(shot)
-        self._check_budget(cost)
+        job.extra["reservation"] = self._check_budget(shot, cost)
+        with self._lock:
+            self.reserved_cost += cost
         
-        enhanced_prompt = self._enhance_prompt_ultra(shot)
-        refs = ref_images if ref_images is not None else self.reference_images
+        job.cost = cost
+        refs = job.refs if job.refs is not None else self.reference_images
         
         logger.info(f"🎬 Generando: {shot.shot_id} [{shot.version_name}] "
                    f"(${cost:.2f}) - {shot.get_model()}")
         
         try:
-            generation_config = types.GenerateVideoConfig(
+            generation_config = types.GenerateVideosConfig(
                 aspect_ratio=shot.aspect_ratio,
-                number_of_commerce_candidates=1,
+                number_of_videos=1,
+                reference_images=[
+                    types.VideoGenerationReferenceImage(image=ref, reference_type="ASSET")
+                    for ref in refs
+                ] if refs else None,
             )
             
-            operation = self.client.models.generate_videos(
+            job.operation = self.client.models.generate_videos(
                 model=shot.get_model(),
-                prompt=enhanced_prompt,
-                reference_images=refs if refs else None,
+                prompt=job.prompt,
                 config=generation_config
             )
-            
-            while not operation.done:
-                time.sleep(2)
-                operation = self.client.operations.get(operation)
-            
-            video_metadata = operation.response.generated_videos[0]
-            video_bytes = self._download_video(video_metadata.video.uri)
+        except Exception as e:
+            self._release(job)
+            self.journal.record(self._job_key(shot), FAILED, error=str(e))
+            logger.error(f"✗ Error en {shot.shot_id}: {str(e)}")
+            raise
+        
+        self.journal.record(self._job_key(shot), SUBMITTED, operation=job.operation.name,
+                            cost=cost, model=shot.get_model(), prompt=job.prompt,
+                            shot=asdict(shot), charged=False)
+
+    def _resume_job(self, job: ShotJob):
+        """Recupera una operación enviada antes de un reinicio, sin volver a pagarla"""
+        shot = job.shot
+        cost = self._calculate_cost(shot)
+        # Sin comprobar presupuesto: la operación ya está enviada
+        if not job.extra.get("charged"):
+            job.extra["reservation"] = self._check_budget(shot, cost, enforce=False)
+        with self._lock:
+            self.reserved_cost += cost
+        job.cost = cost
+        job.operation = types.GenerateVideosOperation(name=job.extra.pop("resume_operation"))
+        job.extra["resumed"] = True
+        logger.info(f"🔗 Reenganchando: {shot.shot_id} [{shot.version_name}] → {job.operation.name}")
+
+    def _poll_job(self, job: ShotJob):
+        """Refresca el estado de la operación"""
+        self._wait_rate_limit("poll")
+        job.operation = self.client.operations.get(job.operation)
+
+    def _release(self, job: ShotJob):
+        with self._lock:
+            self.reserved_cost -= job.cost
+        if "reservation" in job.extra:
+            self.ledger.release(job.extra.pop("reservation"))
+
+    def _abandon_job(self, job: ShotJob):
+        """Deja de consultar un shot (timeout o demasiados errores de consulta)"""
+        if not getattr(job.operation, "name", None):
+            self._release(job)
+            self.journal.record(self._job_key(job.shot), FAILED, error=str(job.error))
+            return
+        # La operación sigue en Veo y se va a cobrar: se carga ya y queda
+        # en `submitted` para que resume_pending() la recoja sin reenviarla
+        logger.warning(f"⏸️  {job.shot.shot_id} queda pendiente en {job.operation.name}; "
+                       f"se retoma con resume_pending()")
+        self._charge(job, SUBMITTED, error=str(job.error))
+
+    def _finish_job(self, job: ShotJob) -> Dict:
+        """Descarga el video terminado y lo registra (corre en el pool)"""
+        shot = job.shot
+        key = self._job_key(shot)
+        if getattr(job.operation, "error", None):
+            # Veo no cobra las generaciones fallidas
+            self._release(job)
+            self.journal.record(key, FAILED, error=str(job.operation.error))
+            raise RuntimeError(f"Veo falló en {shot.shot_id}: {job.operation.error}")
+        try:
+            self.journal.record(key, DOWNLOADING)
+            video_metadata = job.operation.response.generated_videos[0]
             
             filename = f"{shot.shot_id}_v{shot.version_name}.mp4"
             save_path = self._get_save_path(shot, filename)
             
-            with open(save_path, "wb") as f:
-                f.write(video_bytes)
-            
-            self.session_cost += cost
-            self.requests_made += 1
-            
-            result = {
-                "shot_id": shot.shot_id,
-                "version": shot.version_name,
-                "path": str(save_path),
-                "cost_usd": cost,
-                "model": shot.get_model(),
-                "prompt": enhanced_prompt,
-                "duration": 8,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            self.project_log["shots"].append(result)
-            self._save_project_log()
-            
-            logger.info(f"✓ Completado: {filename} (${cost:.2f})")
-            return result
-            
+            download = self._download_video(video_metadata.video, save_path)
         except Exception as e:
+            # La operación ya se cobró aunque la descarga falle; queda en
+            # `downloading` para reintentar la descarga en el próximo arranque
             logger.error(f"✗ Error en {shot.shot_id}: {str(e)}")
+            self._charge(job, DOWNLOADING)
             raise
+        
+        result = {
+            "shot_id": shot.shot_id,
+            "version": shot.version_name,
+            "path": str(save_path),
+            "cost_usd": job.cost,
+            "model": shot.get_model(),
+            "prompt": job.prompt,
+            "duration": 8,
+            "polls": job.polls,
+            "bytes": download["bytes"],
+            "sha256": download["sha256"],
+            "generation_seconds": round(job.completed_at - job.submitted_at, 1),
+            "timestamp": datetime.now().isoformat()
+        }
+        
+        if self.cache is not None and "cache_key" in job.extra:
+            self.cache.put(job.extra["cache_key"], save_path, sha256=download["sha256"],
+                           model=result["model"], prompt=job.prompt, cost_usd=job.cost)
+        
+        self._charge(job, DONE, path=result["path"], sha256=result["sha256"])
+        with self._lock:
+            if not job.extra.get("resumed"):
+                # Tras un reinicio no se conoce cuándo se envió de verdad
+                self.poll_history.record(result["model"], result["generation_seconds"])
+            self.requests_made += 1
+            self.project_log["shots"].append(result)
+        
+        logger.info(f"✓ Completado: {filename} (${job.cost:.2f}, {job.polls} consultas)")
+        return result
     
     def _enhance_prompt_ultra(self, shot: ShotConfig) -> str:
         """Mejora prompt con técnicas Veo 3.1 Ultra"""
@@ -288,12 +527,16 @@ class UltraCinePipeline:
         shot_dir.mkdir(parents=True, exist_ok=True)
         return shot_dir / filename
     
-    def _download_video(self, uri: str) -> bytes:
-        """Descarga video generado"""
+    def _download_video(self, video, save_path: Path) -> Dict:
+        """Descarga video generado (streaming, reanudable, rename atómico)"""
+        uri = video.uri or ''
         if uri.startswith('http'):
-            response = requests.get(uri)
-            return response.content
-        return b''
+            return download(uri, save_path,
+                            before_request=lambda: self._wait_rate_limit("download"))
+        data = getattr(video, "video_bytes", None) or b''
+        write_bytes_atomic(save_path, data)
+        return {"path": str(save_path), "bytes": len(data),
+                "sha256": hashlib.sha256(data).hexdigest(), "attempts": 1, "resumes": 0}
     
     def extend_shot(self, original_shot: ShotConfig, 
                    continuation_prompt: str, new_version: str = "extended") -> Dict:
@@ -322,9 +565,9 @@ class UltraCinePipeline:
     
     def generate_ab_test(self, shot_base: ShotConfig, 
                         variations: List[Dict]) -> List[Dict]:
-        """Genera múltiples versiones A/B/C para un shot"""
-        results = []
+        """Genera múltiples versiones A/B/C para un shot (en paralelo)"""
         base_prompt = shot_base.prompt
+        variants = []
         
         for var in variations:
             variant_shot = ShotConfig(
@@ -335,14 +578,9 @@ class UltraCinePipeline:
                 use_audio=var.get('use_audio', shot_base.use_audio),
                 camera_movement=var.get('camera_movement', shot_base.camera_movement)
             )
-            
-            try:
-                result = self.generate_shot(variant_shot)
-                results.append(result)
-            except Exception as e:
-                logger.error(f"Error variante {var.get('version_name')}: {e}")
-                
-        return results
+            variants.append(variant_shot)
+        
+        return self.generate_shots(variants)
     
     def _find_shot_path(self, shot_id: str, version: str) -> Optional[str]:
         """Busca ruta de shot previo"""
@@ -356,44 +594,35 @@ class UltraCinePipeline:
         """Guarda registro del proyecto"""
         log_path = self.output_dir / "project_log.json"
         self.project_log["total_cost_usd"] = self.session_cost
+        self.project_log["poll_history"] = self.poll_history.as_dict()
         self.project_log["last_update"] = datetime.now().isoformat()
-        
-        with open(log_path, 'w', encoding='utf-8') as f:
-            json.dump(self.project_log, f, indent=2, ensure_ascii=False)
+        write_atomic(log_path, json.dumps(self.project_log, indent=2, ensure_ascii=False))
     
-    def create_contact_sheet(self, shot_ids: List[str]):
-        """Crea video comparando versiones A/B/C lado a lado"""
-        import subprocess
+    def create_contact_sheet(self, shot_ids: List[str], kind: str = "video") -> Dict[str, SheetResult]:
+        """Crea comparativas de las versiones A/B/C de cada shot (en paralelo).
         
+        kind="video": versiones lado a lado reducidas; kind="stills": PNG
+        con frames equiespaciados de cada versión.
+        """
+        groups = {}
         for shot_id in shot_ids:
             shot_dir = self.output_dir / "shots" / shot_id
-            if not shot_dir.exists():
-                continue
-                
-            videos = sorted(shot_dir.glob("*.mp4"))
-            if len(videos) < 2:
-                continue
-            
-            inputs = ' '.join([f'-i {v}' for v in videos])
-            filters = f"hstack=inputs={len(videos)}"
-            
-            output = self.output_dir / "contact_sheets" / f"{shot_id}_compare.mp4"
-            output.parent.mkdir(exist_ok=True)
-            
-            cmd = f"ffmpeg -y {inputs} -filter_complex \"{filters}\" -c:v libx264 -crf 18 {output}"
-            try:
-                subprocess.run(cmd, shell=True, check=True)
-                logger.info(f"📊 Contact sheet: {output}")
-            except subprocess.CalledProcessError:
-                logger.error("ffmpeg no encontrado")
+            videos = sorted(shot_dir.glob("*.mp4")) if shot_dir.exists() else []
+            if len(videos) >= 2:
+                groups[shot_id] = videos
+        return self.contact_sheets.render(groups, kind)
     
     def get_summary(self) -> Dict:
         """Resumen de la sesión"""
+        month_spend = self.ledger.month_spend()
         return {
             "project": self.config.project_name,
             "videos_generados": self.requests_made,
             "costo_total_usd": f"${self.session_cost:.2f}",
-            "presupuesto_restante": f"${self.config.monthly_budget_usd - self.session_cost:.2f}",
+            "gasto_mes_usd": f"${month_spend:.2f}",
+            "presupuesto_restante": f"${self.config.monthly_budget_usd - month_spend:.2f}",
+            "rate_limit": self.rate_limiter.stats(),
+            "cache": self.cache.stats() if self.cache else None,
             "output_dir": str(self.output_dir)
         }
 
@@ -421,6 +650,9 @@ def naroa_gallery_videos():
         config=config
     )
     
+    # Shots pagados en una ejecución interrumpida
+    pipeline.resume_pending()
+    
     # Shot 1: Transición Rocks Series
     shot_rocks = ShotConfig(
         shot_id="trans_rocks",
@@ -449,9 +681,7 @@ def naroa_gallery_videos():
     )
     
     # Generar
-    results = []
-    results.append(pipeline.generate_shot(shot_rocks))
-    results.append(pipeline.generate_shot(shot_golden_loop))
+    results = pipeline.generate_shots([shot_rocks, shot_golden_loop])
     
     # A/B test para variación de estilo
     variations = [
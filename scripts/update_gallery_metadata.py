@@ -1,8 +1,11 @@
 
-import json
+import argparse
 import os
 import re
 
+from catalog import ArtworkCatalog
+from sync_state import SyncState, parse_since
+
 DATABASE_PATH = 'data/database.json'
 IMAGES_DIR = 'images/artworks'
 
@@ -14,42 +17,54 @@ def title_from_filename(filename):
     # Replace hyphens/underscores with spaces and capitalize
     return name.replace('-', ' ').replace('_', ' ').title()
 
-def main():
-    with open(DATABASE_PATH, 'r') as f:
-        database = json.load(f)
-
-    existing_images = set()
-    for entry in database:
-        if entry.get('image'):
-            existing_images.add(os.path.basename(entry['image']))
+def main(since=None):
+    # Only images that are new, changed or renamed since the last run
+    state = SyncState.for_catalog(DATABASE_PATH, IMAGES_DIR, extensions=('.webp', '.jpg', '.png'))
+    changes = state.scan(parse_since(since, state.last_run) if since else None)
+    if not changes:
+        print(f"Nothing changed in {IMAGES_DIR} ({changes.unchanged} images up to date)")
+        # Nothing for the catalog, but keep the refreshed stats and the folder
+        # mtime so the next run skips the hashing and takes the fast path
+        state.save()
+        return
 
-    # Map ID to entry index for updates
-    id_map = {entry['id']: i for i, entry in enumerate(database)}
+    catalog = ArtworkCatalog.load(DATABASE_PATH)
 
-    available_images = [f for f in os.listdir(IMAGES_DIR) if f.endswith(('.webp', '.jpg', '.png'))]
+    available_images = changes.added + changes.changed
     
     updated_count = 0
     added_count = 0
+    renamed_count = 0
+
+    # Renamed files keep their entry; only the image path follows
+    for old_file, image_file in changes.renamed:
+        entry = catalog.find_by_image(old_file)
+        if entry is None:
+            available_images.append(image_file)
+            continue
+        moved = {k: f"images/artworks/{image_file}" for k in ('image', 'file') if k in entry}
+        catalog.update(entry, **moved)
+        print(f"🔀 Renamed: {old_file} -> {image_file}")
+        renamed_count += 1
 
-    print(f"Found {len(available_images)} images in {IMAGES_DIR}")
+    print(f"Found {len(available_images)} new or changed images in {IMAGES_DIR}")
 
     for image_file in available_images:
         image_id = normalize_id(image_file)
         
         # 1. Update existing placeholder entries
-        if image_id in id_map:
-            idx = id_map[image_id]
-            entry = database[idx]
+        entry = catalog.get(image_id)
+        if entry is not None:
             if 'placeholder' in entry.get('image', ''):
-                entry['image'] = f"images/artworks/{image_file}"
+                catalog.update(entry, image=f"images/artworks/{image_file}")
                 print(f"✅ Updated placeholder for: {entry['title']}")
                 updated_count += 1
                 continue
         
         # 2. Add new entries for unused images (skipping special ones like 'placeholder.webp')
-        if image_file not in existing_images and image_file != 'placeholder.webp':
+        if not catalog.has_image(image_file) and image_file != 'placeholder.webp':
             # Skip if ID exists but filename didn't match (already handled above roughly, but double check)
-            if image_id in id_map: 
+            if entry is not None: 
                  # This case might happen if image path in DB was different but ID matches.
                  # If it wasn't a placeholder, we skipped it. If it was, we handled it.
                  # So this is for when ID exists but image is NOT placeholder and mismatch?
@@ -69,14 +84,17 @@ def main():
                 "style": "Mixed Media",
                 "featured": False
             }
-            database.append(new_entry)
+            catalog.add(new_entry)
             print(f"✨ Added new entry: {new_entry['title']}")
             added_count += 1
 
-    with open(DATABASE_PATH, 'w') as f:
-        json.dump(database, f, indent=2, ensure_ascii=False)
+    catalog.save()
+    state.save()
 
-    print(f"\nSummary:\nUpdated: {updated_count}\nAdded: {added_count}")
+    print(f"\nSummary:\nUpdated: {updated_count}\nAdded: {added_count}\nRenamed: {renamed_count}")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Add database.json entries for new images in images/artworks")
+    parser.add_argument("--since", metavar="WHEN",
+                        help="only look at images modified since WHEN: 'last' run, unix time or ISO date")
+    main(parser.parse_args().since)
@@ -0,0 +1,152 @@
+"""
+Interfaz de cliente Veo y backend falso local para UltraCinePipeline.
+
+El pipeline solo usa dos llamadas del SDK de google-genai:
+
+    client.models.generate_videos(model=..., prompt=..., config=...) -> operación
+    client.operations.get(operation) -> operación actualizada
+
+`VeoClient` describe ese contrato; `genai.Client` lo cumple tal cual y
+`FakeVeoClient` lo implementa en memoria, sin red ni API key, con los
+mismos tipos del SDK (`types.GenerateVideosOperation`, `types.Video`...):
+
+- latencia de generación aleatoria entre `latency` (min, max) segundos,
+- `failure_rate`: operaciones que terminan con error (Veo no las cobra),
+- cuota: más de `quota_per_minute` envíos por minuto, o una fracción
+  `quota_error_rate` al azar, lanzan `ClientError` 429 como la API real,
+- cada video terminado es un MP4 diminuto generado con OpenCV.
+
+`time_scale` comprime el tiempo: con 0.01 una generación de 90 s tarda
+0.9 s y la ventana de cuota es de 0.6 s, así que un lote de cientos de
+shots se puede medir en segundos.
+
+    client = FakeVeoClient(latency=(60, 120), failure_rate=0.05, time_scale=0.01)
+    pipeline = UltraCinePipeline(api_key=None, config=config, client=client)
+"""
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import deque
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Optional, Protocol, Tuple
+
+import cv2
+import numpy as np
+from google.genai import errors, types
+
+
+class VeoClient(Protocol):
+    """Lo que UltraCinePipeline necesita de un cliente (genai.Client lo cumple)"""
+    models: Any      # .generate_videos(model, prompt, config) -> operación
+    operations: Any  # .get(operation) -> operación
+
+
+def tiny_mp4(seed: int, width: int = 64, height: int = 36, frames: int = 8) -> bytes:
+    """MP4 de unos pocos KB cuyo color depende de `seed`"""
+    rng = np.random.default_rng(seed)
+    color = rng.integers(0, 256, 3, dtype=np.uint8)
+    fd, path = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    try:
+        writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 24, (width, height))
+        for i in range(frames):
+            frame = np.empty((height, width, 3), np.uint8)
+            frame[:] = color
+            frame[:, (i * width) // frames] = 255
+            writer.write(frame)
+        writer.release()
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.unlink(path)
+
+
+def quota_error() -> errors.ClientError:
+    return errors.ClientError(429, {"error": {
+        "code": 429,
+        "message": "Resource has been exhausted (e.g. check quota).",
+        "status": "RESOURCE_EXHAUSTED",
+    }})
+
+
+class FakeVeoClient:
+    """Backend Veo simulado; seguro entre hilos"""
+
+    def __init__(self, latency: Tuple[float, float] = (60.0, 120.0), failure_rate: float = 0.0,
+                 quota_per_minute: Optional[int] = None, quota_error_rate: float = 0.0,
+                 time_scale: float = 1.0, seed: Optional[int] = None,
+                 clock: Callable[[], float] = time.time):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.quota_per_minute = quota_per_minute
+        self.quota_error_rate = quota_error_rate
+        self.time_scale = time_scale
+        self.clock = clock
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._operations: Dict[str, Dict] = {}
+        self._recent_submits = deque()
+        self.submits = 0
+        self.polls = 0
+        self.quota_errors = 0
+        self.failures = 0
+        self.completed = 0
+        self.models = SimpleNamespace(generate_videos=self.generate_videos)
+        self.operations = SimpleNamespace(get=self.get)
+
+    def generate_videos(self, model: str, prompt: str, config=None) -> types.GenerateVideosOperation:
+        now = self.clock()
+        with self._lock:
+            window = 60.0 * self.time_scale
+            while self._recent_submits and self._recent_submits[0] <= now - window:
+                self._recent_submits.popleft()
+            over_quota = (self.quota_per_minute is not None
+                          and len(self._recent_submits) >= self.quota_per_minute)
+            if over_quota or self._random.random() < self.quota_error_rate:
+                self.quota_errors += 1
+                raise quota_error()
+            self._recent_submits.append(now)
+            self.submits += 1
+            name = f"models/{model}/operations/fake-{self.submits:06d}"
+            self._operations[name] = {
+                "ready_at": now + self._random.uniform(*self.latency) * self.time_scale,
+                "fails": self._random.random() < self.failure_rate,
+                "seed": self.submits,
+            }
+        return types.GenerateVideosOperation(name=name, done=False)
+
+    def get(self, operation) -> types.GenerateVideosOperation:
+        name = operation.name
+        with self._lock:
+            self.polls += 1
+            state = self._operations.get(name)
+            if state is None:
+                raise errors.ClientError(404, {"error": {
+                    "code": 404, "message": f"Operation {name} not found", "status": "NOT_FOUND"}})
+            if self.clock() < state["ready_at"]:
+                return types.GenerateVideosOperation(name=name, done=False)
+            first_time = not state.get("finished")
+            state["finished"] = True
+            if state["fails"]:
+                self.failures += first_time
+                return types.GenerateVideosOperation(name=name, done=True, error={
+                    "code": 13, "message": "Video generation failed (simulated)"})
+            self.completed += first_time
+            seed = state["seed"]
+        video = types.Video(video_bytes=tiny_mp4(seed), mime_type="video/mp4")
+        return types.GenerateVideosOperation(
+            name=name, done=True,
+            response=types.GenerateVideosResponse(generated_videos=[types.GeneratedVideo(video=video)]),
+        )
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "submits": self.submits,
+                "polls": self.polls,
+                "quota_errors": self.quota_errors,
+                "failures": self.failures,
+                "completed": self.completed,
+            }
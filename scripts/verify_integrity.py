@@ -1,87 +1,53 @@
-import json
+import argparse
 import os
-from pathlib import Path
+import sys
 
-def verify_integrity():
-    base_dir = Path(os.getcwd())
-    # Images are in root/images/artworks based on ls output
-    img_dir = base_dir / 'images' / 'artworks'
-    
-    # Load JSON data
-    try:
-        # database.json is what gallery.js loads
-        with open(base_dir / 'public' / 'data' / 'database.json', 'r') as f:
-            data = json.load(f)
-            # Handle if it's an array or object with 'artworks' key
-            artworks = data if isinstance(data, list) else data.get('artworks', [])
-            
-    except FileNotFoundError as e:
-        print(f"❌ Critical Error: Data file not found: {e}")
-        return
+from integrity_audit import (DEFAULT_CATALOGS, DEFAULT_CHECKSUMS_PATH, DEFAULT_WORKERS,
+                             print_report, run_audit)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Audit public/data catalogs against images/artworks")
+    parser.add_argument("--images", default=os.path.join('images', 'artworks'),
+                        help="image folder, relative to the project root (default: images/artworks)")
+    parser.add_argument("--decode", action="store_true", help="also check that every image decodes")
+    parser.add_argument("--checksums", nargs="?", const=DEFAULT_CHECKSUMS_PATH, metavar="PATH",
+                        help=f"compare files with stored sha256 sums (default path: {DEFAULT_CHECKSUMS_PATH})")
+    parser.add_argument("--update-checksums", action="store_true",
+                        help="record current sha256 sums for files that pass")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--json", metavar="PATH", help="write a JSON report ('-' for stdout)")
+    parser.add_argument("--junit", metavar="PATH", help="write a JUnit XML report")
+    return parser.parse_args()
 
-    print(f"🔍 Audit Started: {len(artworks)} artworks in DB")
-    print(f"📂 Image Dir: {img_dir}")
-    
-    missing_files = []
-    orphaned_files = []
-    referenced_files = set()
+def verify_integrity():
+    args = parse_args()
+    # Paths are relative to the project root, like always
+    base_dir = os.getcwd()
+    checksums = args.checksums or (DEFAULT_CHECKSUMS_PATH if args.update_checksums else None)
+    if checksums:
+        checksums = os.path.join(base_dir, checksums)
 
-    # 1. Check References -> Files
-    for art in artworks:
-        # Handle various image key formats
-        # gallery.js logic: art.image ? art.image.replace('images/artworks/', '') : art.file
-        img_path = art.get('image') or art.get('file')
-        
-        if not img_path:
-            # Some entries might be text-only, skip/warn?
-            # print(f"⚠️  Artwork ID {art.get('id')} has no image entry")
-            continue
-            
-        # Clean path to get just filename
-        clean_name = img_path.replace('images/artworks/', '')
-        
-        # Add to set of referenced files
-        referenced_files.add(clean_name)
-        
-        # Check existence
-        full_path = img_dir / clean_name
-        if not full_path.exists():
-            missing_files.append({
-                'id': art.get('id'),
-                'title': art.get('title'),
-                'missing_file': clean_name,
-                'raw_path': img_path
-            })
+    quiet = args.json == '-'
+    if not quiet:
+        print(f"🔍 Audit Started: {len(DEFAULT_CATALOGS)} catalogs")
+        print(f"📂 Image Dir: {os.path.join(base_dir, args.images)}")
 
-    # 2. Check Files -> References (Orphans)
-    if img_dir.exists():
-        physical_files = set(f.name for f in img_dir.glob('*') if f.suffix.lower() in ['.webp', '.jpg', '.png'])
-        orphaned_files = list(physical_files - referenced_files)
-    else:
-        print(f"❌ Error: Image directory {img_dir} does not exist!")
-        return
+    report = run_audit(DEFAULT_CATALOGS, args.images, base_dir, decode=args.decode,
+                       checksums_path=checksums, update_checksums=args.update_checksums,
+                       workers=args.workers)
 
-    # REPORT
-    print("\n" + "="*40)
-    print("📊 INTEGRITY REPORT (database.json)")
-    print("="*40)
-    
-    if missing_files:
-        print(f"\n❌ MISSING IMAGES ({len(missing_files)}):")
-        for m in missing_files:
-            print(f"   - ID: {m['id']}")
-            print(f"     Title: {m['title']}")
-            print(f"     Missing: {m['missing_file']}")
-    else:
-        print("\n✅ All JSON references point to existing files.")
+    if args.json == '-':
+        print(report.to_json())
+    elif args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            f.write(report.to_json())
+    if args.junit:
+        with open(args.junit, 'w', encoding='utf-8') as f:
+            f.write(report.to_junit())
+    if not quiet:
+        print_report(report)
 
-    if orphaned_files:
-        print(f"\n⚠️  ORPHANED FILES ({len(orphaned_files)}):")
-        print(f"   (Files in folder but not in JSON)")
-        for f in sorted(orphaned_files):
-            print(f"   - {f}")
-    else:
-        print("\n✅ No orphaned files found.")
+    return 0 if report.ok else 1
 
 if __name__ == "__main__":
-    verify_integrity()
+    sys.exit(verify_integrity())
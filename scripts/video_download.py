@@ -0,0 +1,220 @@
+"""
+Descargas de video en streaming, reanudables y atómicas.
+
+El MP4 se escribe por bloques en `.<nombre>.part` junto al destino, con
+una `requests.Session` compartida (pool de conexiones entre hilos). Si la
+conexión se corta, el siguiente intento pide solo lo que falta con un
+`Range: bytes=N-`; si el servidor no admite rangos, se empieza de cero.
+Junto al `.part` se guarda de qué URI (y ETag) viene: un `.part` de otra
+URI se descarta, y el `If-Range` hace que el servidor mande el fichero
+entero si cambió, en vez de pegar bytes nuevos tras un prefijo viejo.
+Al terminar se verifican tamaño y sha256 y el fichero se renombra de
+forma atómica al destino, así que `shots/<shot_id>/` nunca contiene un
+video a medias. La memoria usada no depende del tamaño del video.
+
+    info = download(uri, shot_dir / "trans_rocks_vA.mp4")
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1024 * 1024
+TIMEOUT = (10, 60)          # (conexión, lectura) en segundos
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 1.0
+POOL_SIZE = 16
+
+_session = None
+_session_lock = threading.Lock()
+
+
+class DownloadError(RuntimeError):
+    """La descarga no se pudo completar o no superó la verificación"""
+
+
+def shared_session() -> requests.Session:
+    """Session única del proceso; reutiliza conexiones entre descargas"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            _session = session
+        return _session
+
+
+def part_path(dest: Path) -> Path:
+    return dest.with_name(f".{dest.name}.part")
+
+
+def source_path(dest: Path) -> Path:
+    """Sidecar con la URI y el ETag de los que sale el `.part`"""
+    return dest.with_name(f".{dest.name}.part.src")
+
+
+def _read_source(dest: Path) -> Optional[Dict]:
+    try:
+        with open(source_path(dest), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_source(dest: Path, url: str, response: requests.Response) -> Dict:
+    source = {"url": url, "etag": response.headers.get("ETag"),
+              "last_modified": response.headers.get("Last-Modified")}
+    with open(source_path(dest), 'w', encoding='utf-8') as f:
+        json.dump(source, f)
+    return source
+
+
+def _validator(source: Optional[Dict]) -> Optional[str]:
+    """Valor para If-Range: ETag fuerte o, si no hay, Last-Modified"""
+    if not source:
+        return None
+    etag = source.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return source.get("last_modified")
+
+
+def discard_partial(dest: Path):
+    for path in (part_path(dest), source_path(dest)):
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _sha256_of(path: Path) -> "hashlib._Hash":
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest
+
+
+def _total_size(response: requests.Response, offset: int) -> Optional[int]:
+    """Tamaño completo según Content-Range (206) o Content-Length (200)"""
+    content_range = response.headers.get("Content-Range")
+    if content_range and "/" in content_range:
+        total = content_range.rsplit("/", 1)[1]
+        return int(total) if total.isdigit() else None
+    length = response.headers.get("Content-Length")
+    return offset + int(length) if length and length.isdigit() else None
+
+
+def _replace_atomic(tmp: Path, dest: Path):
+    with open(tmp, 'rb+') as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, dest)
+
+
+def write_bytes_atomic(dest: Path, data: bytes):
+    """Para videos que llegan en memoria (sin URI http)"""
+    dest = Path(dest)
+    tmp = part_path(dest)
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    _replace_atomic(tmp, dest)
+
+
+def download(url: str, dest, session: Optional[requests.Session] = None,
+             expected_size: Optional[int] = None, expected_sha256: Optional[str] = None,
+             headers: Optional[Dict[str, str]] = None, chunk_size: int = CHUNK_SIZE,
+             max_attempts: int = MAX_ATTEMPTS, timeout=TIMEOUT, before_request=None) -> Dict:
+    """Descarga `url` a `dest`; devuelve bytes, sha256, intentos y reanudaciones.
+
+    `before_request` se llama antes de cada petición HTTP (p. ej. el
+    rate limiter de descargas). Un `.part` de un intento anterior con la
+    misma URI se reanuda en lugar de descargarse otra vez.
+    """
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp = part_path(dest)
+    session = session or shared_session()
+    attempts = resumes = 0
+    last_error = None
+
+    source = _read_source(dest)
+    if tmp.exists() and (source is None or source.get("url") != url):
+        # p. ej. el mismo shot/versión regenerado: otra operación, otro video
+        logger.info(f"Descartando {tmp.name}: no viene de {url}")
+        discard_partial(dest)
+        source = None
+
+    while attempts < max_attempts:
+        attempts += 1
+        offset = tmp.stat().st_size if tmp.exists() else 0
+        digest = _sha256_of(tmp) if offset else hashlib.sha256()
+        request_headers = dict(headers or {})
+        if offset:
+            request_headers["Range"] = f"bytes={offset}-"
+            validator = _validator(source)
+            if validator:
+                request_headers["If-Range"] = validator
+        if before_request:
+            before_request()
+
+        try:
+            with session.get(url, headers=request_headers, stream=True, timeout=timeout) as response:
+                if response.status_code == 416 and offset:
+                    # El .part ya está completo (o no corresponde a este fichero)
+                    total = _total_size(response, 0) or expected_size
+                    if total != offset:
+                        discard_partial(dest)
+                        continue
+                else:
+                    response.raise_for_status()
+                    if offset and response.status_code == 206:
+                        resumes += 1
+                        mode = 'ab'
+                    else:
+                        # Sin soporte de Range, o el fichero cambió (If-Range):
+                        # se descarga desde el principio
+                        offset, digest, mode = 0, hashlib.sha256(), 'wb'
+                        source = _write_source(dest, url, response)
+                    total = _total_size(response, offset)
+                    with open(tmp, mode) as f:
+                        for chunk in response.iter_content(chunk_size):
+                            f.write(chunk)
+                            digest.update(chunk)
+        except (requests.RequestException, OSError) as e:
+            last_error = e
+            logger.warning(f"Descarga interrumpida ({attempts}/{max_attempts}): {e}")
+            time.sleep(BACKOFF_SECONDS * 2 ** (attempts - 1))
+            continue
+
+        size = tmp.stat().st_size
+        expected = expected_size or total
+        if expected is not None and size < expected:
+            # Cierre limpio pero incompleto: se reanuda en el siguiente intento
+            last_error = DownloadError(f"{size} de {expected} bytes")
+            logger.warning(f"Descarga incompleta ({attempts}/{max_attempts}): {last_error}")
+            continue
+        if expected is not None and size != expected:
+            discard_partial(dest)
+            raise DownloadError(f"{dest.name}: {size} bytes, se esperaban {expected}")
+        sha256 = digest.hexdigest()
+        if expected_sha256 and sha256 != expected_sha256.lower():
+            discard_partial(dest)
+            raise DownloadError(f"{dest.name}: sha256 no coincide")
+
+        _replace_atomic(tmp, dest)
+        source_path(dest).unlink(missing_ok=True)
+        return {"path": str(dest), "bytes": size, "sha256": sha256,
+                "attempts": attempts, "resumes": resumes}
+
+    raise DownloadError(f"{url}: {max_attempts} intentos fallidos ({last_error})")
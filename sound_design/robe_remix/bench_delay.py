@@ -0,0 +1,67 @@
+"""Benchmark: block-wise feedback delay vs the per-sample loop from create_loop_riser.
+
+Runs both on 17 s of noise at 44.1 kHz (the loop riser window) with the
+riser's settings (350 ms, feedback 0.6, 2 s tail), checks they agree, then
+checks the modulated delay against the fixed one and times a rising sweep.
+
+    python bench_delay.py
+"""
+import sys
+import time
+
+import numpy as np
+
+from delay import feedback_delay, modulated_feedback_delay, rising_delay_curve
+
+SR = 44100
+
+
+def legacy_delay(pitched, sr, delay_samples, feedback):
+    """The loop create_loop_riser used to run."""
+    output = np.zeros(len(pitched) + sr * 2)
+    output[:len(pitched)] = pitched
+    for i in range(delay_samples, len(output)):
+        delayed_val = output[i - delay_samples] * feedback
+        output[i] += delayed_val
+    return output
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(0)
+    pitched = (rng.standard_normal(17 * SR) * 0.1).astype(np.float32)
+    delay_samples = int(350 * SR / 1000)
+    feedback = 0.6
+    checks = []
+
+    old, old_s = timed(legacy_delay, pitched, SR, delay_samples, feedback)
+    new, new_s = timed(feedback_delay, pitched, delay_samples, feedback, tail=SR * 2)
+    error = np.max(np.abs(old - new))
+    ok = old.shape == new.shape and error < 1e-9
+    checks.append(ok)
+    print(f"{'OK ' if ok else 'BAD'} fixed delay: loop {old_s:.2f}s, block-wise {new_s * 1000:.1f} ms "
+          f"({old_s / new_s:.0f}x), max diff {error:.1e}")
+
+    fixed, _ = timed(modulated_feedback_delay, pitched, float(delay_samples), feedback, tail=SR * 2)
+    error = np.max(np.abs(fixed - new))
+    ok = error < 1e-9
+    checks.append(ok)
+    print(f"{'OK ' if ok else 'BAD'} modulated delay with a constant curve matches, max diff {error:.1e}")
+
+    curve = rising_delay_curve(len(pitched) + SR * 2, delay_samples, delay_samples / 2)
+    rising, rising_s = timed(modulated_feedback_delay, pitched, curve, feedback, tail=SR * 2)
+    ok = np.all(np.isfinite(rising))
+    checks.append(ok)
+    print(f"{'OK ' if ok else 'BAD'} rising delay {delay_samples} -> {delay_samples // 2} samples: "
+          f"{rising_s * 1000:.1f} ms for {len(rising) / SR:.0f}s of audio")
+
+    return 0 if all(checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
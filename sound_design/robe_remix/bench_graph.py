@@ -0,0 +1,116 @@
+"""Benchmark: node-output cache and parallel rendering of the stems in stems.json.
+
+Writes a synthetic 44.1 kHz source, renders every stem cold, again with a
+warm cache, and again after changing the loop riser's delay feedback (which
+should reuse its cached pitch shift). Checks cached renders match uncached
+ones, that a changed effect implementation misses the cache, and that
+rendering on a process pool matches rendering in order.
+
+    python bench_graph.py
+"""
+import argparse
+import copy
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+import graph
+from process_stems import load_spec, render_all
+
+SR = 44100
+SPEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stems.json")
+
+
+def make_source(path, seconds):
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SR)) / SR
+    audio = 0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(len(t))
+    sf.write(path, audio.astype(np.float32), SR, subtype="FLOAT")
+
+
+def with_outputs(spec, directory, source):
+    spec = copy.deepcopy(spec)
+    spec["source"] = source
+    for stem in spec["stems"]:
+        stem["output"] = os.path.join(directory, f"{stem['name']}.wav")
+    return spec
+
+
+def timed_render(spec, workers, cache_dir):
+    start = time.perf_counter()
+    results = render_all(spec, workers, cache_dir)
+    return results, time.perf_counter() - start
+
+
+def read_outputs(spec):
+    return {stem["name"]: sf.read(stem["output"], dtype="float32")[0] for stem in spec["stems"]}
+
+
+def same(a, b):
+    return all(a[name].shape == b[name].shape and np.array_equal(a[name], b[name]) for name in a)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=3)
+    args = parser.parse_args()
+    checks = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source_audio.wav")
+        make_source(source, 4 * 60)
+        cache_dir = os.path.join(tmp, "cache")
+        spec = with_outputs(load_spec(SPEC), tmp, source)
+
+        print("--- warm-up (librosa's first pitch shift compiles its kernels)")
+        timed_render(spec, 1, None)
+        print("--- cold cache")
+        _, cold_s = timed_render(spec, 1, cache_dir)
+        cold = read_outputs(spec)
+        print("--- warm cache")
+        results, warm_s = timed_render(spec, 1, cache_dir)
+        ok = all(cached == nodes for _, cached, nodes, _ in results) and same(cold, read_outputs(spec))
+        checks.append(ok)
+        print(f"{'OK ' if ok else 'BAD'} warm render {warm_s:.2f}s vs cold {cold_s:.2f}s, identical output")
+
+        tweaked = copy.deepcopy(spec)
+        riser = next(stem for stem in tweaked["stems"] if stem["name"] == "loop_riser")
+        next(step for step in riser["effects"] if step["effect"] == "delay")["feedback"] = 0.5
+        print("--- delay feedback 0.6 -> 0.5")
+        results, tweak_s = timed_render(tweaked, 1, cache_dir)
+        cached_riser = results[tweaked["stems"].index(riser)][1]
+        tweaked_out = read_outputs(tweaked)
+        timed_render(tweaked, 1, None)
+        ok = cached_riser == 1 and same(tweaked_out, read_outputs(tweaked)) and tweak_s * 3 < cold_s
+        checks.append(ok)
+        print(f"{'OK ' if ok else 'BAD'} re-render after a delay tweak {tweak_s:.2f}s vs cold {cold_s:.2f}s "
+              f"({cold_s / tweak_s:.0f}x), pitch shift reused, matches an uncached render")
+
+        # What editing effects.py or filters.py does to graph.IMPLEMENTATION.
+        print("--- effect implementation changed")
+        implementation = graph.IMPLEMENTATION
+        graph.IMPLEMENTATION = "edited"
+        results, _ = timed_render(spec, 1, cache_dir)
+        graph.IMPLEMENTATION = implementation
+        ok = all(cached == 0 for _, cached, _, _ in results)
+        checks.append(ok)
+        print(f"{'OK ' if ok else 'BAD'} no node served from the cache after an implementation change")
+
+        print(f"--- {args.workers} workers, no cache")
+        _, parallel_s = timed_render(spec, args.workers, None)
+        parallel = read_outputs(spec)
+        _, serial_s = timed_render(spec, 1, None)
+        ok = same(parallel, read_outputs(spec)) and same(parallel, cold)
+        checks.append(ok)
+        print(f"{'OK ' if ok else 'BAD'} process pool {parallel_s:.2f}s vs in order {serial_s:.2f}s "
+              f"on {os.cpu_count()} CPU(s), identical output")
+
+    return 0 if all(checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
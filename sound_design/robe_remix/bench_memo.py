@@ -0,0 +1,97 @@
+"""Benchmark: on-disk memoization of pitch shift, time stretch, resample and STFT.
+
+Times each transform cold and as a memory-mapped cache hit on 17 s of audio
+(the loop riser window), re-renders the loop riser after a delay feedback
+tweak with only the transform memo enabled, and checks the LRU size cap.
+
+    python bench_memo.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+import transforms
+from cache import ArrayCache, use_cache
+from graph import render_chain
+from process_stems import load_spec
+
+SR = 44100
+SPEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stems.json")
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(0)
+    t = np.arange(17 * SR) / SR
+    y = (0.3 * np.sin(2 * np.pi * 220 * t) + 0.05 * rng.standard_normal(len(t))).astype(np.float32)
+    checks = []
+
+    # librosa compiles some kernels on first use; keep that out of the timings.
+    use_cache(None)
+    transforms.pitch_shift(y[:SR], SR, 1.5)
+    transforms.time_stretch(y[:SR], 1.1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        use_cache(os.path.join(tmp, "transforms"))
+        # A hit still hashes the input (~3 ms here), so soxr's resample and
+        # the STFT gain much less than the phase-vocoder transforms.
+        calls = [
+            ("pitch_shift", transforms.pitch_shift, (y, SR, 1.5), 10),
+            ("time_stretch", transforms.time_stretch, (y, 0.8), 10),
+            ("resample", transforms.resample, (y, SR, 48000), 1),
+            ("stft", transforms.stft, (y,), 1),
+        ]
+        for name, fn, args, speedup in calls:
+            cold, cold_s = timed(fn, *args)
+            hit, hit_s = timed(fn, *args)
+            ok = (isinstance(hit, np.memmap) and np.array_equal(np.asarray(cold), hit)
+                  and hit_s * speedup < cold_s)
+            checks.append(ok)
+            print(f"{'OK ' if ok else 'BAD'} {name}: cold {cold_s * 1000:.0f} ms, "
+                  f"hit {hit_s * 1000:.1f} ms ({cold_s / hit_s:.0f}x)")
+
+        hit = transforms.pitch_shift(y, SR, 1.5)
+        before = np.array(hit)
+        hit *= 0
+        ok = np.array_equal(transforms.pitch_shift(y, SR, 1.5), before)
+        checks.append(ok)
+        print(f"{'OK ' if ok else 'BAD'} scaling a hit in place leaves the cached file untouched")
+
+        riser = next(stem for stem in load_spec(SPEC)["stems"] if stem["name"] == "loop_riser")
+        chain = riser["effects"]
+        tweaked = [dict(step, feedback=0.5) if step["effect"] == "delay" else step for step in chain]
+        use_cache(None)
+        expected, uncached_s = timed(render_chain, y.copy(), SR, tweaked)
+        use_cache(os.path.join(tmp, "transforms"))
+        render_chain(y.copy(), SR, chain)
+        (rendered, _), tweak_s = timed(render_chain, y.copy(), SR, tweaked)
+        ok = np.array_equal(rendered, expected[0]) and tweak_s < 0.5
+        checks.append(ok)
+        print(f"{'OK ' if ok else 'BAD'} loop riser after a delay feedback tweak: {tweak_s * 1000:.0f} ms "
+              f"(uncached {uncached_s * 1000:.0f} ms), same output")
+
+        lru = ArrayCache(os.path.join(tmp, "lru"), max_bytes=int(3.5 * 1024 ** 2))
+        block = np.zeros(256 * 1024, dtype=np.float32)
+        for i in range(5):
+            lru.put(f"block{i}", block + i)
+            lru.get("block0")
+            time.sleep(0.01)
+        kept = sorted(entry.name for entry in os.scandir(lru.directory))
+        ok = lru.size() <= lru.max_bytes and "block0.npy" in kept and "block1.npy" not in kept
+        checks.append(ok)
+        print(f"{'OK ' if ok else 'BAD'} LRU cap {lru.max_bytes / 1024 ** 2:.1f} MB: "
+              f"{lru.size() / 1024 ** 2:.1f} MB kept ({', '.join(kept)})")
+
+    return 0 if all(checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,147 @@
+"""Benchmark: segment-only loading vs librosa.load of the whole source.
+
+Writes a long synthetic stereo 48 kHz recording, then renders the stems in
+stems.json two ways in separate processes: slicing a full
+librosa.load(sr=44100), and load_segment reading only each window. Reports
+load time and peak RSS (also net of the imports) for each, and checks the
+segments and rendered stems match.
+
+    python bench_segments.py
+    python bench_segments.py --minutes 60
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+from graph import render_chain
+from process_stems import load_spec
+from segments import load_segment, segment_bounds
+
+NATIVE_SR = 48000
+SPEC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stems.json")
+
+
+def make_source(path, minutes):
+    """Stereo noise plus drifting tones, written a minute at a time."""
+    rng = np.random.default_rng(0)
+    with sf.SoundFile(path, "w", NATIVE_SR, 2, "PCM_16") as f:
+        for minute in range(int(minutes)):
+            t = np.arange(60 * NATIVE_SR) / NATIVE_SR + minute * 60
+            tone = 0.3 * np.sin(2 * np.pi * (220 + minute) * t)
+            noise = 0.05 * rng.standard_normal((len(t), 2))
+            f.write((noise + tone[:, None]).astype(np.float32))
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def rss_mb():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return peak_rss_mb()
+
+
+def worker(mode, source, out_dir):
+    import librosa
+    spec = load_spec(SPEC)
+    sr = spec["sr"]
+    # Both paths resample; pay librosa's lazy resampler import up front.
+    librosa.resample(np.zeros(NATIVE_SR, dtype=np.float32), orig_sr=NATIVE_SR, target_sr=sr)
+    baseline_mb = rss_mb()
+    start = time.perf_counter()
+    if mode == "full":
+        y, _ = librosa.load(source, sr=sr)
+        load_s = time.perf_counter() - start
+        for stem in spec["stems"]:
+            first, last = segment_bounds(stem["start"], stem.get("end"), stem.get("duration"), sr)
+            segment = y[first:last].copy()
+            np.save(os.path.join(out_dir, f"{mode}_{stem['name']}_raw.npy"), segment)
+            audio, _ = render_chain(segment, sr, stem["effects"])
+            np.save(os.path.join(out_dir, f"{mode}_{stem['name']}.npy"), audio)
+    else:
+        load_s = 0.0
+        for stem in spec["stems"]:
+            loaded = time.perf_counter()
+            segment = load_segment(source, stem["start"], stem.get("end"), stem.get("duration"), sr)
+            load_s += time.perf_counter() - loaded
+            np.save(os.path.join(out_dir, f"{mode}_{stem['name']}_raw.npy"), segment)
+            audio, _ = render_chain(segment, sr, stem["effects"])
+            np.save(os.path.join(out_dir, f"{mode}_{stem['name']}.npy"), audio)
+    total_s = time.perf_counter() - start
+    print(json.dumps({"load_s": load_s, "total_s": total_s, "peak_rss_mb": peak_rss_mb(),
+                      "audio_mb": peak_rss_mb() - baseline_mb}))
+
+
+def measure(mode, source, out_dir):
+    proc = subprocess.run([sys.executable, __file__, "--worker", mode, source, out_dir],
+                          check=True, capture_output=True, text=True)
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def max_diff(directory, a, b, relative=False):
+    a = np.load(os.path.join(directory, a))
+    b = np.load(os.path.join(directory, b))
+    if a.shape != b.shape:
+        return float("inf")
+    error = float(np.max(np.abs(a - b)))
+    return error / max(float(np.max(np.abs(a))), 1e-12) if relative else error
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+        worker(*sys.argv[2:5])
+        return 0
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "source_audio.wav")
+        make_source(source, args.minutes)
+        size_mb = os.path.getsize(source) / 1024 / 1024
+        print(f"    source: {args.minutes:g} min stereo {NATIVE_SR} Hz, {size_mb:.0f} MB")
+
+        full = measure("full", source, tmp)
+        segments = measure("segments", source, tmp)
+        print(f"    librosa.load + slices: {full['total_s']:.2f}s "
+              f"(load {full['load_s']:.2f}s), peak RSS {full['peak_rss_mb']:.0f} MB "
+              f"({full['audio_mb']:.0f} MB above imports)")
+        print(f"    load_segment per stem: {segments['total_s']:.2f}s "
+              f"(load {segments['load_s']:.2f}s), peak RSS {segments['peak_rss_mb']:.0f} MB "
+              f"({segments['audio_mb']:.0f} MB above imports)")
+
+        # The segments themselves should agree to float32 rounding; the
+        # phase vocoder and feedback delay amplify that slightly downstream,
+        # so rendered stems are compared relative to their peak.
+        checks = []
+        for stem in load_spec(SPEC)["stems"]:
+            name = stem["name"]
+            raw = max_diff(tmp, f"full_{name}_raw.npy", f"segments_{name}_raw.npy")
+            rendered = max_diff(tmp, f"full_{name}.npy", f"segments_{name}.npy", relative=True)
+            ok = raw < 1e-5 and rendered < 1e-2
+            checks.append(ok)
+            print(f"{'OK ' if ok else 'BAD'} {name}: segment max diff {raw:.1e}, "
+                  f"rendered max diff {rendered:.1e} of peak")
+
+        ok = segments["load_s"] * 10 < full["load_s"] and segments["audio_mb"] * 3 < full["audio_mb"]
+        checks.append(ok)
+        print(f"{'OK ' if ok else 'BAD'} loading {full['load_s'] / segments['load_s']:.0f}x faster, "
+              f"{full['audio_mb'] / max(segments['audio_mb'], 1):.0f}x less memory above imports")
+
+    return 0 if all(checks) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
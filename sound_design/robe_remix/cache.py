@@ -0,0 +1,127 @@
+import functools
+import hashlib
+import json
+import os
+import sys
+
+import numpy as np
+
+# Total size of a cache directory before the least recently used arrays
+# are deleted.
+MAX_BYTES = 2 * 1024 ** 3
+
+
+def source_digest(*modules):
+    """sha256 of the modules' source files, to key results by the code that made them."""
+    digest = hashlib.sha256()
+    for module in modules:
+        with open(module.__file__, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def array_key(name, arrays, params):
+    """sha256 of a transform name, its input samples and its parameters."""
+    digest = hashlib.sha256(name.encode())
+    for array in arrays:
+        array = np.ascontiguousarray(array)
+        digest.update(f"{array.dtype}{array.shape}".encode())
+        digest.update(array.tobytes())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+class ArrayCache:
+    """Arrays saved as .npy files under directory, capped at max_bytes.
+
+    Hits are memory-mapped copy-on-write: nothing is read until it is
+    used, and effects that scale in place modify a private copy rather
+    than the file. Each hit refreshes the file's mtime, and each put
+    deletes the files with the oldest mtimes until the directory fits.
+    """
+
+    def __init__(self, directory, max_bytes=MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.npy")
+
+    def get(self, key):
+        path = self.path(key)
+        try:
+            try:
+                array = np.load(path, mmap_mode="c")
+            except ValueError:
+                # Empty arrays can't be mapped.
+                array = np.load(path)
+            os.utime(path)
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        return array
+
+    def put(self, key, array):
+        # Stems render in parallel processes; write under a unique name and
+        # rename so readers never see a half-written file.
+        tmp = f"{self.path(key)}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp, self.path(key))
+        self.evict()
+
+    def evict(self):
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".npy"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def size(self):
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory)
+                   if entry.name.endswith(".npy"))
+
+
+# Cache used by @memoize in this process; None computes everything.
+_cache = None
+
+
+def use_cache(directory, max_bytes=MAX_BYTES):
+    """Point @memoize at directory (None turns memoization off)."""
+    global _cache
+    _cache = ArrayCache(directory, max_bytes) if directory else None
+    return _cache
+
+
+def memoize(fn):
+    """Cache fn(y, *args, **kwargs) on disk, keyed by y's samples and the params.
+
+    fn must be a pure function of its arguments that returns one array.
+    The key includes the source of fn's module, so editing it invalidates
+    what the old code cached.
+    """
+    name = f"{fn.__module__}.{fn.__qualname__}:{source_digest(sys.modules[fn.__module__])}"
+
+    @functools.wraps(fn)
+    def wrapper(y, *args, **kwargs):
+        if _cache is None:
+            return fn(y, *args, **kwargs)
+        key = array_key(name, [y], [args, kwargs])
+        result = _cache.get(key)
+        if result is None:
+            result = fn(y, *args, **kwargs)
+            _cache.put(key, result)
+        return result
+    return wrapper
@@ -0,0 +1,67 @@
+import numpy as np
+
+
+def feedback_delay(x, delay_samples, feedback, tail=0):
+    """Feedback comb filter: y[n] = x[n] + feedback * y[n - delay_samples].
+
+    Equivalent to scipy.signal.lfilter([1], a, x) with a[0] = 1 and
+    a[delay_samples] = -feedback, but lfilter's cost grows with the filter
+    order (here ~15k taps). Every sample in a block of delay_samples only
+    depends on the previous block, so the recurrence runs one whole block
+    at a time: len(y) / delay_samples NumPy operations instead of one
+    Python iteration per sample.
+    """
+    if delay_samples < 1:
+        raise ValueError("delay_samples must be >= 1")
+    x = np.asarray(x)
+    output = np.zeros(len(x) + tail, dtype=np.result_type(x.dtype, np.float64))
+    output[:len(x)] = x
+
+    for start in range(delay_samples, len(output), delay_samples):
+        end = min(start + delay_samples, len(output))
+        output[start:end] += output[start - delay_samples:end - delay_samples] * feedback
+    return output
+
+
+def rising_delay_curve(length, start_samples, end_samples):
+    """Per-sample delay time that shrinks from start_samples to end_samples.
+
+    A read head that catches up with the write head plays each repeat
+    faster than it was recorded, so the echoes rise in pitch.
+    """
+    return np.linspace(start_samples, end_samples, length)
+
+
+def modulated_feedback_delay(x, delay, feedback, tail=0):
+    """Feedback delay whose delay time (in samples, may be fractional) varies per sample.
+
+    y[n] = x[n] + feedback * y(n - delay[n]), reading between samples with
+    linear interpolation. `delay` is a scalar or an array covering the
+    output (len(x) + tail). Blocks are shorter than the smallest delay, so
+    every read lands on output that is already final.
+    """
+    x = np.asarray(x)
+    length = len(x) + tail
+    delay = np.broadcast_to(np.asarray(delay, dtype=np.float64), (length,))
+    min_delay = float(delay.min())
+    if min_delay < 2:
+        raise ValueError("delay must be >= 2 samples")
+    block = int(min_delay) - 1
+
+    output = np.zeros(length, dtype=np.result_type(x.dtype, np.float64))
+    output[:len(x)] = x
+    first = int(np.ceil(min_delay))
+    positions = np.arange(length, dtype=np.float64)
+
+    for start in range(first, length, block):
+        end = min(start + block, length)
+        read = positions[start:end] - delay[start:end]
+        valid = read >= 0
+        if not valid.any():
+            continue
+        read = read[valid]
+        idx = read.astype(np.int64)
+        frac = read - idx
+        echo = output[idx] * (1 - frac) + output[idx + 1] * frac
+        output[start:end][valid] += echo * feedback
+    return output
@@ -0,0 +1,110 @@
+import numpy as np
+
+import transforms
+from delay import feedback_delay, modulated_feedback_delay, rising_delay_curve
+from filters import exponential_sweep, swept_bandpass
+
+
+def apply_fade(audio, sr, duration=0.05):
+    """Applies a short fade in/out to avoid clicks."""
+    fade_len = int(duration * sr)
+    if len(audio) < fade_len * 2:
+        fade_len = len(audio) // 2
+
+    fade_in = np.linspace(0, 1, fade_len)
+    fade_out = np.linspace(1, 0, fade_len)
+
+    audio[:fade_len] *= fade_in
+    audio[-fade_len:] *= fade_out
+    return audio
+
+
+def pitch_shift(audio, sr, n_steps):
+    return transforms.pitch_shift(audio, sr, n_steps)
+
+
+def time_stretch(audio, sr, rate):
+    """Play rate times faster (rate < 1 slows down) without changing pitch."""
+    return transforms.time_stretch(audio, rate)
+
+
+def delay(audio, sr, delay_ms, feedback, tail=0.0, rise=None):
+    """Feedback delay with `tail` seconds of echoes after the input ends.
+
+    rise: final delay time as a fraction of delay_ms (0.5 = half), for a
+    read head that speeds up and pitches the repeats up.
+    """
+    delay_samples = int(delay_ms * sr / 1000)
+    tail_samples = int(tail * sr)
+    if rise is None:
+        return feedback_delay(audio, delay_samples, feedback, tail=tail_samples)
+    curve = rising_delay_curve(len(audio) + tail_samples, delay_samples, delay_samples * rise)
+    return modulated_feedback_delay(audio, curve, feedback, tail=tail_samples)
+
+
+def stutter(audio, sr, gapped=4, straight=8):
+    """Repeat the chunk `gapped` times with silence in between, then `straight` times back to back."""
+    pattern = []
+    for _ in range(gapped):
+        pattern.append(audio)
+        pattern.append(np.zeros(len(audio), dtype=audio.dtype))
+    for _ in range(straight):
+        pattern.append(audio)
+    return np.concatenate(pattern)
+
+
+def bandpass(audio, sr, low, high, order=2):
+    return swept_bandpass(audio, sr, low, high, order)
+
+
+def sweep(audio, sr, start_hz, end_hz, octaves=2.0, order=2, block=256):
+    """Band-pass `octaves` wide whose centre glides from start_hz to end_hz.
+
+    The filter is redesigned every `block` samples (5.8 ms at 44.1 kHz)
+    with its state carried across, so the sweep is smooth and click-free.
+    """
+    centre = exponential_sweep(len(audio), start_hz, end_hz)
+    edge = 2.0 ** (octaves / 2)
+    return swept_bandpass(audio, sr, centre / edge, centre * edge, order, block)
+
+
+def quantize(audio, sr, steps=10):
+    """Bitcrush-like distortion: round to 1/steps."""
+    return np.round(audio * steps) / steps
+
+
+def envelope(audio, sr, attack=0.005, decay=0.2, sustain=0.6):
+    """Transient shaping: fast attack, then decay to a sustain level."""
+    env = np.ones_like(audio)
+    attack_len = int(attack * sr)
+    env[:attack_len] = np.linspace(0, 1, attack_len)
+    decay_len = int(decay * sr)
+    env[attack_len:attack_len + decay_len] = np.linspace(1, sustain, decay_len)
+    return audio * env
+
+
+def sidechain(audio, sr, duration=0.1, depth=0.1):
+    """Sidechain-style ducking of the start (the assumed kick), recovering linearly."""
+    duck_len = int(duration * sr)
+    if len(audio) > duck_len:
+        audio[:duck_len] *= np.linspace(depth, 1.0, duck_len)
+    return audio
+
+
+def fade(audio, sr, duration=0.05):
+    return apply_fade(audio, sr, duration)
+
+
+EFFECTS = {
+    "pitch_shift": pitch_shift,
+    "time_stretch": time_stretch,
+    "delay": delay,
+    "stutter": stutter,
+    "bandpass": bandpass,
+    "sweep": sweep,
+    "quantize": quantize,
+    "envelope": envelope,
+    "sidechain": sidechain,
+    "fade": fade,
+}
+
@@ -0,0 +1,91 @@
+import numpy as np
+import scipy.signal
+
+
+def butter_bandpass_sos(low, high, sr, order=2):
+    """Butterworth band-pass second-order sections for arrays of band edges.
+
+    Same filter as scipy.signal.butter(order, [low, high], btype="band",
+    output="sos", fs=sr), but designed in closed form for every (low, high)
+    pair at once: shape (..., order, 6) for edges of shape (...). butter()
+    takes ~0.7 ms per call, which would dominate a sweep that redesigns the
+    filter every few milliseconds of audio.
+    """
+    low = np.asarray(low, dtype=np.float64)
+    high = np.asarray(high, dtype=np.float64)
+    if np.any(low <= 0) or np.any(high >= sr / 2) or np.any(low >= high):
+        raise ValueError("band edges must satisfy 0 < low < high < sr / 2")
+
+    # Pre-warped analog band: centre w0 and width bw, as butter() does.
+    k = 2.0 * sr
+    w_low = k * np.tan(np.pi * low / sr)
+    w_high = k * np.tan(np.pi * high / sr)
+    w0 = np.sqrt(w_low * w_high)[..., None]
+    bw = (w_high - w_low)[..., None]
+
+    # Low-pass prototype poles in the upper half plane. The band-pass
+    # transform turns each into two poles, and each of those plus its
+    # conjugate makes one section. An odd order adds the real pole -1,
+    # whose two band-pass poles make one more.
+    angles = np.pi * (2 * np.arange(order // 2) + order + 1) / (2 * order)
+    half = np.exp(1j * angles) * bw / 2
+    root = np.sqrt(half ** 2 - w0 ** 2)
+    first = np.concatenate([half + root, half - root], axis=-1)
+    second = first.conj()
+    if order % 2:
+        half = -bw / 2 + 0j
+        root = np.sqrt(half ** 2 - w0 ** 2)
+        first = np.concatenate([first, half + root], axis=-1)
+        second = np.concatenate([second, half - root], axis=-1)
+
+    # Bilinear transform; each section gets a zero at z = 1 and z = -1 and
+    # unit gain at the centre frequency, so the cascade peaks at 0 dB.
+    z1 = (k + first) / (k - first)
+    z2 = (k + second) / (k - second)
+    a1 = -(z1 + z2).real
+    a2 = (z1 * z2).real
+    centre = np.exp(-1j * 2 * np.arctan(w0 / k))
+    gain = np.abs(1 + a1 * centre + a2 * centre ** 2) / np.abs(1 - centre ** 2)
+
+    sos = np.zeros(a1.shape + (6,))
+    sos[..., 0] = gain
+    sos[..., 2] = -gain
+    sos[..., 3] = 1.0
+    sos[..., 4] = a1
+    sos[..., 5] = a2
+    return sos
+
+
+def block_sosfilt(x, sos, block):
+    """Filter x with a different set of sections for every block of samples.
+
+    sos has shape (n_blocks, n_sections, 6), one set per block of `block`
+    samples. The filter state (zi) carries over from one block to the next
+    instead of restarting at zero, so coefficient changes don't click.
+    """
+    x = np.asarray(x)
+    output = np.empty(len(x), dtype=np.result_type(x.dtype, np.float64))
+    zi = np.zeros((sos.shape[1], 2))
+    for i, start in enumerate(range(0, len(x), block)):
+        output[start:start + block], zi = scipy.signal.sosfilt(sos[i], x[start:start + block], zi=zi)
+    return output
+
+
+def swept_bandpass(x, sr, low, high, order=2, block=256):
+    """Butterworth band-pass whose edges follow per-sample curves low and high (Hz).
+
+    The filter is redesigned every `block` samples from the curves' values
+    at the block's centre. Scalar edges filter the whole buffer in one call.
+    """
+    if np.ndim(low) == 0 and np.ndim(high) == 0:
+        return scipy.signal.sosfilt(butter_bandpass_sos(low, high, sr, order), x)
+    n_blocks = -(-len(x) // block)
+    centres = np.minimum(np.arange(n_blocks) * block + block // 2, len(x) - 1)
+    low = np.broadcast_to(low, (len(x),))[centres]
+    high = np.broadcast_to(high, (len(x),))[centres]
+    return block_sosfilt(x, butter_bandpass_sos(low, high, sr, order), block)
+
+
+def exponential_sweep(length, start, end):
+    """Per-sample frequency gliding from start to end Hz at a constant rate in octaves."""
+    return start * (end / start) ** np.linspace(0.0, 1.0, length)
@@ -0,0 +1,80 @@
+import hashlib
+import json
+
+import numpy as np
+
+import delay
+import effects
+import filters
+import transforms
+from cache import source_digest
+from effects import EFFECTS
+
+# Rendered node outputs (a cache.ArrayCache), one .npy per (input, effect,
+# params) key.
+CACHE_DIR = ".render_cache"
+
+# Digest of the code behind the effects, part of every node key so that a
+# changed implementation (e.g. a redesigned filter) doesn't serve outputs
+# rendered by the old one. Editing any of these modules re-renders every
+# node once.
+IMPLEMENTATION = source_digest(effects, delay, filters, transforms)
+
+
+def block_key(audio, sr):
+    """Key for a block of source samples."""
+    digest = hashlib.sha256(np.ascontiguousarray(audio, dtype=np.float32).tobytes())
+    digest.update(str(sr).encode())
+    return digest.hexdigest()
+
+
+def node_key(input_key, step):
+    """Key for an effect node: its input's key, the effect name and params,
+    and the IMPLEMENTATION digest.
+
+    Chaining keys instead of hashing each intermediate output means a cache
+    lookup never has to compute the node it is trying to skip.
+    """
+    params = json.dumps(step, sort_keys=True)
+    return hashlib.sha256(f"{input_key}:{IMPLEMENTATION}:{params}".encode()).hexdigest()
+
+
+def run_node(audio, sr, step):
+    params = dict(step)
+    name = params.pop("effect")
+    if name not in EFFECTS:
+        raise ValueError(f"Unknown effect '{name}' (known: {', '.join(EFFECTS)})")
+    return np.asarray(EFFECTS[name](audio, sr, **params), dtype=np.float32)
+
+
+def render_chain(audio, sr, chain, cache=None):
+    """Run float32 audio through a list of {"effect": name, **params} nodes.
+
+    With a cache, starts from the deepest node whose output is already
+    cached and stores every node computed after it, so changing one
+    parameter only re-runs that node and the ones after it.
+    Returns (audio, number of nodes served from the cache).
+    """
+    audio = np.asarray(audio, dtype=np.float32)
+    if cache is None:
+        for step in chain:
+            audio = run_node(audio, sr, step)
+        return audio, 0
+
+    keys = []
+    key = block_key(audio, sr)
+    for step in chain:
+        key = node_key(key, step)
+        keys.append(key)
+
+    start = 0
+    for i in range(len(chain), 0, -1):
+        cached = cache.get(keys[i - 1])
+        if cached is not None:
+            audio, start = cached, i
+            break
+
+    for step, key in zip(chain[start:], keys[start:]):
+        audio = run_node(audio, sr, step)
+        cache.put(key, audio)
+    return audio, start
@@ -1,155 +1,88 @@
-import librosa
-import numpy as np
-import scipy.signal
-import soundfile as sf
+import argparse
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import soundfile as sf
+
+from cache import ArrayCache
+from graph import CACHE_DIR, render_chain
+from segments import load_segment
 
 SOURCE_FILE = "source_audio.wav"
+STEMS_FILE = "stems.json"
 SR = 44100
 
-def apply_fade(audio, sr, duration=0.05):
-    """Applies a short fade in/out to avoid clicks."""
-    fade_len = int(duration * sr)
-    if len(audio) < fade_len * 2:
-        fade_len = len(audio) // 2
-    
-    fade_in = np.linspace(0, 1, fade_len)
-    fade_out = np.linspace(1, 0, fade_len)
-    
-    audio[:fade_len] *= fade_in
-    audio[-fade_len:] *= fade_out
-    return audio
+# Each stem in stems.json (or a .yaml/.yml file with the same layout) is a
+# window of the source plus an effect chain:
+#
+#   {"name": "loop_riser", "start": "3:38", "end": "3:55",
+#    "effects": [{"effect": "pitch_shift", "n_steps": 1.5}, ...]}
+#
+# "duration" (seconds) can replace "end". Effects are listed in effects.EFFECTS.
+# Only the windows are read from the source, so adding a stem needs no code.
+# Every node's output is cached under .render_cache, so tweaking a late
+# effect (delay, fade) reuses the pitch shift rendered by an earlier run.
+# The transforms memo (cache.use_cache) stays off here: each pitch shift or
+# time stretch is a node whose output the node cache already stores, and a
+# second copy would only halve what fits in the budget.
 
-def create_loop_riser(y, sr):
-    print("Generating Loop Riser...")
-    # Extract 3:38 - 3:55
-    start_sec = 3 * 60 + 38
-    end_sec = 3 * 60 + 55
-    segment = y[int(start_sec * sr):int(end_sec * sr)]
-    
-    # 1. Pitch Shift Ramp (Simulated via time stretching chunks or simple resampling for speed up)
-    # A true pitch ramp without speed change is hard in vanilla librosa, 
-    # so we'll do a "Tape Stop" style speed ramp UP (Pitch + Speed increase).
-    # We will resample the audio to a gradually shorter length? No, simpler:
-    # We'll just pitch shift the whole thing up by 2 semitones to make it tense,
-    # and add a delay that pitches up.
-    
-    # Let's do a simple static pitch shift for tension first
-    pitched = librosa.effects.pitch_shift(segment, sr=sr, n_steps=1.5)
-    
-    # Create a delay buffer that feeds back and pitches up
-    delay_ms = 350 # ~1/4 note at 170 BPM (techno)
-    delay_samples = int(delay_ms * SR / 1000)
-    feedback = 0.6
-    
-    output = np.zeros(len(pitched) + sr * 2) # Add tail
-    output[:len(pitched)] = pitched
-    
-    # Simple delay line implementation
-    # For a "Rising" delay, we'd need to modulate read head. 
-    # For now, let's just add a standard delay to fill the space.
-    
-    for i in range(delay_samples, len(output)):
-        if i < len(pitched):
-             input_val = pitched[i]
-        else:
-             input_val = 0
-        
-        # Feedback
-        delayed_val = output[i - delay_samples] * feedback
-        output[i] += delayed_val
-        
-    return apply_fade(output, sr)
+def load_spec(path=STEMS_FILE):
+    with open(path) as f:
+        if path.endswith((".yaml", ".yml")):
+            import yaml
+            return yaml.safe_load(f)
+        return json.load(f)
 
-def create_memory_glitch(y, sr):
-    print("Generating Memory Glitch...")
-    # Find a vocal "stuck" point. Let's look around 3:45 ("y yo que...").
-    start_sec = 3 * 60 + 45.5
-    duration = 0.2 # small chunk
-    chunk = y[int(start_sec * sr):int((start_sec + duration) * sr)]
-    
-    # Create pattern: 4x 1/8th repeats, 8x 1/16th repeats
-    # Assuming 120BPM for easy math (0.5s = beat). 
-    # 1/8 = 0.25s, 1/16 = 0.125s.
-    
-    # Make chunk exactly 1/16th noteish length
-    chunk_len = int(0.12 * sr)
-    if len(chunk) > chunk_len:
-        chunk = chunk[:chunk_len]
-        
-    pattern = []
-    # 4x 1/8th (silence in between to make it stutter)
-    for _ in range(4):
-        pattern.append(chunk)
-        pattern.append(np.zeros(chunk_len)) # Gap
-        
-    # 8x 1/16th (no gap, machinedrum style)
-    for _ in range(8):
-        pattern.append(chunk)
-        
-    full_glitch = np.concatenate(pattern)
-    
-    # Bandpass Filter Sweep
-    # We'll filter the whole thing with a moving center frequency
-    b, a = scipy.signal.butter(2, [500/(sr/2), 2000/(sr/2)], btype='band')
-    filtered = scipy.signal.lfilter(b, a, full_glitch)
-    
-    # Add some bitcrush-like distortion (quantization)
-    filtered = (np.round(filtered * 10) / 10)
-    
-    return apply_fade(filtered, sr)
+def render_stem(source, stem, sr, cache=None):
+    """Returns (audio, number of effect nodes served from the cache)."""
+    segment = load_segment(source, stem["start"], stem.get("end"), stem.get("duration"), sr)
+    return render_chain(segment, sr, stem.get("effects", []), cache)
 
-def create_crowd_hit(y, sr):
-    print("Generating Crowd Hit...")
-    # Find a crowd cheer. End of loop (3:55) usually has reaction.
-    start_sec = 3 * 60 + 53
-    duration = 1.0
-    extract = y[int(start_sec * sr):int((start_sec + duration) * sr)]
-    
-    # Transient Shaping: Enhance attack
-    # Simple envelope
-    envelope = np.ones_like(extract)
-    # Fast attack
-    attack_len = int(0.005 * sr)
-    envelope[:attack_len] = np.linspace(0, 1, attack_len)
-    # Decay to sustain
-    decay_len = int(0.2 * sr)
-    envelope[attack_len:attack_len+decay_len] = np.linspace(1, 0.6, decay_len)
-    
-    shaped = extract * envelope
-    
-    # Sidechain Simulation (Volume Ducking on the "kick" - assumed start of beat)
-    # Duck first 100ms hard then recover
-    duck_len = int(0.1 * sr)
-    sc_curve = np.linspace(0.1, 1.0, duck_len)
-    if len(shaped) > duck_len:
-        shaped[:duck_len] *= sc_curve
-        
-    return apply_fade(shaped, sr)
+def write_stem(source, stem, sr, cache_dir=None):
+    start = time.perf_counter()
+    cache = ArrayCache(cache_dir) if cache_dir else None
+    audio, cached = render_stem(source, stem, sr, cache)
+    output = stem.get("output", f"{stem['name']}.wav")
+    sf.write(output, audio, sr)
+    return output, cached, len(stem.get("effects", [])), time.perf_counter() - start
+
+def render_all(spec, workers=None, cache_dir=CACHE_DIR):
+    """Render every stem in spec, independent stems in parallel processes."""
+    source = spec.get("source", SOURCE_FILE)
+    sr = spec.get("sr", SR)
+    stems = spec["stems"]
+    workers = workers or max(1, min(len(stems), os.cpu_count() or 1))
+
+    if workers == 1:
+        results = [write_stem(source, stem, sr, cache_dir) for stem in stems]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(write_stem, source, stem, sr, cache_dir) for stem in stems]
+            results = [future.result() for future in futures]
+
+    for stem, (output, cached, nodes, seconds) in zip(stems, results):
+        print(f"Saved {output} ({seconds:.2f}s, {cached}/{nodes} effects cached)")
+    return results
 
 def main():
-    if not os.path.exists(SOURCE_FILE):
-        print("Error: source_audio.wav not found. Run download_audio.py first.")
+    parser = argparse.ArgumentParser(description="Render the stems described in a stem spec.")
+    parser.add_argument("spec", nargs="?", default=STEMS_FILE)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="parallel stem renders (default: one per stem, up to the CPU count)")
+    parser.add_argument("--cache-dir", default=CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true")
+    args = parser.parse_args()
+
+    spec = load_spec(args.spec)
+    source = spec.get("source", SOURCE_FILE)
+    if not os.path.exists(source):
+        print(f"Error: {source} not found. Run download_audio.py first.")
         return
 
-    print("Loading audio...")
-    y, sr = librosa.load(SOURCE_FILE, sr=SR)
-    
-    # 1. Loop Riser
-    riser = create_loop_riser(y, sr)
-    sf.write("loop_riser.wav", riser, sr)
-    print("Saved loop_riser.wav")
-    
-    # 2. Memory Glitch
-    glitch = create_memory_glitch(y, sr)
-    sf.write("memory_glitch.wav", glitch, sr)
-    print("Saved memory_glitch.wav")
-    
-    # 3. Crowd Hit
-    hit = create_crowd_hit(y, sr)
-    sf.write("crowd_hit.wav", hit, sr)
-    print("Saved crowd_hit.wav")
-    
+    print(f"Generating {len(spec['stems'])} stems from {source}...")
+    render_all(spec, args.workers, None if args.no_cache else args.cache_dir)
     print("All stems processed.")
 
 if __name__ == "__main__":
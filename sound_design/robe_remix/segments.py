@@ -0,0 +1,64 @@
+import math
+
+import numpy as np
+import soundfile as sf
+
+from transforms import resample
+
+# Extra source audio read on each side of a segment so the resampler's
+# filter has real context at the edges instead of zeros.
+RESAMPLE_MARGIN = 0.05
+
+
+def parse_time(value):
+    """Seconds from 218, 218.5, "218.5", "3:38" or "3:45.5"."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    seconds = 0.0
+    for part in str(value).split(":"):
+        seconds = seconds * 60 + float(part)
+    return seconds
+
+
+def segment_bounds(start, end=None, duration=None, sr=44100):
+    """Sample range [first, last) at sr, matching y[int(start * sr):int(end * sr)]."""
+    start = parse_time(start)
+    first = int(start * sr)
+    if duration is not None:
+        return first, first + int(parse_time(duration) * sr)
+    return first, int(parse_time(end) * sr)
+
+
+def load_segment(path, start, end=None, duration=None, sr=44100):
+    """Mono float32 samples of path between start and end (or start + duration), at sr.
+
+    Only that window (plus a small margin) is read from disk, and only it
+    is resampled, so the result lines up with slicing the output of
+    librosa.load(path, sr=sr) over the whole file without loading it.
+    """
+    first, last = segment_bounds(start, end, duration, sr)
+    with sf.SoundFile(path) as f:
+        native = f.samplerate
+        if native == sr:
+            f.seek(min(first, f.frames))
+            data = f.read(last - first, dtype="float32", always_2d=True)
+            return _mono(data)
+
+        # Read from a native sample that falls exactly on an output sample,
+        # so the resampled window needs no fractional shift.
+        step = native // math.gcd(native, sr)
+        margin = int(RESAMPLE_MARGIN * native)
+        native_first = max(0, (first * native // sr - margin) // step * step)
+        native_last = min(f.frames, -(-last * native // sr) + margin)
+        f.seek(native_first)
+        data = f.read(max(0, native_last - native_first), dtype="float32", always_2d=True)
+
+    resampled = resample(_mono(data), native, sr)
+    offset = native_first * sr // native
+    return np.ascontiguousarray(resampled[first - offset:last - offset])
+
+
+def _mono(data):
+    if data.shape[1] == 1:
+        return data[:, 0]
+    return data.mean(axis=1, dtype=np.float32)
@@ -0,0 +1,29 @@
+import librosa
+
+from cache import memoize
+
+# The slow librosa transforms, memoized on disk once cache.use_cache() is
+# called. Each can take seconds on a stem-sized window, and gets the same
+# input again every time an effect later in the chain is tweaked. Renders
+# with a node cache (process_stems) leave it off; the node outputs already
+# hold these results.
+
+
+@memoize
+def pitch_shift(y, sr, n_steps):
+    return librosa.effects.pitch_shift(y, sr=sr, n_steps=n_steps)
+
+
+@memoize
+def time_stretch(y, rate):
+    return librosa.effects.time_stretch(y, rate=rate)
+
+
+@memoize
+def resample(y, orig_sr, target_sr):
+    return librosa.resample(y, orig_sr=orig_sr, target_sr=target_sr)
+
+
+@memoize
+def stft(y, n_fft=2048, hop_length=None):
+    return librosa.stft(y, n_fft=n_fft, hop_length=hop_length)